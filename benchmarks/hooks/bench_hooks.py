@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+"""Hook latency benchmark: replay recorded tool events through settings.json.
+
+Builds a throwaway project (git repo, .beads/, a bead worktree, synthetic
+transcripts) with the hooks and settings from templates/, then replays every
+event in benchmarks/hooks/events/ the way Claude does: each hook group whose
+matcher fits the event runs, all matching hooks run in parallel with the
+event JSON on stdin, CLAUDE_PROJECT_DIR set and the project as cwd.
+
+Reports latency percentiles per hook and per event type, plus how many
+external commands each hook spawns (counted in a separate, untimed pass
+through PATH shims so the timings stay clean).
+
+Usage:
+    python benchmarks/hooks/bench_hooks.py                          # All events, 10 runs
+    python benchmarks/hooks/bench_hooks.py --runs 30 --transcript-lines 100 5000
+    python benchmarks/hooks/bench_hooks.py --event subagent-stop-supervisor --serial
+    python benchmarks/hooks/bench_hooks.py --json hook-timings.json
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_ROOT = BENCH_DIR.parent.parent
+TEMPLATES_DIR = REPO_ROOT / "templates"
+EVENTS_DIR = BENCH_DIR / "events"
+
+
+def _load_hook_profiler():
+    """templates/hooks/hook-profiler.py as a module (its name isn't importable)."""
+    spec = importlib.util.spec_from_file_location("hook_profiler", TEMPLATES_DIR / "hooks" / "hook-profiler.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Same decision labels and percentiles as the opt-in profiler reports
+hook_profiler = _load_hook_profiler()
+decision_of = hook_profiler.decision_of
+percentile = hook_profiler.percentile
+
+DEFAULT_HOOK_TIMEOUT = 60  # seconds, same default as Claude
+BEAD_ID = "bench-1"
+
+# Agents referenced by the event corpus: agent_id -> subagent_type
+AGENTS = {
+    "agent-bench-1": "python-backend-supervisor",
+    "agent-bench-scout": "scout",
+}
+
+# Stand-in for the beads CLI when it is not installed (or with --fake-bd)
+FAKE_BD = """#!/bin/sh
+case "$1" in
+  show) echo '[{"id":"'"$2"'","status":"inreview","issue_type":"task","dependencies":[]}]' ;;
+  list|ready|blocked) echo '[]' ;;
+  *) exit 0 ;;
+esac
+"""
+
+BASH_BUILTINS = set("""
+alias bg bind break builtin caller case cd command compgen complete continue
+declare dirs disown do done echo elif else enable esac eval exec exit export
+false fc fg fi for function getopts hash help history if in jobs kill let
+local logout popd printf pushd pwd read readonly return select set shift
+shopt source suspend test then time times trap true type typeset ulimit
+umask unalias unset until wait while
+""".split())
+
+
+# ============================================================
+# SANDBOX PROJECT
+# ============================================================
+
+def git(project: Path, *args: str) -> None:
+    subprocess.run(["git", "-C", str(project), *args], check=True, capture_output=True)
+
+
+def write_transcripts(project: Path, lines: int, line_bytes: int) -> dict:
+    """Write a main transcript plus one transcript per agent.
+
+    The main transcript links each agent to the Task tool_use that spawned it
+    (agentId -> parentToolUseID -> subagent_type) the way Claude records it, so
+    validate-completion.sh takes its full supervisor path.
+    """
+    compact = {"separators": (",", ":")}
+    sessions_dir = project / ".bench-sessions"
+    main_path = sessions_dir / "bench-session.jsonl"
+    subagents_dir = sessions_dir / "bench-session" / "subagents"
+    subagents_dir.mkdir(parents=True, exist_ok=True)
+    filler = ("lorem ipsum " * (line_bytes // 12 + 1))[:line_bytes]
+
+    def chatter(count: int, role_offset: int = 0):
+        for i in range(count):
+            role = "user" if (i + role_offset) % 2 == 0 else "assistant"
+            yield json.dumps({"type": role, "message": {"role": role, "content": [
+                {"type": "text", "text": f"{i}: {filler}"}]}}, **compact)
+
+    with open(main_path, "w", encoding="utf-8") as main:
+        for line in chatter(lines):
+            main.write(line + "\n")
+        for index, (agent_id, subagent_type) in enumerate(AGENTS.items()):
+            tool_use_id = f"toolu_bench_task_{index}"
+            prompt = f"BEAD_ID: {BEAD_ID}\n\nDo the work." if "supervisor" in subagent_type else "Look around."
+            main.write(json.dumps({"type": "assistant", "message": {"role": "assistant", "content": [
+                {"type": "tool_use", "id": tool_use_id, "name": "Task",
+                 "input": {"subagent_type": subagent_type, "prompt": prompt}}]}}, **compact) + "\n")
+            main.write(json.dumps({"type": "progress", "agentId": agent_id,
+                                   "parentToolUseID": tool_use_id}, **compact) + "\n")
+
+    agent_paths = {}
+    for agent_id, subagent_type in AGENTS.items():
+        path = subagents_dir / f"{agent_id}.jsonl"
+        if "supervisor" in subagent_type:
+            final = (f"BEAD {BEAD_ID} COMPLETE\nWorktree: .worktrees/bd-{BEAD_ID}\n"
+                     "Files: src/app.py\nTests: pass\nSummary: Added endpoint.")
+        else:
+            final = "Config loader lives in src/config.py."
+        with open(path, "w", encoding="utf-8") as f:
+            for line in chatter(lines, role_offset=1):
+                f.write(line + "\n")
+            f.write(json.dumps({"type": "assistant", "message": {"role": "assistant", "content": [
+                {"type": "tool_use", "id": "toolu_bench_comment", "name": "Bash",
+                 "input": {"command": f"bd comment {BEAD_ID} \"Completed: endpoint\""}}]}}, **compact) + "\n")
+            f.write(json.dumps({"type": "assistant", "message": {"role": "assistant", "content": [
+                {"type": "text", "text": final}]}}, **compact) + "\n")
+        agent_paths[agent_id] = path
+    return {"transcript_path": main_path, "agents": agent_paths}
+
+
+def build_project(root: Path, settings_path: Path, lines: int, line_bytes: int) -> dict:
+    """Create the sandbox project and return the paths events refer to."""
+    project = root / "project"
+    (project / "src").mkdir(parents=True)
+    (project / "src" / "app.py").write_text("print('hello')\n", encoding="utf-8")
+    (project / "README.md").write_text("# Bench\n", encoding="utf-8")
+    (project / ".gitignore").write_text(".beads/\n.worktrees/\n.bench-sessions/\n.claude/\n", encoding="utf-8")
+    git(project, "init", "-q", "-b", "main")
+    git(project, "-c", "user.name=bench", "-c", "user.email=bench@example.com", "add", "-A")
+    git(project, "-c", "user.name=bench", "-c", "user.email=bench@example.com", "commit", "-q", "-m", "init")
+    git(project, "worktree", "add", "-q", str(project / ".worktrees" / f"bd-{BEAD_ID}"), "-b", f"bd-{BEAD_ID}")
+
+    (project / ".beads" / "memory").mkdir(parents=True)
+    shutil.copytree(TEMPLATES_DIR / "hooks", project / ".claude" / "hooks")
+    for hook in (project / ".claude" / "hooks").glob("*.sh"):
+        hook.chmod(0o755)  # bootstrap makes hooks executable
+    shutil.copy2(settings_path, project / ".claude" / "settings.json")
+
+    paths = write_transcripts(project, lines, line_bytes)
+    paths["project_dir"] = project
+    return paths
+
+
+def install_fake_bd(bin_dir: Path) -> None:
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    bd = bin_dir / "bd"
+    bd.write_text(FAKE_BD, encoding="utf-8")
+    bd.chmod(0o755)
+
+
+def install_exec_shims(shim_dir: Path, hook_dir: Path, path: str, log_path: Path) -> None:
+    """Wrap every external command the hooks mention with a counting shim."""
+    names = set()
+    for hook in hook_dir.glob("*.sh"):
+        names.update(re.findall(r"[A-Za-z_][A-Za-z0-9_.-]*", hook.read_text(encoding="utf-8")))
+    shim_dir.mkdir(parents=True, exist_ok=True)
+    for name in sorted(names - BASH_BUILTINS):
+        real = shutil.which(name, path=path)
+        if not real:
+            continue
+        shim = shim_dir / name
+        shim.write_text(f'#!/bin/sh\necho {name} >> "{log_path}"\nexec "{real}" "$@"\n', encoding="utf-8")
+        shim.chmod(0o755)
+
+
+# ============================================================
+# EVENT DISPATCH
+# ============================================================
+
+def load_events(names: list[str] | None) -> dict:
+    events = {}
+    for path in sorted(EVENTS_DIR.glob("*.json")):
+        if names and path.stem not in names:
+            continue
+        events[path.stem] = path.read_text(encoding="utf-8")
+    return events
+
+
+def render_event(template: str, paths: dict) -> str:
+    """Fill {project_dir}/{transcript_path}/{agent_transcript_path} placeholders."""
+    event = json.loads(template)
+    agent_path = paths["agents"].get(event.get("agent_id", ""), "")
+    text = json.dumps(event)
+    for key, value in (("project_dir", paths["project_dir"]),
+                       ("transcript_path", paths["transcript_path"]),
+                       ("agent_transcript_path", agent_path)):
+        text = text.replace("{" + key + "}", str(value))
+    return text
+
+
+def matching_hooks(settings: dict, event: dict) -> list[dict]:
+    """Hooks Claude would run for this event (matcher is a regex on tool_name)."""
+    hooks = []
+    seen = set()
+    for group in settings.get("hooks", {}).get(event["hook_event_name"], []):
+        matcher = group.get("matcher", "")
+        if matcher and matcher != "*" and "tool_name" in event:
+            if not re.fullmatch(matcher, event["tool_name"]):
+                continue
+        for hook in group.get("hooks", []):
+            # Identical commands are deduplicated
+            if hook.get("type") == "command" and hook["command"] not in seen:
+                seen.add(hook["command"])
+                hooks.append(hook)
+    return hooks
+
+
+def run_hook(hook: dict, payload: str, project: Path, env: dict) -> dict:
+    started = time.perf_counter()
+    try:
+        result = subprocess.run(
+            hook["command"], shell=True, cwd=project, env=env, input=payload.encode(),
+            capture_output=True, timeout=hook.get("timeout", DEFAULT_HOOK_TIMEOUT),
+        )
+        exit_code, stdout = result.returncode, result.stdout
+    except subprocess.TimeoutExpired:
+        exit_code, stdout = 124, b""
+    return {
+        "hook": Path(hook["command"].split()[0]).name,
+        "seconds": time.perf_counter() - started,
+        "exit": exit_code,
+        "decision": decision_of(exit_code, stdout),
+    }
+
+
+def dispatch(hooks: list[dict], payload: str, project: Path, env: dict, serial: bool) -> tuple[float, list]:
+    """Run all hooks for one event; returns (event wall time, per-hook results)."""
+    started = time.perf_counter()
+    if serial or len(hooks) == 1:
+        results = [run_hook(h, payload, project, env) for h in hooks]
+    else:
+        with ThreadPoolExecutor(max_workers=len(hooks)) as pool:
+            results = list(pool.map(lambda h: run_hook(h, payload, project, env), hooks))
+    return time.perf_counter() - started, results
+
+
+def count_subprocesses(hooks: list[dict], payload: str, project: Path, env: dict,
+                       shim_dir: Path, log_path: Path) -> dict:
+    """External commands spawned per hook (one untimed run through the shims)."""
+    counts = {}
+    shim_env = dict(env, PATH=f"{shim_dir}{os.pathsep}{env['PATH']}")
+    for hook in hooks:
+        log_path.write_text("", encoding="utf-8")
+        run_hook(hook, payload, project, shim_env)
+        spawned = log_path.read_text(encoding="utf-8").split()
+        # +1 for the hook's own bash process
+        counts[Path(hook["command"].split()[0]).name] = len(spawned) + 1
+    return counts
+
+
+# ============================================================
+# REPORT
+# ============================================================
+
+def summarize(samples: list[float]) -> dict:
+    return {
+        "n": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 1),
+        "p95_ms": round(percentile(samples, 95) * 1000, 1),
+        "p99_ms": round(percentile(samples, 99) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 1),
+    }
+
+
+def print_table(title: str, rows: dict, extra: str | None = None) -> None:
+    print(f"\n{title}")
+    header = f"  {'name':<56} {'n':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    print(header + (f" {extra:>6}" if extra else ""))
+    for name, row in sorted(rows.items(), key=lambda kv: -kv[1]["p50_ms"]):
+        line = (f"  {name:<56} {row['n']:>4} {row['p50_ms']:>7.1f}ms {row['p95_ms']:>6.1f}ms "
+                f"{row['p99_ms']:>6.1f}ms {row['max_ms']:>6.1f}ms")
+        if extra:
+            line += f" {row.get(extra, ''):>6}"
+        print(line)
+
+
+def bench_size(args, settings_path: Path, lines: int, events: dict) -> dict:
+    settings = json.loads(settings_path.read_text(encoding="utf-8"))
+    with tempfile.TemporaryDirectory(prefix="hook-bench-") as tmp:
+        root = Path(tmp)
+        paths = build_project(root, settings_path, lines, args.line_bytes)
+        project = paths["project_dir"]
+
+        path = os.environ.get("PATH", "")
+        if args.fake_bd or not shutil.which("bd"):
+            install_fake_bd(root / "bin")
+            path = f"{root / 'bin'}{os.pathsep}{path}"
+        env = dict(os.environ, PATH=path, CLAUDE_PROJECT_DIR=str(project))
+        shim_dir, exec_log = root / "shims", root / "exec.log"
+        install_exec_shims(shim_dir, project / ".claude" / "hooks", path, exec_log)
+
+        per_hook: dict[str, list] = {}
+        per_event: dict[str, list] = {}
+        per_event_name: dict[str, list] = {}
+        subprocesses: dict[str, int] = {}
+        decisions: dict[str, str] = {}
+        exits: dict[str, int] = {}
+
+        for name, template in events.items():
+            payload = render_event(template, paths)
+            event = json.loads(payload)
+            hooks = matching_hooks(settings, event)
+            if not hooks:
+                continue
+            for key, count in count_subprocesses(hooks, payload, project, env, shim_dir, exec_log).items():
+                subprocesses[f"{key} ({name})"] = count
+            for _ in range(args.runs):
+                wall, results = dispatch(hooks, payload, project, env, args.serial)
+                per_event.setdefault(event["hook_event_name"], []).append(wall)
+                per_event_name.setdefault(name, []).append(wall)
+                for result in results:
+                    key = f"{result['hook']} ({name})"
+                    per_hook.setdefault(key, []).append(result["seconds"])
+                    decisions[key] = result["decision"]
+                    exits[key] = result["exit"]
+
+    hook_rows = {k: {**summarize(v), "procs": subprocesses.get(k, 0), "decision": decisions[k], "exit": exits[k]}
+                 for k, v in per_hook.items()}
+    return {
+        "transcript_lines": lines,
+        "hooks": hook_rows,
+        "events": {k: summarize(v) for k, v in per_event_name.items()},
+        "event_types": {k: summarize(v) for k, v in per_event.items()},
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded events through the hook stack")
+    parser.add_argument("--settings", type=Path, default=TEMPLATES_DIR / "settings.json",
+                        help="settings.json whose hooks to run (default: templates/settings.json)")
+    parser.add_argument("--event", nargs="*", help="Event files to replay (stem, default: all)")
+    parser.add_argument("--runs", type=int, default=10, help="Replays per event")
+    parser.add_argument("--transcript-lines", nargs="*", type=int, default=[200, 5000],
+                        help="Synthetic transcript sizes (lines) to benchmark")
+    parser.add_argument("--line-bytes", type=int, default=400, help="Text per transcript line")
+    parser.add_argument("--serial", action="store_true", help="Run an event's hooks one after another")
+    parser.add_argument("--fake-bd", action="store_true", help="Use a stub bd even if bd is installed")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    events = load_events(args.event)
+    if not events:
+        print(f"No events found in {EVENTS_DIR}", file=sys.stderr)
+        return 1
+
+    reports = []
+    for lines in args.transcript_lines:
+        report = bench_size(args, args.settings, lines, events)
+        reports.append(report)
+        print(f"\n=== transcript: {lines} lines x {args.line_bytes} bytes, {args.runs} runs per event ===")
+        print_table("Per event type (wall time of all matching hooks)", report["event_types"])
+        print_table("Per event", report["events"])
+        print_table("Per hook (procs = processes spawned, incl. the hook itself)", report["hooks"], extra="procs")
+        blocked = sorted(k for k, row in report["hooks"].items() if row["exit"] not in (0, 2))
+        if blocked:
+            print(f"\n  WARNING: non-zero exit from {', '.join(blocked)}")
+
+    if args.json:
+        args.json.write_text(json.dumps(reports, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
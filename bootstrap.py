@@ -11,19 +11,35 @@ Creates:
 
 Usage:
     python bootstrap.py [--project-name NAME] [--project-dir DIR] [--with-kanban-ui]
+                        [--dry-run] [--timings] [--profile-hooks]
 
 Modes:
     Default: All agents use Claude Task() directly (claude-only)
     --external-providers: Sets up provider_delegator MCP for Codex/Gemini delegation
+        --delegator-url URL: Connect to a shared delegator daemon instead of stdio
     --antigravity: Sets up Antigravity support
+
+Diagnostics:
+    --dry-run: Plan every file and subprocess action without executing any
+    --timings: Report per-phase wall time and per-subprocess latency
+    --profile-hooks: Record every hook call's timing to .beads/profile/hooks.jsonl
 """
 
 import os
 import sys
 import json
+import copy
+import hashlib
+import time
 import shutil
+import signal
 import stat
 import subprocess
+import tempfile
+import threading
+import filecmp
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 try:
     import tomllib
 except ImportError:
@@ -32,6 +48,8 @@ from pathlib import Path
 from datetime import datetime
 import random
 
+from project_profile import PROFILE_FILE, load_profile, scan_project
+
 # Get the directory where this script lives (lean-orchestration repo)
 SCRIPT_DIR = Path(__file__).parent.resolve()
 TEMPLATES_DIR = SCRIPT_DIR / "templates"
@@ -42,66 +60,350 @@ TEMPLATES_DIR = SCRIPT_DIR / "templates"
 
 CORE_AGENTS = ["scout", "detective", "architect", "scribe", "discovery", "merge-supervisor", "code-reviewer"]
 
+# Per-step subprocess timeouts (seconds). A hung installer fails over to the
+# next method instead of stalling the whole bootstrap.
+INSTALL_TIMEOUT = 180
+COMMAND_TIMEOUT = 60
+PROBE_TIMEOUT = 15
+
+# Tools the install steps look for, probed together before the first step
+PROBED_TOOLS = ["bd", "brew", "npm", "go", "uv", "rams", "wig"]
+
+# Prefix added to hook commands by --profile-hooks (and hook-profiler.py enable)
+HOOK_PROFILER_COMMAND = ".claude/hooks/hook-profiler.py run "
+
 # NOTE: Supervisors are NOT bootstrapped - they are created dynamically by the
 # discovery agent which fetches specialists from the external agents directory
 # and injects the beads workflow.
 
 
 # ============================================================================
-# PROJECT NAME INFERENCE
+# EXECUTION (DRY-RUN PLANNER + TIMINGS)
 # ============================================================================
 
-def infer_project_name(project_dir: Path) -> str:
-    """Auto-infer project name from package files or directory name."""
+class BootstrapRunner:
+    """Performs every side effect of the bootstrap, so it can be planned and timed.
 
-    # Try package.json (Node.js)
-    package_json = project_dir / "package.json"
-    if package_json.exists():
-        try:
-            data = json.loads(package_json.read_text(encoding="utf-8"))
-            if name := data.get("name"):
-                return name.replace("-", " ").replace("_", " ").title()
-        except (json.JSONDecodeError, KeyError):
-            pass
+    All file writes and subprocesses go through this object. In dry-run mode
+    they are recorded as planned actions instead of executed (reads and
+    `which`/version probes still happen, so the plan reflects the real machine).
+    Each numbered step runs inside `phase()`, which records its wall time and
+    the latency of every subprocess it spawned. Independent steps can run in
+    worker threads via `background()`; positive tool probes are cached for the
+    run, and `probe()` fills that cache for several tools at once.
+    """
 
-    # Try pyproject.toml (Python)
-    if tomllib:
-        pyproject = project_dir / "pyproject.toml"
-        if pyproject.exists():
-            try:
-                data = tomllib.loads(pyproject.read_text(encoding="utf-8"))
-                if name := data.get("project", {}).get("name"):
-                    return name.replace("-", " ").replace("_", " ").title()
-                if name := data.get("tool", {}).get("poetry", {}).get("name"):
-                    return name.replace("-", " ").replace("_", " ").title()
-            except Exception:
-                pass
-
-        # Try Cargo.toml (Rust)
-        cargo = project_dir / "Cargo.toml"
-        if cargo.exists():
+    def __init__(self, dry_run: bool = False):
+        self.dry_run = dry_run
+        self.actions: list[str] = []
+        self.phases: list[dict] = []
+        self.started = time.perf_counter()
+        self._local = threading.local()
+        self._which_cache: dict[str, str] = {}
+        self._version_cache: dict[str, str] = {}
+        self._executor: ThreadPoolExecutor = None
+        self._background: list = []
+
+    @property
+    def _current(self) -> dict:
+        return getattr(self._local, "phase", None)
+
+    @contextmanager
+    def phase(self, name: str, background: bool = False):
+        """Time a bootstrap phase (per thread, so background phases time correctly)."""
+        record = {"name": name, "seconds": 0.0, "subprocesses": [], "satisfied": False, "background": background}
+        self.phases.append(record)
+        self._local.phase = record
+        started = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record["seconds"] = time.perf_counter() - started
+            self._local.phase = None
+
+    def satisfied(self) -> None:
+        """Mark the current phase as already satisfied (nothing needed doing)."""
+        if self._current is not None:
+            self._current["satisfied"] = True
+
+    def background(self, name: str, func, *args) -> None:
+        """Start func(*args, log=...) in a worker thread as its own timed phase.
+
+        Output is buffered and printed by `wait_background()` so it doesn't
+        interleave with the foreground steps. Dry runs execute inline.
+        """
+        if self.dry_run:
+            with self.phase(name):
+                func(*args, log=print)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="bootstrap")
+        lines: list[str] = []
+
+        def task():
+            with self.phase(name, background=True):
+                return func(*args, log=lines.append)
+
+        self._background.append((name, self._executor.submit(task), lines))
+
+    def wait_background(self) -> None:
+        """Wait for background steps and print their buffered output."""
+        for name, future, lines in self._background:
             try:
-                data = tomllib.loads(cargo.read_text(encoding="utf-8"))
-                if name := data.get("package", {}).get("name"):
-                    return name.replace("-", " ").replace("_", " ").title()
-            except Exception:
-                pass
-
-    # Try go.mod (Go)
-    go_mod = project_dir / "go.mod"
-    if go_mod.exists():
+                future.result()
+            except Exception as e:
+                lines.append(f"  - Warning: {name} failed: {e}")
+            for line in lines:
+                print(line)
+        self._background = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def which(self, name: str) -> str:
+        """Cached `shutil.which` (only hits are cached; misses may be installed later)."""
+        if name not in self._which_cache:
+            path = shutil.which(name)
+            if path is None:
+                return None
+            self._which_cache[name] = path
+        return self._which_cache[name]
+
+    def tool_version(self, name: str) -> str:
+        """First line of `<tool> --version`, cached on success ('' if unavailable)."""
+        if name in self._version_cache:
+            return self._version_cache[name]
+        if not self.which(name):
+            return ""
         try:
-            content = go_mod.read_text(encoding="utf-8")
-            for line in content.splitlines():
-                if line.startswith("module "):
-                    module_path = line.split()[1]
-                    name = module_path.split("/")[-1]
-                    return name.replace("-", " ").replace("_", " ").title()
-        except Exception:
+            result = subprocess.run([name, "--version"], capture_output=True, text=True, timeout=PROBE_TIMEOUT)
+        except (OSError, subprocess.TimeoutExpired):
+            return ""
+        if result.returncode != 0 or not result.stdout.strip():
+            return ""
+        self._version_cache[name] = result.stdout.strip().splitlines()[0]
+        return self._version_cache[name]
+
+    def probe(self, names: list, versions: list = ()) -> None:
+        """Warm the which/version caches for independent tools in parallel.
+
+        The install steps probe one tool after another (bd, then brew, npm,
+        go...); each version probe spawns a process, so run them all up front.
+        """
+        with ThreadPoolExecutor(max_workers=len(names) + len(versions), thread_name_prefix="probe") as pool:
+            for future in [pool.submit(self.which, name) for name in names] + \
+                    [pool.submit(self.tool_version, name) for name in versions]:
+                future.result()
+
+    def _plan(self, action: str) -> None:
+        self.actions.append(action)
+        print(f"  [dry-run] {action}")
+
+    def run(self, cmd: list, **kwargs) -> subprocess.CompletedProcess:
+        """Run a subprocess (capture_output/text by default), timing it.
+
+        With a `timeout`, an expired command is killed along with everything
+        it started (e.g. both sides of `curl ... | bash`) and reported as a
+        failed result (returncode 124) instead of raising.
+        """
+        kwargs.setdefault("capture_output", True)
+        kwargs.setdefault("text", True)
+        display = " ".join(str(part) for part in cmd)
+        if self.dry_run:
+            cwd = kwargs.get("cwd")
+            self._plan(f"run: {display}" + (f"  (cwd: {cwd})" if cwd else ""))
+            return subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
+
+        started = time.perf_counter()
+        try:
+            if "timeout" in kwargs:
+                return self._run_with_timeout(cmd, **kwargs)
+            return subprocess.run(cmd, **kwargs)
+        finally:
+            if self._current is not None:
+                self._current["subprocesses"].append((display, time.perf_counter() - started))
+
+    @staticmethod
+    def _run_with_timeout(cmd: list, timeout: float, capture_output: bool = False, **kwargs) -> subprocess.CompletedProcess:
+        """subprocess.run in its own process group, so a timeout kills the whole group.
+
+        subprocess.run only kills the direct child; a grandchild still holding
+        the output pipes would keep it waiting after the timeout.
+        """
+        if capture_output:
+            kwargs["stdout"] = kwargs["stderr"] = subprocess.PIPE
+        process = subprocess.Popen(cmd, start_new_session=os.name == "posix", **kwargs)
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            if os.name == "posix":
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            else:
+                process.kill()
+            process.communicate()
+            return subprocess.CompletedProcess(cmd, 124, stdout="", stderr=f"timed out after {timeout}s")
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout=stdout, stderr=stderr)
+
+    def mkdir(self, path: Path) -> None:
+        if self.dry_run:
+            if not path.exists():
+                self._plan(f"mkdir: {path}")
+            return
+        path.mkdir(parents=True, exist_ok=True)
+
+    def touch(self, path: Path) -> None:
+        if self.dry_run:
+            self._plan(f"create: {path}")
+            return
+        path.touch()
+
+    def write_text(self, path: Path, content: str, newline: str = None) -> bool:
+        """Write content atomically (temp file + rename), only if it changed.
+
+        Returns True if the file was (or, in a dry run, would be) written.
+        """
+        # Same newline translation open(..., newline=newline) would apply
+        data = content if newline in ("", "\n") else content.replace("\n", newline or os.linesep)
+        return self._write_bytes(path, data.encode("utf-8"))
+
+    def _write_bytes(self, path: Path, data: bytes) -> bool:
+        try:
+            if path.read_bytes() == data:
+                return False
+        except OSError:
             pass
+        if self.dry_run:
+            self._plan(f"{'update' if path.exists() else 'write'}: {path} ({len(data)} bytes)")
+            return True
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        mode = stat.S_IMODE(path.stat().st_mode) if path.exists() else 0o666 & ~_UMASK
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.chmod(tmp_name, mode)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        return True
+
+    def copy_file(self, source: Path, dest: Path) -> bool:
+        """Copy a file atomically, skipping identical destinations. Returns True if copied."""
+        if dest.exists() and filecmp.cmp(source, dest, shallow=False):
+            return False
+        if self.dry_run:
+            self._plan(f"copy: {source} -> {dest}")
+            return True
+        written = self._write_bytes(dest, source.read_bytes())
+        shutil.copystat(source, dest)
+        return written
+
+    def copy_tree(self, source: Path, dest: Path, ignore=None) -> int:
+        """Make dest mirror the source directory: copy changed files, drop stale ones.
+
+        Returns the number of files copied or removed.
+        """
+        changed = 0
+        wanted = set()
+        for root, dirs, files in os.walk(source):
+            relative = Path(root).relative_to(source)
+            if ignore is not None:
+                ignored = ignore(root, dirs + files)
+                dirs[:] = [d for d in dirs if d not in ignored]
+                files = [f for f in files if f not in ignored]
+            wanted.update(relative / d for d in dirs)
+            for name in files:
+                wanted.add(relative / name)
+                changed += self.copy_file(Path(root) / name, dest / relative / name)
+
+        if dest.exists():
+            # Deepest paths first, so emptied directories can be removed too
+            for path in sorted(dest.rglob("*"), key=lambda p: len(p.parts), reverse=True):
+                if path.relative_to(dest) in wanted:
+                    continue
+                if ignore is not None and path.name in ignore(str(path.parent), [path.name]):
+                    continue  # e.g. __pycache__ created by the installed code itself
+                changed += 1
+                if self.dry_run:
+                    self._plan(f"remove: {path}")
+                elif path.is_dir() and not path.is_symlink():
+                    shutil.rmtree(path)
+                else:
+                    path.unlink()
+        return changed
+
+    def make_executable(self, path: Path) -> None:
+        if self.dry_run:
+            return  # Implied by the write/copy that created it
+        mode = path.stat().st_mode
+        exec_bits = stat.S_IEXEC | stat.S_IXGRP | stat.S_IXOTH
+        if mode & exec_bits != exec_bits:
+            path.chmod(mode | exec_bits)
+
+    def print_plan(self) -> None:
+        print("\n=== Dry Run Plan ===")
+        print(f"  {len(self.actions)} actions planned, nothing was changed.")
+        commands = [a for a in self.actions if a.startswith("run: ")]
+        print(f"  Subprocesses: {len(commands)}")
+        for action in commands:
+            print(f"    - {action[len('run: '):]}")
+
+    def print_timings(self) -> None:
+        total = (time.perf_counter() - self.started) or 1e-9
+        print("\n=== Timings ===")
+        print(f"  {'Phase':<28} {'Wall':>8} {'Share':>6}  Subprocesses")
+        for p in self.phases:
+            note = "  (already satisfied)" if p["satisfied"] else ""
+            if p["background"]:
+                note += "  (background, overlapped)"
+            print(f"  {p['name']:<28} {p['seconds']:>7.3f}s {p['seconds'] / total:>6.0%}  {len(p['subprocesses'])}{note}")
+        print(f"  {'TOTAL (wall)':<28} {total:>7.3f}s")
+
+        calls = [(p["name"], cmd, secs) for p in self.phases for cmd, secs in p["subprocesses"]]
+        if calls:
+            print("\n  Slowest subprocesses:")
+            for phase_name, cmd, secs in sorted(calls, key=lambda c: c[2], reverse=True)[:10]:
+                print(f"    {secs:>7.3f}s  [{phase_name}] {cmd[:80]}")
+
+
+# Shared runner; configured from the command line in main()
+RUNNER = BootstrapRunner()
+
+# Process umask, applied to files created via temp file + rename
+_UMASK = os.umask(0)
+os.umask(_UMASK)
 
-    # Fallback to directory name
-    return project_dir.name.replace("-", " ").replace("_", " ").title()
+
+# ============================================================================
+# PROJECT NAME INFERENCE
+# ============================================================================
+
+def project_profile(project_dir: Path):
+    """The profile saved by an earlier bootstrap if the project root is unchanged, else a fresh scan."""
+    return load_profile(project_dir) or scan_project(project_dir)
+
+
+def infer_project_name(project_dir: Path) -> str:
+    """Auto-infer project name from package files or directory name.
+
+    Uses the shared project profile (single directory scan, lazily parsed
+    manifests): package.json, pyproject.toml, Cargo.toml, go.mod, then the
+    directory name.
+    """
+    return project_profile(project_dir).display_name
+
+
+def save_project_profile(project_dir: Path) -> None:
+    """Persist the project profile to .beads/ for the discovery agent."""
+    profile = project_profile(project_dir)
+    RUNNER.write_text(project_dir / PROFILE_FILE, json.dumps(profile.to_dict(), indent=2) + "\n")
+    stack = ", ".join(profile.languages + profile.frameworks) or "no manifests detected"
+    print(f"  - Wrote {PROFILE_FILE.as_posix()} ({stack})")
 
 
 # ============================================================================
@@ -115,22 +417,155 @@ def replace_placeholders(content: str, replacements: dict) -> str:
     return content
 
 
-def copy_and_replace(source: Path, dest: Path, replacements: dict) -> None:
-    """Copy file and replace placeholders."""
+def copy_and_replace(source: Path, dest: Path, replacements: dict) -> bool:
+    """Copy file and replace placeholders. Returns False if dest was already up to date."""
     content = source.read_text(encoding="utf-8")
     updated = replace_placeholders(content, replacements)
-    dest.parent.mkdir(parents=True, exist_ok=True)
-    
+
     # Force LF line endings for shell scripts to ensure compatibility on Windows
     if source.suffix == '.sh':
-        with open(dest, "w", newline="\n", encoding="utf-8") as f:
-            f.write(updated)
+        written = RUNNER.write_text(dest, updated, newline="\n")
     else:
-        dest.write_text(updated, encoding="utf-8")
+        written = RUNNER.write_text(dest, updated)
 
     # Preserve executable permissions for shell scripts
     if source.suffix == '.sh':
-        dest.chmod(dest.stat().st_mode | stat.S_IEXEC | stat.S_IXGRP | stat.S_IXOTH)
+        RUNNER.make_executable(dest)
+    return written
+
+
+# ============================================================================
+# CONFIG MERGING
+# ============================================================================
+# Config files are merged, not overwritten: the desired state is applied to
+# the parsed file, the structural difference is computed, and the file is only
+# rewritten (atomically, via RUNNER.write_text) when that difference is
+# non-empty. Repeated bootstraps therefore produce no churn.
+
+def _json_diff(before, after, prefix: str = "") -> list:
+    """List the key paths that differ between two JSON values ('+', '-', '~')."""
+    if isinstance(before, dict) and isinstance(after, dict):
+        changes = []
+        for key in after:
+            path = f"{prefix}.{key}" if prefix else key
+            if key not in before:
+                changes.append(f"+ {path}")
+            else:
+                changes += _json_diff(before[key], after[key], path)
+        changes += [f"- {prefix + '.' if prefix else ''}{key}" for key in before if key not in after]
+        return changes
+    return [] if before == after else [f"~ {prefix or '(root)'}"]
+
+
+def merge_json_file(path: Path, merge) -> list:
+    """Apply merge(config) to the JSON file at path, writing only on change.
+
+    Args:
+        path: JSON file (missing or invalid files start from {})
+        merge: Callable mutating the parsed config in place
+
+    Returns:
+        Changed key paths (empty if the file was left untouched)
+    """
+    existing = {}
+    if path.exists():
+        try:
+            existing = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            print(f"  - Warning: Invalid {path.name}, creating new one")
+            existing = {}
+
+    desired = copy.deepcopy(existing)
+    merge(desired)
+
+    changes = _json_diff(existing, desired)
+    if changes:
+        RUNNER.write_text(path, json.dumps(desired, indent=2))
+    return changes
+
+
+def unwrap_hook_command(command: str) -> str:
+    """Strip the hook profiler prefix, if any."""
+    return command[len(HOOK_PROFILER_COMMAND):] if command.startswith(HOOK_PROFILER_COMMAND) else command
+
+
+def merge_settings_hooks(settings: dict, template: dict, profile_hooks: bool = False) -> None:
+    """Merge template settings into existing settings in place.
+
+    Hook groups are matched by event + matcher and hooks by command, so hooks
+    the user added are kept and template hooks are added once. Template hook
+    fields (e.g. timeout) win; other user settings are preserved. Commands
+    already wrapped by the hook profiler stay wrapped, and profile_hooks wraps
+    every template hook.
+    """
+    for key, value in template.items():
+        if key != "hooks":
+            settings.setdefault(key, copy.deepcopy(value))
+            continue
+        hooks = settings.setdefault("hooks", {})
+        for event, groups in value.items():
+            current_groups = hooks.setdefault(event, [])
+            for group in groups:
+                current = next((g for g in current_groups if g.get("matcher") == group.get("matcher")), None)
+                if current is None:
+                    current_groups.append(copy.deepcopy(group))
+                    continue
+                current_hooks = current.setdefault("hooks", [])
+                for hook in group.get("hooks", []):
+                    existing_hook = next((h for h in current_hooks
+                                          if unwrap_hook_command(h.get("command", "")) == hook.get("command")), None)
+                    if existing_hook is None:
+                        current_hooks.append(copy.deepcopy(hook))
+                    else:
+                        command = existing_hook.get("command")
+                        existing_hook.update(copy.deepcopy(hook))
+                        existing_hook["command"] = command
+
+    if profile_hooks:
+        template_commands = {hook.get("command") for groups in template.get("hooks", {}).values()
+                             for group in groups for hook in group.get("hooks", [])}
+        for groups in settings.get("hooks", {}).values():
+            for group in groups:
+                for hook in group.get("hooks", []):
+                    if hook.get("command") in template_commands:
+                        hook["command"] = HOOK_PROFILER_COMMAND + hook["command"]
+
+
+def merge_line_blocks(path: Path, blocks: list) -> list:
+    """Ensure each (comment, entries) block's entries appear in a line-oriented file.
+
+    Scans the file once. Missing entries are inserted under their block's
+    comment if it already exists, otherwise the block is appended once.
+    Entries match with or without a trailing slash.
+
+    Returns:
+        Entries that were added (empty if the file was left untouched)
+    """
+    content = path.read_text(encoding="utf-8") if path.exists() else ""
+    lines = content.splitlines()
+    present = {line.strip().rstrip("/") for line in lines}
+
+    added = []
+    for comment, entries in blocks:
+        missing = [entry for entry in entries if entry.rstrip("/") not in present]
+        if not missing:
+            continue
+        added += missing
+        present.update(entry.rstrip("/") for entry in missing)
+        if comment in lines:
+            # Insert after the last entry of the existing block
+            index = lines.index(comment) + 1
+            while index < len(lines) and lines[index].strip() and not lines[index].startswith("#"):
+                index += 1
+            lines[index:index] = missing
+        else:
+            if lines and lines[-1].strip():
+                lines.append("")
+            lines += [comment] + missing
+
+    if added:
+        RUNNER.write_text(path, "\n".join(lines) + "\n")
+    return added
 
 
 # ============================================================================
@@ -140,78 +575,181 @@ def copy_and_replace(source: Path, dest: Path, replacements: dict) -> None:
 # Shared location for provider-delegator (installed once, used by all projects)
 SHARED_MCP_DIR = Path.home() / ".claude" / "mcp-servers" / "provider-delegator"
 
+# Persistent uv cache shared by every install, so reinstalls and upgrades can
+# resolve wheels offline once the cache has been warmed by a first install
+SHARED_UV_CACHE_DIR = Path.home() / ".claude" / "mcp-servers" / ".uv-cache"
+
+# Stamp written after a successful install; compared on every bootstrap run
+INSTALL_STAMP_FILE = ".install-stamp.json"
+
+# Source entries never copied into (or hashed for) the shared install
+DELEGATOR_IGNORED_NAMES = {".venv", "__pycache__", ".pytest_cache", INSTALL_STAMP_FILE}
+
+
+def _iter_delegator_files(source_dir: Path):
+    """Yield source files relevant to the install, in a stable order."""
+    for path in sorted(source_dir.rglob("*")):
+        relative = path.relative_to(source_dir)
+        if any(part in DELEGATOR_IGNORED_NAMES for part in relative.parts):
+            continue
+        if path.is_file():
+            yield relative, path
+
+
+def compute_delegator_stamp(source_dir: Path) -> dict:
+    """Compute the version/hash stamp identifying a provider-delegator source tree."""
+    source_hash = hashlib.sha256()
+    for relative, path in _iter_delegator_files(source_dir):
+        source_hash.update(relative.as_posix().encode("utf-8"))
+        source_hash.update(b"\0")
+        source_hash.update(path.read_bytes())
+        source_hash.update(b"\0")
+
+    lock_file = source_dir / "uv.lock"
+    lock_hash = hashlib.sha256(lock_file.read_bytes()).hexdigest() if lock_file.exists() else ""
+
+    version = ""
+    pyproject = source_dir / "pyproject.toml"
+    if tomllib and pyproject.exists():
+        try:
+            data = tomllib.loads(pyproject.read_text(encoding="utf-8"))
+            version = data.get("project", {}).get("version", "")
+        except Exception:
+            pass
+
+    return {
+        "version": version,
+        "source_hash": source_hash.hexdigest(),
+        "lock_hash": lock_hash,
+    }
+
+
+def read_install_stamp(install_dir: Path) -> dict:
+    """Read the stamp of an existing install (empty dict if missing or invalid)."""
+    stamp_file = install_dir / INSTALL_STAMP_FILE
+    if not stamp_file.exists():
+        return {}
+    try:
+        return json.loads(stamp_file.read_text(encoding="utf-8"))
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def _run_uv_sync(venv_dir: Path) -> subprocess.CompletedProcess:
+    """Install exactly what uv.lock pins, offline first, online on cache miss."""
+    env = {
+        **os.environ,
+        "UV_CACHE_DIR": str(SHARED_UV_CACHE_DIR),
+        "UV_PROJECT_ENVIRONMENT": str(venv_dir),
+    }
+    cmd = ["uv", "sync", "--frozen", "--no-dev"]
+
+    result = RUNNER.run(cmd + ["--offline"], cwd=SHARED_MCP_DIR, env=env, timeout=INSTALL_TIMEOUT)
+    if result.returncode == 0:
+        print("  - Synced from local wheel cache (offline)")
+        return result
+
+    print("  - Wheel cache incomplete, syncing lockfile from index...")
+    return RUNNER.run(cmd, cwd=SHARED_MCP_DIR, env=env, timeout=INSTALL_TIMEOUT)
+
 
 def setup_provider_delegator() -> Path:
     """Set up provider-delegator in shared location (~/.claude/mcp-servers/provider-delegator/).
 
-    This installs once and is reused by all projects.
+    This installs once and is reused by all projects. The install is stamped with
+    the package version plus hashes of the source tree and uv.lock; it is only
+    redone when one of them changes. Dependencies are synced from uv.lock through
+    a persistent local wheel cache, so upgrades work without network access.
     Returns path to venv python.
     """
     print("\n[0/8] Setting up provider-delegator (shared)...")
+    started = time.perf_counter()
 
     source_dir = SCRIPT_DIR / "mcp-provider-delegator"
     venv_dir = SHARED_MCP_DIR / ".venv"
     venv_python = venv_dir / "bin" / "python"
 
-    # Check if already installed in shared location
-    if venv_python.exists():
-        print(f"  - Already installed at {SHARED_MCP_DIR}")
-        return venv_python
-
     # Verify source exists
     if not source_dir.exists():
+        if venv_python.exists():
+            # Nothing to compare against - keep whatever is installed
+            print(f"  - Already installed at {SHARED_MCP_DIR} (source not available to check for updates)")
+            return venv_python
         print(f"  ERROR: mcp-provider-delegator not found at {source_dir}")
         print("  Make sure you cloned the full lean-orchestration repo")
         return None
 
+    stamp = compute_delegator_stamp(source_dir)
+    installed = read_install_stamp(SHARED_MCP_DIR)
+
+    # Check if this exact source/lockfile is already installed in shared location
+    if venv_python.exists() and all(installed.get(key) == value for key, value in stamp.items()):
+        print(f"  - Already installed at {SHARED_MCP_DIR} (v{stamp['version']}, up to date)")
+        RUNNER.satisfied()
+        return venv_python
+
+    if venv_python.exists():
+        if installed.get("lock_hash") != stamp["lock_hash"]:
+            print("  - uv.lock changed, reinstalling...")
+        else:
+            print(f"  - Source changed (v{installed.get('version', '?')} -> v{stamp['version']}), reinstalling...")
+
     # Check if uv is available
-    if not shutil.which("uv"):
+    if not RUNNER.which("uv"):
         print("  ERROR: 'uv' not found. Install with: curl -LsSf https://astral.sh/uv/install.sh | sh")
         return None
 
     # Create shared directory
     print(f"  - Installing to {SHARED_MCP_DIR}")
-    SHARED_MCP_DIR.mkdir(parents=True, exist_ok=True)
+    RUNNER.mkdir(SHARED_MCP_DIR)
 
     # Copy source to shared location
+    phase_started = time.perf_counter()
     print("  - Copying source files...")
     for item in source_dir.iterdir():
-        if item.name == ".venv":
-            continue  # Skip any existing venv in source
+        if item.name in DELEGATOR_IGNORED_NAMES:
+            continue  # Skip any existing venv/caches in source
         dest = SHARED_MCP_DIR / item.name
         if item.is_dir():
-            if dest.exists():
-                shutil.rmtree(dest)
-            shutil.copytree(item, dest)
+            RUNNER.copy_tree(item, dest, ignore=shutil.ignore_patterns(*DELEGATOR_IGNORED_NAMES))
         else:
-            shutil.copy2(item, dest)
-
-    # Create venv using uv
-    print("  - Creating venv with uv...")
-    result = subprocess.run(
-        ["uv", "venv", str(venv_dir)],
-        cwd=SHARED_MCP_DIR,
-        capture_output=True,
-        text=True
-    )
-    if result.returncode != 0:
-        print(f"  ERROR: Failed to create venv: {result.stderr}")
-        return None
+            RUNNER.copy_file(item, dest)
+    print(f"    ({time.perf_counter() - phase_started:.2f}s)")
+
+    # Create venv using uv (reused across upgrades)
+    if not venv_python.exists():
+        phase_started = time.perf_counter()
+        print("  - Creating venv with uv...")
+        result = RUNNER.run(["uv", "venv", str(venv_dir)], cwd=SHARED_MCP_DIR, timeout=COMMAND_TIMEOUT)
+        if result.returncode != 0:
+            print(f"  ERROR: Failed to create venv: {result.stderr}")
+            return None
+        print(f"    ({time.perf_counter() - phase_started:.2f}s)")
 
     # Install dependencies
-    print("  - Installing dependencies...")
-    result = subprocess.run(
-        ["uv", "pip", "install", "-e", "."],
-        cwd=SHARED_MCP_DIR,
-        capture_output=True,
-        text=True,
-        env={**os.environ, "VIRTUAL_ENV": str(venv_dir)}
-    )
+    phase_started = time.perf_counter()
+    if stamp["lock_hash"]:
+        print("  - Installing locked dependencies (uv.lock)...")
+        result = _run_uv_sync(venv_dir)
+    else:
+        print("  - Installing dependencies (no uv.lock found)...")
+        result = RUNNER.run(
+            ["uv", "pip", "install", "-e", "."],
+            cwd=SHARED_MCP_DIR,
+            env={**os.environ, "VIRTUAL_ENV": str(venv_dir), "UV_CACHE_DIR": str(SHARED_UV_CACHE_DIR)},
+            timeout=INSTALL_TIMEOUT,
+        )
     if result.returncode != 0:
         print(f"  ERROR: Failed to install dependencies: {result.stderr}")
         return None
+    print(f"    ({time.perf_counter() - phase_started:.2f}s)")
+
+    # Stamp last, so an interrupted install is retried on the next run
+    stamp["installed_at"] = datetime.now().isoformat(timespec="seconds")
+    RUNNER.write_text(SHARED_MCP_DIR / INSTALL_STAMP_FILE, json.dumps(stamp, indent=2))
 
-    print(f"  DONE: provider-delegator installed at {SHARED_MCP_DIR}")
+    print(f"  DONE: provider-delegator v{stamp['version']} installed at {SHARED_MCP_DIR} "
+          f"({time.perf_counter() - started:.2f}s)")
     return venv_python
 
 
@@ -227,7 +765,7 @@ def install_beads(project_dir: Path, claude_only: bool = False) -> bool:
     beads_dir = project_dir / ".beads"
 
     # Check if beads is already installed globally
-    beads_installed = shutil.which("bd") is not None
+    beads_installed = RUNNER.which("bd") is not None
 
     if not beads_installed:
         print("  - beads CLI (bd) not found, installing...")
@@ -236,25 +774,17 @@ def install_beads(project_dir: Path, claude_only: bool = False) -> bool:
         installed = False
 
         # Method 1: Homebrew (macOS)
-        if shutil.which("brew") and sys.platform == "darwin":
+        if RUNNER.which("brew") and sys.platform == "darwin":
             print("  - Trying Homebrew...")
-            result = subprocess.run(
-                ["brew", "install", "steveyegge/beads/bd"],
-                capture_output=True,
-                text=True
-            )
+            result = RUNNER.run(["brew", "install", "steveyegge/beads/bd"], timeout=INSTALL_TIMEOUT)
             if result.returncode == 0:
                 installed = True
                 print("  - Installed via Homebrew")
 
         # Method 2: npm (cross-platform)
-        if not installed and shutil.which("npm"):
+        if not installed and RUNNER.which("npm"):
             print("  - Trying npm...")
-            result = subprocess.run(
-                ["npm", "install", "-g", "@beads/bd"],
-                capture_output=True,
-                text=True
-            )
+            result = RUNNER.run(["npm", "install", "-g", "@beads/bd"], timeout=INSTALL_TIMEOUT)
             if result.returncode == 0:
                 installed = True
                 print("  - Installed via npm")
@@ -262,23 +792,15 @@ def install_beads(project_dir: Path, claude_only: bool = False) -> bool:
         # Method 3: curl install script (Linux/macOS/FreeBSD)
         if not installed and sys.platform != "win32":
             print("  - Trying curl install script...")
-            result = subprocess.run(
-                ["bash", "-c", "curl -fsSL https://raw.githubusercontent.com/steveyegge/beads/main/scripts/install.sh | bash"],
-                capture_output=True,
-                text=True
-            )
+            result = RUNNER.run(["bash", "-c", "curl -fsSL https://raw.githubusercontent.com/steveyegge/beads/main/scripts/install.sh | bash"], timeout=INSTALL_TIMEOUT)
             if result.returncode == 0:
                 installed = True
                 print("  - Installed via curl script")
 
         # Method 4: Go install (if Go is available)
-        if not installed and shutil.which("go"):
+        if not installed and RUNNER.which("go"):
             print("  - Trying go install...")
-            result = subprocess.run(
-                ["go", "install", "github.com/steveyegge/beads/cmd/bd@latest"],
-                capture_output=True,
-                text=True
-            )
+            result = RUNNER.run(["go", "install", "github.com/steveyegge/beads/cmd/bd@latest"], timeout=INSTALL_TIMEOUT)
             if result.returncode == 0:
                 installed = True
                 print("  - Installed via go install")
@@ -293,22 +815,20 @@ def install_beads(project_dir: Path, claude_only: bool = False) -> bool:
             print("    Go:      go install github.com/steveyegge/beads/cmd/bd@latest")
             return False
     else:
-        print("  - beads CLI already installed")
+        version = RUNNER.tool_version("bd")
+        print(f"  - beads CLI already installed ({version})" if version else "  - beads CLI already installed")
 
     beads_installed = True
+    # In a dry run the planned install never happened; plan as if it succeeded
+    bd_available = RUNNER.dry_run or RUNNER.which("bd") is not None
 
     # Initialize .beads in project
     if not beads_dir.exists():
         print("  - Initializing .beads directory...")
 
         # Try bd init first
-        if shutil.which("bd"):
-            result = subprocess.run(
-                ["bd", "init"],
-                cwd=project_dir,
-                capture_output=True,
-                text=True
-            )
+        if bd_available:
+            result = RUNNER.run(["bd", "init"], cwd=project_dir, timeout=COMMAND_TIMEOUT)
             if result.returncode == 0:
                 print("  - Initialized via 'bd init'")
             else:
@@ -320,14 +840,9 @@ def install_beads(project_dir: Path, claude_only: bool = False) -> bool:
         print("  - .beads already exists")
 
     # Configure custom 'inreview' status for parallel work workflow
-    if shutil.which("bd"):
+    if bd_available:
         print("  - Configuring custom 'inreview' status...")
-        result = subprocess.run(
-            ["bd", "config", "set", "status.custom", "inreview"],
-            cwd=project_dir,
-            capture_output=True,
-            text=True
-        )
+        result = RUNNER.run(["bd", "config", "set", "status.custom", "inreview"], cwd=project_dir, timeout=COMMAND_TIMEOUT)
         if result.returncode == 0:
             print("  - Added 'inreview' custom status")
         else:
@@ -339,34 +854,34 @@ def install_beads(project_dir: Path, claude_only: bool = False) -> bool:
 
 def _manual_beads_init(beads_dir: Path):
     """Manually create .beads directory structure."""
-    beads_dir.mkdir(exist_ok=True)
-    (beads_dir / "issues.jsonl").touch()
+    RUNNER.mkdir(beads_dir)
+    RUNNER.touch(beads_dir / "issues.jsonl")
     # Create minimal config
     config = {
         "version": "1",
         "mode": "normal"
     }
-    (beads_dir / "config.json").write_text(json.dumps(config, indent=2), encoding="utf-8")
+    RUNNER.write_text(beads_dir / "config.json", json.dumps(config, indent=2))
     print("  - Created .beads manually")
 
 
 def setup_memory(project_dir: Path) -> None:
     """Create .beads/memory/ directory with knowledge store and recall script."""
     memory_dir = project_dir / ".beads" / "memory"
-    memory_dir.mkdir(parents=True, exist_ok=True)
+    RUNNER.mkdir(memory_dir)
 
     # Create empty knowledge store
     knowledge_file = memory_dir / "knowledge.jsonl"
     if not knowledge_file.exists():
-        knowledge_file.touch()
+        RUNNER.touch(knowledge_file)
         print("  - Created .beads/memory/knowledge.jsonl")
 
     # Copy recall script
     recall_src = TEMPLATES_DIR / "memory" / "recall.sh"
     recall_dest = memory_dir / "recall.sh"
     if recall_src.exists():
-        shutil.copy2(recall_src, recall_dest)
-        recall_dest.chmod(recall_dest.stat().st_mode | stat.S_IEXEC | stat.S_IXGRP | stat.S_IXOTH)
+        RUNNER.copy_file(recall_src, recall_dest)
+        RUNNER.make_executable(recall_dest)
         print("  - Copied .beads/memory/recall.sh")
     else:
         print("  - WARNING: recall.sh template not found")
@@ -376,34 +891,34 @@ def setup_memory(project_dir: Path) -> None:
 # RAMS INSTALLATION (Accessibility Review)
 # ============================================================================
 
-def install_rams() -> bool:
-    """Install RAMS accessibility review tool if not already installed."""
-    print("\n  Checking RAMS (accessibility review tool)...")
+def install_rams(log=print) -> bool:
+    """Install RAMS accessibility review tool if not already installed.
+
+    Safe to run in a background thread: all output goes through `log`.
+    """
+    log("\n  Checking RAMS (accessibility review tool)...")
 
     # Check if rams is already installed
-    if shutil.which("rams"):
-        print("  - RAMS already installed")
+    if RUNNER.which("rams"):
+        log("  - RAMS already installed")
+        RUNNER.satisfied()
         return True
 
-    print("  - RAMS not found, installing...")
+    log("  - RAMS not found, installing...")
 
     # Install via curl
     if sys.platform != "win32":
-        result = subprocess.run(
-            ["bash", "-c", "curl -fsSL https://rams.ai/install | bash"],
-            capture_output=True,
-            text=True
-        )
+        result = RUNNER.run(["bash", "-c", "curl -fsSL https://rams.ai/install | bash"], timeout=INSTALL_TIMEOUT)
         if result.returncode == 0:
-            print("  - RAMS installed successfully")
+            log("  - RAMS installed successfully")
             return True
         else:
-            print(f"  - Warning: Could not install RAMS: {result.stderr}")
-            print("  - Frontend supervisors will still work but RAMS review enforcement may fail")
-            print("  - Install manually: curl -fsSL https://rams.ai/install | bash")
+            log(f"  - Warning: Could not install RAMS: {result.stderr}")
+            log("  - Frontend supervisors will still work but RAMS review enforcement may fail")
+            log("  - Install manually: curl -fsSL https://rams.ai/install | bash")
             return False
 
-    print("  - Warning: RAMS installation not supported on Windows")
+    log("  - Warning: RAMS installation not supported on Windows")
     return False
 
 
@@ -411,34 +926,34 @@ def install_rams() -> bool:
 # WEB INTERFACE GUIDELINES INSTALLATION
 # ============================================================================
 
-def install_web_interface_guidelines() -> bool:
-    """Install Web Interface Guidelines review tool if not already installed."""
-    print("\n  Checking Web Interface Guidelines (design review tool)...")
+def install_web_interface_guidelines(log=print) -> bool:
+    """Install Web Interface Guidelines review tool if not already installed.
+
+    Safe to run in a background thread: all output goes through `log`.
+    """
+    log("\n  Checking Web Interface Guidelines (design review tool)...")
 
     # Check if wig is already installed
-    if shutil.which("wig"):
-        print("  - Web Interface Guidelines already installed")
+    if RUNNER.which("wig"):
+        log("  - Web Interface Guidelines already installed")
+        RUNNER.satisfied()
         return True
 
-    print("  - Web Interface Guidelines not found, installing...")
+    log("  - Web Interface Guidelines not found, installing...")
 
     # Install via curl
     if sys.platform != "win32":
-        result = subprocess.run(
-            ["bash", "-c", "curl -fsSL https://vercel.com/design/guidelines/install | bash"],
-            capture_output=True,
-            text=True
-        )
+        result = RUNNER.run(["bash", "-c", "curl -fsSL https://vercel.com/design/guidelines/install | bash"], timeout=INSTALL_TIMEOUT)
         if result.returncode == 0:
-            print("  - Web Interface Guidelines installed successfully")
+            log("  - Web Interface Guidelines installed successfully")
             return True
         else:
-            print(f"  - Warning: Could not install Web Interface Guidelines: {result.stderr}")
-            print("  - Frontend supervisors will still work but WIG review enforcement may fail")
-            print("  - Install manually: curl -fsSL https://vercel.com/design/guidelines/install | bash")
+            log(f"  - Warning: Could not install Web Interface Guidelines: {result.stderr}")
+            log("  - Frontend supervisors will still work but WIG review enforcement may fail")
+            log("  - Install manually: curl -fsSL https://vercel.com/design/guidelines/install | bash")
             return False
 
-    print("  - Warning: Web Interface Guidelines installation not supported on Windows")
+    log("  - Warning: Web Interface Guidelines installation not supported on Windows")
     return False
 
 
@@ -456,7 +971,7 @@ def copy_agents(project_dir: Path, project_name: str, claude_only: bool = False,
     print(f"\n{step} Copying core agent templates...")
 
     agents_dir = project_dir / ".claude" / "agents"
-    agents_dir.mkdir(parents=True, exist_ok=True)
+    RUNNER.mkdir(agents_dir)
 
     agents_template_dir = TEMPLATES_DIR / "agents"
 
@@ -470,9 +985,9 @@ def copy_agents(project_dir: Path, project_name: str, claude_only: bool = False,
     # Copy core agents ONLY (not supervisors)
     for agent_file in agents_template_dir.glob("*.md"):
         dest = agents_dir / agent_file.name
-        copy_and_replace(agent_file, dest, replacements)
+        written = copy_and_replace(agent_file, dest, replacements)
         copied.append(agent_file.name)
-        print(f"  - Copied {agent_file.name}")
+        print(f"  - Copied {agent_file.name}" if written else f"  - {agent_file.name} unchanged")
 
     # Copy beads workflow injection snippet (used by discovery agent)
     # Select API version (with git fallback) or git-only version based on flag
@@ -484,21 +999,21 @@ def copy_agents(project_dir: Path, project_name: str, claude_only: bool = False,
         workflow_type = "git only"
     beads_workflow_dest = project_dir / ".claude" / "beads-workflow-injection.md"
     if beads_workflow_src.exists():
-        shutil.copy2(beads_workflow_src, beads_workflow_dest)
+        RUNNER.copy_file(beads_workflow_src, beads_workflow_dest)
         print(f"  - Copied beads-workflow-injection.md ({workflow_type})")
 
     # Copy UI constraints (used by discovery agent for frontend supervisors)
     ui_constraints_src = TEMPLATES_DIR / "ui-constraints.md"
     ui_constraints_dest = project_dir / ".claude" / "ui-constraints.md"
     if ui_constraints_src.exists():
-        shutil.copy2(ui_constraints_src, ui_constraints_dest)
+        RUNNER.copy_file(ui_constraints_src, ui_constraints_dest)
         print("  - Copied ui-constraints.md")
 
     # Copy frontend reviews requirement (RAMS + Web Interface Guidelines)
     frontend_reviews_src = TEMPLATES_DIR / "frontend-reviews-requirement.md"
     frontend_reviews_dest = project_dir / ".claude" / "frontend-reviews-requirement.md"
     if frontend_reviews_src.exists():
-        shutil.copy2(frontend_reviews_src, frontend_reviews_dest)
+        RUNNER.copy_file(frontend_reviews_src, frontend_reviews_dest)
         print("  - Copied frontend-reviews-requirement.md")
 
     print(f"  DONE: {len(copied)} core agents copied")
@@ -524,16 +1039,14 @@ def copy_skills(project_dir: Path, claude_only: bool = False) -> list:
         return []
 
     skills_dir = project_dir / ".claude" / "skills"
-    skills_dir.mkdir(parents=True, exist_ok=True)
+    RUNNER.mkdir(skills_dir)
 
     copied = []
 
     for skill_dir in skills_template_dir.iterdir():
         if skill_dir.is_dir():
             dest_dir = skills_dir / skill_dir.name
-            if dest_dir.exists():
-                shutil.rmtree(dest_dir)
-            shutil.copytree(skill_dir, dest_dir)
+            RUNNER.copy_tree(skill_dir, dest_dir)
             copied.append(skill_dir.name)
             print(f"  - Copied {skill_dir.name}/ skill")
 
@@ -556,7 +1069,7 @@ def copy_hooks(project_dir: Path, claude_only: bool = False) -> list:
     print(f"\n{step} Copying hook templates...")
 
     hooks_dir = project_dir / ".claude" / "hooks"
-    hooks_dir.mkdir(parents=True, exist_ok=True)
+    RUNNER.mkdir(hooks_dir)
 
     hooks_template_dir = TEMPLATES_DIR / "hooks"
     copied = []
@@ -574,12 +1087,17 @@ def copy_hooks(project_dir: Path, claude_only: bool = False) -> list:
         
         # Ensure LF line endings for shell scripts
         content = hook_file.read_text(encoding="utf-8")
-        with open(dest, "w", newline="\n", encoding="utf-8") as f:
-            f.write(content)
-            
-        dest.chmod(dest.stat().st_mode | stat.S_IEXEC | stat.S_IXGRP | stat.S_IXOTH)
+        written = RUNNER.write_text(dest, content, newline="\n")
+        RUNNER.make_executable(dest)
         copied.append(hook_file.name)
-        print(f"  - Copied {hook_file.name}")
+        print(f"  - Copied {hook_file.name}" if written else f"  - {hook_file.name} unchanged")
+
+    # Python tools: hook profiler (opt-in wrapper, see --profile-hooks), worktree pool, epic scheduler
+    for tool_src in sorted(hooks_template_dir.glob("*.py")):
+        tool_dest = hooks_dir / tool_src.name
+        written = RUNNER.write_text(tool_dest, tool_src.read_text(encoding="utf-8"), newline="\n")
+        RUNNER.make_executable(tool_dest)
+        print(f"  - Copied {tool_src.name}" if written else f"  - {tool_src.name} unchanged")
 
     print(f"  DONE: {len(copied)} hooks copied")
     return copied
@@ -589,12 +1107,13 @@ def copy_hooks(project_dir: Path, claude_only: bool = False) -> list:
 # SETTINGS
 # ============================================================================
 
-def copy_settings(project_dir: Path, claude_only: bool = False) -> None:
-    """Copy settings.json template, optionally removing provider enforcement hooks.
+def copy_settings(project_dir: Path, claude_only: bool = False, profile_hooks: bool = False) -> None:
+    """Merge settings.json template into the project's settings (user hooks are kept).
 
     Args:
         project_dir: Target project directory
         claude_only: If True, remove provider delegation enforcement from settings
+        profile_hooks: If True, run every template hook through hook-profiler.py
     """
     step = "[5/7]" if claude_only else "[5/8]"
     print(f"\n{step} Copying settings...")
@@ -602,12 +1121,18 @@ def copy_settings(project_dir: Path, claude_only: bool = False) -> None:
     settings_template = TEMPLATES_DIR / "settings.json"
     settings_dest = project_dir / ".claude" / "settings.json"
 
-    # Settings are the same for both modes now (no provider-specific hooks)
-    shutil.copy2(settings_template, settings_dest)
-    if claude_only:
-        print("  - Copied settings.json (claude-only mode)")
+    # Settings are the same for both modes now (no provider-specific hooks).
+    # Merged into any existing settings so user additions survive re-bootstraps.
+    template = json.loads(settings_template.read_text(encoding="utf-8"))
+    changes = merge_json_file(settings_dest, lambda settings: merge_settings_hooks(settings, template, profile_hooks))
+    mode_note = " (claude-only mode)" if claude_only else ""
+    if changes:
+        print(f"  - Merged settings.json{mode_note}: {len(changes)} change(s)")
     else:
-        print("  - Copied settings.json")
+        print(f"  - settings.json already up to date{mode_note}")
+    if profile_hooks:
+        print("  - Hook profiling enabled: records in .beads/profile/hooks.jsonl")
+        print("    Summary: .claude/hooks/hook-profiler.py summary")
 
     print("  DONE: settings configured")
 
@@ -630,11 +1155,11 @@ def copy_antigravity_templates(project_dir: Path) -> None:
         return
 
     # Create destination directory
-    dest_dir.mkdir(parents=True, exist_ok=True)
+    RUNNER.mkdir(dest_dir)
     dest_file = dest_dir / "SKILL.md"
 
     # Copy file
-    shutil.copy2(source, dest_file)
+    RUNNER.copy_file(source, dest_file)
     print(f"  - Created {dest_file}")
     print("  DONE: Antigravity support configured")
 
@@ -663,6 +1188,13 @@ def copy_claude_md(project_dir: Path, project_name: str, claude_only: bool = Fal
 # GITIGNORE
 # ============================================================================
 
+# (comment, entries) blocks bootstrap keeps in the project's .gitignore
+GITIGNORE_BLOCKS = [
+    ("# Beads task tracking (ephemeral)", [".beads/"]),
+    ("# MCP config (user-specific paths)", [".mcp.json"]),
+]
+
+
 def setup_gitignore(project_dir: Path, claude_only: bool = False) -> None:
     """Ensure .beads is in .gitignore. .claude/ is tracked (not ignored)."""
     step = "[7/7]" if claude_only else "[7/8]"
@@ -671,42 +1203,16 @@ def setup_gitignore(project_dir: Path, claude_only: bool = False) -> None:
     gitignore_path = project_dir / ".gitignore"
     # Only ignore .beads/ (ephemeral task data) and .mcp.json (user-specific paths)
     # .claude/ is tracked so it survives git operations
-    entries_to_add = [".beads/", ".mcp.json"]
-
-    if gitignore_path.exists():
-        content = gitignore_path.read_text(encoding="utf-8")
-        lines = content.splitlines()
-
-        # Check which entries are missing
-        missing = []
-        for entry in entries_to_add:
-            # Check for exact match or without trailing slash
-            entry_no_slash = entry.rstrip("/")
-            if entry not in lines and entry_no_slash not in lines:
-                missing.append(entry)
-
-        if missing:
-            # Append missing entries
-            with open(gitignore_path, "a") as f:
-                # Add newline if file doesn't end with one
-                if content and not content.endswith("\n"):
-                    f.write("\n")
-                f.write("\n# Beads task tracking (ephemeral)\n")
-                for entry in missing:
-                    f.write(f"{entry}\n")
-                    print(f"  - Added {entry} to .gitignore")
-        else:
-            print("  - .beads/ and .mcp.json already in .gitignore")
-    else:
-        # Create new .gitignore
-        content = """# Beads task tracking (ephemeral)
-.beads/
+    created = not gitignore_path.exists()
+    added = merge_line_blocks(gitignore_path, GITIGNORE_BLOCKS)
 
-# MCP config (user-specific paths)
-.mcp.json
-"""
-        gitignore_path.write_text(content, encoding="utf-8")
+    if created:
         print("  - Created .gitignore with .beads/ and .mcp.json")
+    elif added:
+        for entry in added:
+            print(f"  - Added {entry} to .gitignore")
+    else:
+        print("  - .beads/ and .mcp.json already in .gitignore")
 
     print("  DONE: .gitignore configured")
     print("  NOTE: .claude/ is tracked (not ignored) to prevent accidental loss")
@@ -716,43 +1222,59 @@ def setup_gitignore(project_dir: Path, claude_only: bool = False) -> None:
 # MCP CONFIG
 # ============================================================================
 
-def create_mcp_config(project_dir: Path, venv_python: Path) -> None:
-    """Add provider-delegator to .mcp.json, preserving existing servers."""
+def create_mcp_config(project_dir: Path, venv_python: Path, delegator_url: str = None) -> None:
+    """Add provider-delegator to .mcp.json, preserving existing servers.
+
+    Args:
+        project_dir: Target project directory
+        venv_python: Python of the shared provider-delegator install
+        delegator_url: If set, connect to a shared delegator daemon at this
+            URL instead of spawning a stdio server per session
+    """
     print("\n[8/8] Configuring MCP...")
 
     mcp_dest = project_dir / ".mcp.json"
+    server_count = 0
+    agents_dir = project_dir / ".claude" / "agents"
 
-    # Load existing config or start fresh
-    if mcp_dest.exists():
-        try:
-            existing = json.loads(mcp_dest.read_text(encoding="utf-8"))
-            print("  - Found existing .mcp.json, merging...")
-        except json.JSONDecodeError:
-            print("  - Warning: Invalid .mcp.json, creating new one")
-            existing = {}
+    def add_delegator(config: dict) -> None:
+        nonlocal server_count
+        # Ensure mcpServers key exists, then add/update provider_delegator
+        servers = config.setdefault("mcpServers", {})
+        if delegator_url:
+            # The daemon serves many projects; headers tell it which one this is
+            servers["provider_delegator"] = {
+                "type": "http",
+                "url": delegator_url,
+                "headers": {
+                    "X-Agent-Templates-Path": str(agents_dir),
+                    "X-Project-Dir": str(project_dir),
+                }
+            }
+        else:
+            servers["provider_delegator"] = {
+                "type": "stdio",
+                "command": str(venv_python),
+                "args": ["-m", "mcp_provider_delegator.server"],
+                "env": {
+                    "AGENT_TEMPLATES_PATH": ".claude/agents"
+                }
+            }
+        server_count = len(servers)
+
+    # Merge into existing config (other servers are preserved)
+    changes = merge_json_file(mcp_dest, add_delegator)
+    if changes:
+        print(f"  - Updated .mcp.json: {', '.join(changes)} ({server_count} total servers)")
     else:
-        existing = {}
-
-    # Ensure mcpServers key exists
-    if "mcpServers" not in existing:
-        existing["mcpServers"] = {}
-
-    # Add/update provider_delegator
-    existing["mcpServers"]["provider_delegator"] = {
-        "type": "stdio",
-        "command": str(venv_python),
-        "args": ["-m", "mcp_provider_delegator.server"],
-        "env": {
-            "AGENT_TEMPLATES_PATH": ".claude/agents"
-        }
-    }
-
-    mcp_dest.write_text(json.dumps(existing, indent=2), encoding="utf-8")
-
-    server_count = len(existing["mcpServers"])
-    print(f"  - Added provider-delegator to .mcp.json ({server_count} total servers)")
-    print(f"    Command: {venv_python}")
-    print(f"    Agents: .claude/agents (relative)")
+        print(f"  - .mcp.json already up to date ({server_count} total servers)")
+    if delegator_url:
+        print(f"    Daemon: {delegator_url}")
+        print(f"    Agents: {agents_dir}")
+        print(f"    Start it with: {venv_python.parent / 'mcp-provider-delegator'} --http")
+    else:
+        print(f"    Command: {venv_python}")
+        print(f"    Agents: .claude/agents (relative)")
     print("  DONE: MCP config updated")
 
 
@@ -810,6 +1332,78 @@ def verify_installation(project_dir: Path, claude_only: bool = False) -> bool:
 # MAIN
 # ============================================================================
 
+def _run_phases(project_dir: Path, project_name: str, claude_only: bool,
+                with_kanban_ui: bool, antigravity: bool, profile_hooks: bool = False,
+                delegator_url: str = None) -> None:
+    """Run the numbered bootstrap steps, each as a timed phase."""
+    with RUNNER.phase("probe tools"):
+        RUNNER.probe(PROBED_TOOLS, versions=["bd"])
+
+    # 2. Install frontend review tools (optional, won't block) - independent of
+    #    every other step, so they run in the background from the start
+    RUNNER.background("install RAMS", install_rams)
+    RUNNER.background("install WIG", install_web_interface_guidelines)
+
+    # 1. Install beads
+    with RUNNER.phase("install beads"):
+        beads_ok = install_beads(project_dir, claude_only)
+    if not beads_ok:
+        RUNNER.wait_background()
+        sys.exit(1)
+
+    # 3. Copy core agents
+    with RUNNER.phase("copy agents"):
+        copy_agents(project_dir, project_name, claude_only, with_kanban_ui)
+
+    # 4. Copy skills
+    with RUNNER.phase("copy skills"):
+        copy_skills(project_dir, claude_only)
+
+    # 5. Copy hooks
+    with RUNNER.phase("copy hooks"):
+        copy_hooks(project_dir, claude_only)
+
+    # 6. Configure settings
+    with RUNNER.phase("settings"):
+        copy_settings(project_dir, claude_only, profile_hooks)
+
+    # 7. Copy CLAUDE.md
+    with RUNNER.phase("CLAUDE.md"):
+        copy_claude_md(project_dir, project_name, claude_only)
+
+    # 8. Setup memory
+    with RUNNER.phase("memory + project profile"):
+        setup_memory(project_dir)
+        save_project_profile(project_dir)
+
+    # 9. Setup .gitignore
+    with RUNNER.phase(".gitignore"):
+        setup_gitignore(project_dir, claude_only)
+
+    # 10. Setup MCP (only for external providers)
+    if not claude_only:
+        with RUNNER.phase("provider-delegator"):
+            venv_python = setup_provider_delegator()
+        if not venv_python:
+            print("ERROR: Failed to setup provider-delegator")
+            sys.exit(1)
+        with RUNNER.phase("MCP config"):
+            create_mcp_config(project_dir, venv_python, delegator_url)
+
+    # 11. Setup Antigravity (if requested)
+    if antigravity:
+        with RUNNER.phase("antigravity"):
+            copy_antigravity_templates(project_dir)
+
+    # Collect the optional installers started in step 2
+    with RUNNER.phase("wait for optional installers"):
+        RUNNER.wait_background()
+
+    # 12. Verify installation (nothing to verify when nothing was written)
+    if not RUNNER.dry_run and verify_installation(project_dir, claude_only):
+        print("\n\033[32mSUCCESS: Orchestration bootstrapped successfully!\033[0m")
+
+
 def main():
     import argparse
 
@@ -820,17 +1414,27 @@ def main():
                         help="Use Codex/Gemini for delegation (default: Claude-only)")
     parser.add_argument("--with-kanban-ui", action="store_true",
                         help="Use Beads Kanban UI API for worktree creation (with git fallback)")
+    parser.add_argument("--delegator-url", default=None, metavar="URL",
+                        help="With --external-providers: use a shared delegator daemon (e.g. http://127.0.0.1:8765/mcp)")
     parser.add_argument("--antigravity", action="store_true",
                         help="Enable Antigravity support (creates .agent/ structure)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Print every file and subprocess action without executing any of them")
+    parser.add_argument("--timings", action="store_true",
+                        help="Report per-phase wall time and per-subprocess latency")
+    parser.add_argument("--profile-hooks", action="store_true",
+                        help="Record hook timings to .beads/profile/hooks.jsonl (see hook-profiler.py summary)")
     args = parser.parse_args()
 
+    RUNNER.dry_run = args.dry_run
+
     project_dir = Path(args.project_dir).resolve()
     claude_only = not args.external_providers  # Default is now claude-only
     with_kanban_ui = args.with_kanban_ui
     antigravity = args.antigravity
 
     # Ensure project directory exists
-    project_dir.mkdir(parents=True, exist_ok=True)
+    RUNNER.mkdir(project_dir)
 
     # Auto-infer project name if not provided
     if args.project_name:
@@ -847,50 +1451,15 @@ def main():
         print("Antigravity:    ENABLED")
 
 
-    # 1. Install beads
-    if not install_beads(project_dir, claude_only):
-        sys.exit(1)
-
-    # 2. Install frontend review tools (optional, won't block)
-    install_rams()
-    install_web_interface_guidelines()
-
-    # 3. Copy core agents
-    copy_agents(project_dir, project_name, claude_only, with_kanban_ui)
-
-    # 4. Copy skills
-    copy_skills(project_dir, claude_only)
-
-    # 5. Copy hooks
-    copy_hooks(project_dir, claude_only)
-
-    # 6. Configure settings
-    copy_settings(project_dir, claude_only)
-
-    # 7. Copy CLAUDE.md
-    copy_claude_md(project_dir, project_name, claude_only)
-
-    # 8. Setup memory
-    setup_memory(project_dir)
-
-    # 9. Setup .gitignore
-    setup_gitignore(project_dir, claude_only)
-
-    # 10. Setup MCP (only for external providers)
-    if not claude_only:
-        venv_python = setup_provider_delegator()
-        if not venv_python:
-            print("ERROR: Failed to setup provider-delegator")
-            sys.exit(1)
-        create_mcp_config(project_dir, venv_python)
-
-    # 11. Setup Antigravity (if requested)
-    if antigravity:
-        copy_antigravity_templates(project_dir)
+    if RUNNER.dry_run:
+        print("Dry Run:        ENABLED (nothing will be changed)")
 
-    # 12. Verify installation
-    if verify_installation(project_dir, claude_only):
-        print("\n\033[32mSUCCESS: Orchestration bootstrapped successfully!\033[0m")
+    try:
+        _run_phases(project_dir, project_name, claude_only, with_kanban_ui, antigravity, args.profile_hooks,
+                    args.delegator_url)
+    except SystemExit:
+        _print_reports(args.timings)
+        raise
 
     print(f"\nBootstrapping beads orchestration for: {project_name}")
     print(f"Directory: {project_dir}")
@@ -962,6 +1531,16 @@ Supervisors are sourced from https://github.com/ayush-that/sub-agents.directory
 with beads workflow injected.
 """)
 
+    _print_reports(args.timings)
+
+
+def _print_reports(show_timings: bool) -> None:
+    """Print the dry-run plan and/or timing report, last so they're easy to find."""
+    if RUNNER.dry_run:
+        RUNNER.print_plan()
+    if show_timings:
+        RUNNER.print_timings()
+
 
 
 
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""Throughput/latency benchmark for the provider delegator, fully offline.
+
+Drives `server.call_tool("invoke_agent", ...)` against the fake codex/gemini
+CLIs in tests/fakes/ at several concurrency levels, and reports throughput,
+p50/p95/p99 latency, provider mix (fallback rate), hangs and peak RSS.
+
+Results are compared against JSON baselines in benchmarks/baselines/:
+outcome rates must match exactly (the fakes are deterministic per prompt),
+latency and throughput must stay within a tolerance.
+
+Usage:
+    python benchmarks/bench_delegator.py                     # Run and compare
+    python benchmarks/bench_delegator.py --quick             # Fewer requests
+    python benchmarks/bench_delegator.py --scenario baseline --concurrency 1 8
+    python benchmarks/bench_delegator.py --update-baseline   # Rewrite baselines
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FAKES_BIN_DIR = ROOT / "tests" / "fakes" / "bin"
+FIXTURES_DIR = ROOT / "tests" / "fixtures"
+BASELINES_DIR = Path(__file__).resolve().parent / "baselines"
+
+# Fake provider settings per scenario (FAKE_<KEY>=<value>)
+SCENARIOS = {
+    "baseline": {
+        "PROVIDER_LATENCY": "lognormal:-3.0,0.3",
+        "PROVIDER_OUTPUT_BYTES": "2048",
+    },
+    "codex_rate_limited": {
+        "PROVIDER_LATENCY": "lognormal:-3.0,0.3",
+        "CODEX_RATE_LIMIT_RATE": "0.3",
+    },
+    "all_rate_limited": {
+        "PROVIDER_LATENCY": "0.01",
+        "PROVIDER_RATE_LIMIT_RATE": "1",
+    },
+    "large_output": {
+        "PROVIDER_LATENCY": "0.02",
+        "PROVIDER_OUTPUT_BYTES": "uniform:131072,524288",
+    },
+    "hangs": {
+        "PROVIDER_LATENCY": "0.02",
+        "CODEX_HANG_RATE": "0.1",
+        "CODEX_HANG_SECONDS": "12",
+    },
+}
+
+# Chain config (DELEGATOR_CHAIN_CONFIG) per scenario; the built-in chain otherwise.
+# Without a provider timeout a hung CLI blocks its request forever; with one
+# it is killed and the request falls through to the next provider.
+CHAIN_CONFIGS = {
+    "hangs": "providers:\n  codex:\n    timeout: 2\n",
+}
+
+# Per-scenario request deadline; requests slower than this count as hung
+DEADLINES = {"hangs": 10.0}
+DEFAULT_DEADLINE = 15.0
+
+DEFAULT_CONCURRENCY = [1, 8, 32]
+
+# Allowed slowdown versus baseline before a metric counts as a regression
+LATENCY_TOLERANCE = 1.5
+# Absolute slack (seconds) so tiny baselines don't flap
+LATENCY_SLACK = 0.05
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def classify(text: str) -> str:
+    """Map a call_tool response to the provider/outcome that produced it."""
+    if text.startswith("[fake-codex]"):
+        return "codex"
+    if text.startswith("[fake-gemini]"):
+        return "gemini"
+    if text.startswith("PROVIDER_FALLBACK_REQUIRED"):
+        return "fallback_hint"
+    if text.startswith("SKIPPED"):
+        return "skip"
+    return "error"
+
+
+def peak_rss_mb(who: int) -> float:
+    """Peak RSS in MB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+async def run_level(server, concurrency: int, requests: int, agent: str, deadline: float) -> dict:
+    """Issue `requests` invoke_agent calls with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    outcomes: dict[str, int] = {}
+
+    async def one(index: int):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(
+                    server.call_tool("invoke_agent", {
+                        "agent": agent,
+                        "task_prompt": f"benchmark request {index}",
+                    }),
+                    timeout=deadline,
+                )
+                outcome = classify(result[0].text)
+            except asyncio.TimeoutError:
+                outcome = "hung"
+            latencies.append(time.perf_counter() - started)
+            outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    answered = sum(n for k, n in outcomes.items() if k in ("codex", "gemini"))
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "throughput_rps": round(requests / elapsed, 2),
+        "p50_s": round(percentile(latencies, 50), 4),
+        "p95_s": round(percentile(latencies, 95), 4),
+        "p99_s": round(percentile(latencies, 99), 4),
+        "mean_s": round(statistics.fmean(latencies), 4),
+        "outcomes": dict(sorted(outcomes.items())),
+        "fallback_rate": round(outcomes.get("gemini", 0) / answered, 4) if answered else 0.0,
+        "peak_rss_mb": round(peak_rss_mb(resource.RUSAGE_SELF), 1),
+        "peak_child_rss_mb": round(peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+    }
+
+
+def configure_scenario(name: str) -> None:
+    """Apply one scenario's FAKE_* settings and chain config."""
+    for key in [k for k in os.environ if k.startswith("FAKE_")]:
+        del os.environ[key]
+    os.environ["FAKE_PROVIDER_PYTHON"] = sys.executable
+    for key, value in SCENARIOS[name].items():
+        os.environ[f"FAKE_{key}"] = value
+
+    path = Path(os.environ["DELEGATOR_CHAIN_CONFIG"])
+    previous = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(CHAIN_CONFIGS.get(name, "{}\n"), encoding="utf-8")
+    # The delegator reloads the config when its mtime changes; make sure it does
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, max(stat.st_mtime_ns, previous + 1)))
+
+
+def compare(name: str, results: list[dict], baseline: dict) -> list[str]:
+    """Return regressions of results against a stored baseline."""
+    problems = []
+    by_level = {r["concurrency"]: r for r in baseline.get("levels", [])}
+    for result in results:
+        base = by_level.get(result["concurrency"])
+        if base is None or base["requests"] != result["requests"]:
+            continue  # Not comparable (different level or request count)
+        level = f"{name}@{result['concurrency']}"
+        if result["outcomes"] != base["outcomes"]:
+            problems.append(f"{level}: outcomes {result['outcomes']} != baseline {base['outcomes']}")
+        for metric in ("p50_s", "p95_s", "p99_s"):
+            limit = base[metric] * LATENCY_TOLERANCE + LATENCY_SLACK
+            if result[metric] > limit:
+                problems.append(f"{level}: {metric} {result[metric]:.4f}s > {limit:.4f}s")
+        if result["throughput_rps"] * LATENCY_TOLERANCE < base["throughput_rps"]:
+            problems.append(f"{level}: throughput {result['throughput_rps']} rps << baseline {base['throughput_rps']}")
+    return problems
+
+
+def print_results(name: str, results: list[dict]) -> None:
+    print(f"\n## {name}")
+    print(f"  {'conc':>4} {'req':>4} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'fallback':>8} {'rss(MB)':>8}  outcomes")
+    for r in results:
+        print(f"  {r['concurrency']:>4} {r['requests']:>4} {r['throughput_rps']:>8.1f} "
+              f"{r['p50_s']:>8.3f} {r['p95_s']:>8.3f} {r['p99_s']:>8.3f} {r['fallback_rate']:>8.1%} "
+              f"{r['peak_rss_mb']:>8.1f}  {r['outcomes']}")
+
+
+async def main_async(args) -> int:
+    os.environ["PATH"] = f"{FAKES_BIN_DIR}{os.pathsep}{os.environ.get('PATH', '')}"
+    os.environ.setdefault("AGENT_TEMPLATES_PATH", str(FIXTURES_DIR))
+    os.environ["DELEGATOR_CHAIN_CONFIG"] = str(Path("chains.yaml").resolve())
+    sys.path.insert(0, str(ROOT / "src"))
+    from mcp_provider_delegator import server
+
+    requests = args.requests or (16 if args.quick else 64)
+    failures = []
+    for name in args.scenario or list(SCENARIOS):
+        configure_scenario(name)
+        deadline = DEADLINES.get(name, DEFAULT_DEADLINE)
+        results = [await run_level(server, c, requests, args.agent, deadline) for c in args.concurrency]
+        print_results(name, results)
+
+        baseline_path = BASELINES_DIR / f"{name}.json"
+        if args.update_baseline:
+            BASELINES_DIR.mkdir(parents=True, exist_ok=True)
+            baseline = {"scenario": name, "settings": SCENARIOS[name], "levels": results}
+            baseline_path.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+            print(f"  baseline written: {baseline_path.relative_to(ROOT)}")
+        elif baseline_path.exists():
+            problems = compare(name, results, json.loads(baseline_path.read_text(encoding="utf-8")))
+            for problem in problems:
+                print(f"  REGRESSION {problem}")
+            failures += problems
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"failures": failures}, indent=2) + "\n", encoding="utf-8")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline delegator benchmark")
+    parser.add_argument("--scenario", nargs="*", choices=list(SCENARIOS), help="Scenarios to run (default: all)")
+    parser.add_argument("--concurrency", nargs="*", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--requests", type=int, default=0, help="Requests per concurrency level")
+    parser.add_argument("--quick", action="store_true", help="16 requests per level instead of 64")
+    parser.add_argument("--agent", default="scout", help="Agent template to invoke")
+    parser.add_argument("--update-baseline", action="store_true", help="Write results as the new baselines")
+    parser.add_argument("--json", help="Also write regressions to this file")
+    args = parser.parse_args()
+
+    # The delegator logs every call and every 429; keep benchmark output readable
+    logging.disable(logging.WARNING)
+
+    if args.json:
+        args.json = str(Path(args.json).resolve())
+    # Run as a throwaway project: the CLIs' cwd, and where large answers spill to .beads/artifacts/
+    with tempfile.TemporaryDirectory(prefix="bench-delegator-") as project:
+        os.chdir(project)
+        return asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,6 @@
 """Agent template loader for reading .md files."""
 
+import hashlib
 import os
 import re
 from dataclasses import dataclass
@@ -18,6 +19,20 @@ class AgentTemplate:
     tools: list[str]
     system_prompt: str
     skills: Optional[list[str]] = None
+    version: str = ""  # Content hash of the template file
+
+    # Tools that can change the working tree
+    WRITE_TOOLS = ("Write", "Edit", "NotebookEdit", "Bash", "*")
+
+    @property
+    def read_only(self) -> bool:
+        """True if the agent's tool list can't modify files."""
+        # Frontmatter may list tools or give them as "Read, Grep, Glob"
+        tools = self.tools if isinstance(self.tools, list) else str(self.tools or "").split(",")
+        # "Bash(git:*)" is still Bash
+        tools = [str(tool).split("(")[0].strip() for tool in tools]
+        tools = [tool for tool in tools if tool]
+        return bool(tools) and not any(tool in self.WRITE_TOOLS for tool in tools)
 
 
 class AgentLoader:
@@ -76,4 +91,5 @@ class AgentLoader:
             tools=frontmatter.get("tools", []),
             skills=frontmatter.get("skills"),
             system_prompt=system_prompt,
+            version=hashlib.sha256(content.encode("utf-8")).hexdigest()[:12],
         )
@@ -0,0 +1,68 @@
+"""Spill oversized agent responses to content-addressed artifact files.
+
+A response longer than the agent's budget is written in full to
+<project>/.beads/artifacts/<sha256 prefix>.md; the orchestrator gets the
+head and tail of it plus the path, so the rest is one Read away instead of
+filling its context.
+"""
+
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+ARTIFACTS_DIR = Path(".beads") / "artifacts"
+
+# Share of the budget shown from the start of the response; the rest is the tail
+HEAD_SHARE = 0.75
+
+
+@dataclass
+class Artifact:
+    """Where a spilled response was stored."""
+    path: Path
+    sha256: str
+    chars: int
+
+
+def store_artifact(text: str, project_dir: Optional[str] = None) -> Artifact:
+    """Write text to the artifact store (once per content) and return its location."""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    directory = Path(project_dir or os.getcwd()) / ARTIFACTS_DIR
+    path = directory / f"{digest[:16]}.md"
+    if not path.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+    return Artifact(path=path.resolve(), sha256=digest, chars=len(text))
+
+
+def apply_budget(text: str, budget: int, project_dir: Optional[str] = None) -> tuple[str, Optional[Artifact]]:
+    """Return text unchanged if it fits the budget, else an excerpt and its artifact.
+
+    A budget of 0 disables spilling.
+    """
+    if budget <= 0 or len(text) <= budget:
+        return text, None
+    try:
+        artifact = store_artifact(text, project_dir)
+    except OSError as e:
+        logger.error(f"Could not spill {len(text)}-char response to artifacts, returning it in full: {e}")
+        return text, None
+
+    head_chars = int(budget * HEAD_SHARE)
+    tail_chars = budget - head_chars
+    omitted = len(text) - head_chars - tail_chars
+    excerpt = (
+        f"{text[:head_chars]}\n\n"
+        f"[... {omitted} chars omitted. Full response ({artifact.chars} chars, sha256 {artifact.sha256}): "
+        f"{artifact.path} ...]\n\n"
+        f"{text[-tail_chars:]}"
+    )
+    logger.info(f"Spilled {artifact.chars}-char response to {artifact.path}")
+    return excerpt, artifact
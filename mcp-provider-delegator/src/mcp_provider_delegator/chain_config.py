@@ -0,0 +1,233 @@
+"""Per-agent provider chains from a YAML or TOML file.
+
+Without a config file the built-in chain is used (Codex, then Gemini; only
+code-reviewer may skip). A file set with DELEGATOR_CHAIN_CONFIG is merged
+over the built-in entries by name, and reloaded whenever it changes; an
+invalid edit is logged and the previous config stays in effect.
+
+    providers:
+      ollama:
+        type: command                  # codex | gemini | command
+        command: ["ollama", "run", "{model}"]
+        model: qwen2.5-coder:7b        # or models: {haiku: ..., sonnet: ...}
+        transport: stdin               # argv | stdin | file
+        read_only_command: ["ollama", "run", "{model}"]   # for read-only agents
+        output: text                   # text | codex-jsonl | gemini-json
+        timeout: 120
+    agents:
+      default:
+        chain: [codex, gemini]
+      scout:
+        chain: [ollama, gemini]
+        models: {gemini: gemini-2.5-flash-lite}
+        timeout: 300
+        read_only: true                # default: agents without Write/Edit/Bash tools
+      scribe:
+        response_budget: 40000         # chars returned inline; the rest spills to .beads/artifacts/
+      code-reviewer:
+        allow_skip: true
+        subagent: superpowers:code-reviewer
+"""
+
+import copy
+import logging
+import os
+import tomllib
+from pathlib import Path
+from typing import Any, Optional
+
+import yaml
+
+from .output_parsers import OUTPUT_PARSERS
+from .provider_client import (
+    AGENT_TO_SUBAGENT,
+    PROMPT_TRANSPORTS,
+    CodexClient,
+    CommandProvider,
+    GeminiClient,
+    ProviderClient,
+)
+
+logger = logging.getLogger(__name__)
+
+PROVIDER_TYPES = ("codex", "gemini", "command")
+
+BUILTIN_CONFIG: dict[str, Any] = {
+    "providers": {
+        "codex": {"type": "codex", "models": dict(CodexClient.MODEL_MAPPING), "model": "gpt-5.2-codex"},
+        "gemini": {"type": "gemini", "model": GeminiClient.model},
+    },
+    "agents": {
+        "default": {"chain": ["codex", "gemini"], "response_budget": 20000},
+        "code-reviewer": {"allow_skip": True},
+    },
+}
+
+
+def merge_config(base: dict, override: dict) -> dict:
+    """Overlay a config file on the built-in config, entry by entry."""
+    merged = copy.deepcopy(base)
+    for section in ("providers", "agents"):
+        entries = override.get(section) or {}
+        if not isinstance(entries, dict):
+            raise ValueError(f"'{section}' must be a mapping of names to settings")
+        for name, entry in entries.items():
+            if not isinstance(entry, dict):
+                raise ValueError(f"{section[:-1]} {name}: settings must be a mapping")
+            merged[section][name] = {**merged[section].get(name, {}), **entry}
+    return merged
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_config(config: dict) -> None:
+    """Raises ValueError describing the first problem in a merged config."""
+    providers = config["providers"]
+    for name, entry in providers.items():
+        kind = entry.get("type", "command")
+        if kind not in PROVIDER_TYPES:
+            raise ValueError(f"provider {name}: unknown type '{kind}'")
+        if kind == "command":
+            command = entry.get("command")
+            if not isinstance(command, list) or not command:
+                raise ValueError(f"provider {name}: 'command' must be a non-empty list")
+            read_only_command = entry.get("read_only_command")
+            if read_only_command is not None and (not isinstance(read_only_command, list) or not read_only_command):
+                raise ValueError(f"provider {name}: 'read_only_command' must be a non-empty list")
+            transport = entry.get("transport", "stdin")
+            if transport not in PROMPT_TRANSPORTS:
+                raise ValueError(f"provider {name}: unknown transport '{transport}'")
+            for template in (command, read_only_command or command):
+                if transport == "argv" and "{prompt}" not in template:
+                    raise ValueError(f"provider {name}: argv transport needs a '{{prompt}}' argument")
+            if entry.get("output", "text") not in OUTPUT_PARSERS:
+                raise ValueError(f"provider {name}: unknown output format '{entry['output']}'")
+        if entry.get("timeout") is not None and not _is_number(entry["timeout"]):
+            raise ValueError(f"provider {name}: 'timeout' must be a number of seconds")
+    for agent, entry in config["agents"].items():
+        if not isinstance(entry.get("chain", []), list):
+            raise ValueError(f"agent {agent}: 'chain' must be a list of providers")
+        for key in ("timeout", "response_budget"):
+            if entry.get(key) is not None and not _is_number(entry[key]):
+                raise ValueError(f"agent {agent}: '{key}' must be a number")
+        for provider in entry.get("chain", []):
+            if provider not in providers:
+                raise ValueError(f"agent {agent}: unknown provider '{provider}' in chain")
+    if not config["agents"].get("default", {}).get("chain"):
+        raise ValueError("agents.default.chain must list at least one provider")
+
+
+def load_config_file(path: Path) -> dict:
+    """Parse a .toml or .yaml/.yml config file."""
+    text = path.read_text(encoding="utf-8")
+    data = tomllib.loads(text) if path.suffix == ".toml" else yaml.safe_load(text)
+    if not isinstance(data, dict):
+        raise ValueError("config must be a mapping with 'providers' and/or 'agents'")
+    return data
+
+
+class ChainConfig:
+    """The active chain config, reloaded when its file changes."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self.config = merge_config(BUILTIN_CONFIG, {})
+        self._mtime: Optional[int] = None
+
+    def current(self) -> dict:
+        """The merged config, re-read first if the file changed."""
+        if not self.path:
+            return self.config
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except OSError as e:
+            if self._mtime is not None:
+                logger.error(f"[ChainConfig] {self.path} unavailable, keeping last config: {e}")
+                self._mtime = None
+            return self.config
+        if mtime != self._mtime:
+            self._mtime = mtime
+            try:
+                config = merge_config(BUILTIN_CONFIG, load_config_file(self.path))
+                validate_config(config)
+            except (OSError, ValueError, TypeError, AttributeError, yaml.YAMLError) as e:
+                logger.error(f"[ChainConfig] Invalid {self.path}, keeping last config: {e}")
+            else:
+                self.config = config
+                logger.info(f"[ChainConfig] Loaded {self.path}")
+        return self.config
+
+    def agent(self, agent_name: str) -> dict:
+        """Settings for one agent, falling back to agents.default."""
+        agents = self.current()["agents"]
+        return {**agents["default"], **agents.get(agent_name, {})}
+
+    def build_providers(
+        self,
+        agent_name: str,
+        agent_model: str,
+        cwd: Optional[str] = None,
+        read_only: bool = False,
+    ) -> list[ProviderClient]:
+        """Provider clients for an agent's chain, in order.
+
+        read_only (from the agent's tools, overridable per agent with
+        `read_only:`) selects Codex's read-only sandbox, Gemini's default
+        approval mode and a command provider's read_only_command.
+        """
+        config = self.current()
+        agent = self.agent(agent_name)
+        read_only = agent.get("read_only", read_only)
+        providers = []
+        for name in agent["chain"]:
+            entry = config["providers"][name]
+            model = (
+                (agent.get("models") or {}).get(name)
+                or (entry.get("models") or {}).get(agent_model)
+                or entry.get("model", "")
+            )
+            timeout = agent.get("timeout") or entry.get("timeout")
+            kind = entry.get("type", "command")
+            if kind == "codex":
+                providers.append(CodexClient(model=model, cwd=cwd, timeout=timeout, read_only=read_only))
+            elif kind == "gemini":
+                providers.append(GeminiClient(model=model, cwd=cwd, timeout=timeout, read_only=read_only))
+            else:
+                providers.append(CommandProvider(
+                    name=name,
+                    command=entry["command"],
+                    model=model,
+                    transport=entry.get("transport", "stdin"),
+                    stdin_arg=entry.get("stdin_arg"),
+                    install_hint=entry.get("install_hint", ""),
+                    output=entry.get("output", "text"),
+                    cwd=cwd,
+                    timeout=timeout,
+                    read_only_command=entry.get("read_only_command"),
+                    read_only=read_only,
+                ))
+        return providers
+
+    def response_budget(self, agent_name: str) -> int:
+        """Max response chars returned inline (0: unlimited)."""
+        return int(self.agent(agent_name).get("response_budget") or 0)
+
+    def allow_skip(self, agent_name: str) -> bool:
+        return bool(self.agent(agent_name).get("allow_skip", False))
+
+    def subagent(self, agent_name: str) -> str:
+        """Claude Task subagent_type suggested when every provider fails."""
+        return self.agent(agent_name).get("subagent") or AGENT_TO_SUBAGENT.get(agent_name, "general-purpose")
+
+
+_chain_config: Optional[ChainConfig] = None
+
+
+def get_chain_config() -> ChainConfig:
+    """Process-wide chain config from DELEGATOR_CHAIN_CONFIG (built-in if unset)."""
+    global _chain_config
+    if _chain_config is None:
+        _chain_config = ChainConfig(os.getenv("DELEGATOR_CHAIN_CONFIG") or None)
+    return _chain_config
@@ -0,0 +1,119 @@
+"""Shared delegator daemon: one long-running server for every session and project.
+
+Serves the same MCP app as the stdio entry point over streamable HTTP (on
+localhost or a Unix socket), so agent loaders, health state and the
+concurrency limit are shared machine-wide instead of per Claude session.
+
+Each project points its .mcp.json at the daemon and names itself with
+headers:
+
+    "provider_delegator": {
+      "type": "http",
+      "url": "http://127.0.0.1:8765/mcp",
+      "headers": {"X-Agent-Templates-Path": "/abs/project/.claude/agents"}
+    }
+"""
+
+import contextlib
+import logging
+import os
+import socket
+import time
+from typing import AsyncIterator
+
+import uvicorn
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from mcp.server.transport_security import TransportSecuritySettings
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.types import Receive, Scope, Send
+
+from . import server
+
+logger = logging.getLogger(__name__)
+
+MCP_PATH = "/mcp"
+HEALTH_PATH = "/health"
+
+
+class _MCPEndpoint:
+    """ASGI endpoint handing every /mcp request to the session manager."""
+
+    def __init__(self, session_manager: StreamableHTTPSessionManager):
+        self.session_manager = session_manager
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.session_manager.handle_request(scope, receive, send)
+
+
+async def health(request: Request) -> JSONResponse:
+    """Process-wide state: uptime, call counts, providers used, projects served.
+
+    "calls" counts provider chain runs; "coalesced" counts duplicate requests
+    that shared a run already in flight.
+    """
+    stats = server.stats
+    return JSONResponse({
+        "status": "ok",
+        "uptime_s": round(time.time() - stats["started"], 1),
+        "calls": stats["calls"],
+        "coalesced": stats["coalesced"],
+        "in_flight": stats["in_flight"],
+        "max_concurrency": server.MAX_CONCURRENCY,
+        "providers": stats["providers"],
+        "projects": sorted(stats["projects"]),
+    })
+
+
+def create_http_app() -> Starlette:
+    """Build the Starlette app serving MCP at /mcp and health at /health."""
+    session_manager = StreamableHTTPSessionManager(
+        app=server.app,
+        # Only local clients; rejects DNS-rebinding requests from browsers
+        security_settings=TransportSecuritySettings(
+            enable_dns_rebinding_protection=True,
+            allowed_hosts=["127.0.0.1:*", "localhost:*", "[::1]:*", "localhost"],
+            allowed_origins=["http://127.0.0.1:*", "http://localhost:*"],
+        ),
+    )
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette) -> AsyncIterator[None]:
+        async with session_manager.run():
+            yield
+
+    return Starlette(
+        routes=[
+            Route(MCP_PATH, endpoint=_MCPEndpoint(session_manager)),
+            Route(HEALTH_PATH, endpoint=health, methods=["GET"]),
+        ],
+        lifespan=lifespan,
+    )
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, uds: str | None = None) -> None:
+    """Run the daemon until interrupted."""
+    where = f"unix:{uds}" if uds else f"http://{host}:{port}"
+    logger.info(f"Starting MCP Provider Delegator daemon on {where}{MCP_PATH}")
+    logger.info(f"Default agent templates path: {server.AGENT_TEMPLATES_PATH}")
+    logger.info(f"Max concurrency: {server.MAX_CONCURRENCY or 'unlimited'}")
+
+    config = uvicorn.Config(create_http_app(), host=host, port=port, log_level="warning")
+    if not uds:
+        await uvicorn.Server(config).serve()
+        return
+
+    # Bind the socket ourselves so only this user can connect (uvicorn uses 0o666)
+    if os.path.exists(uds):
+        os.unlink(uds)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(uds)
+    os.chmod(uds, 0o600)
+    try:
+        await uvicorn.Server(config).serve(sockets=[sock])
+    finally:
+        sock.close()
+        if os.path.exists(uds):
+            os.unlink(uds)
@@ -0,0 +1,176 @@
+"""Background agent jobs: submit a delegation, keep working, collect it later.
+
+Jobs live in an in-process table. Finished jobs are kept for a while
+(bounded by count and age), and the table can be persisted to a JSON file
+so results survive a server restart. Jobs still running when the server
+stopped come back as "interrupted"; their provider process is gone.
+
+Configuration (environment):
+    DELEGATOR_JOBS_FILE      Persist the job table here (default: in memory only)
+    DELEGATOR_JOB_RETENTION  Max finished jobs kept (default 100)
+    DELEGATOR_JOB_TTL        Seconds a finished job is kept (default 3600)
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+RUNNING = "running"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+INTERRUPTED = "interrupted"
+
+
+@dataclass
+class Job:
+    """One submitted delegation."""
+    id: str
+    agent: str
+    task_id: Optional[str]
+    project: Optional[str]
+    submitted: float
+    status: str = RUNNING
+    finished: Optional[float] = None
+    provider: Optional[str] = None
+    result: Optional[str] = None
+    metadata: Optional[dict] = None
+
+    def to_dict(self) -> dict:
+        end = self.finished or time.time()
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "agent": self.agent,
+            "task_id": self.task_id,
+            "provider": self.provider,
+            "metadata": self.metadata,
+            "elapsed_s": round(end - self.submitted, 1),
+            "result": self.result,
+        }
+
+
+class JobTable:
+    """Running and recently finished jobs, optionally persisted to disk."""
+
+    def __init__(self, max_finished: int = 100, ttl: float = 3600, path: Optional[Path] = None):
+        self.max_finished = max_finished
+        self.ttl = ttl
+        self.path = Path(path) if path else None
+        self.jobs: dict[str, Job] = {}
+        self.tasks: dict[str, asyncio.Task] = {}
+        self._load()
+
+    @classmethod
+    def from_env(cls) -> "JobTable":
+        """Build a table from the DELEGATOR_JOB* environment variables."""
+        return cls(
+            max_finished=int(os.getenv("DELEGATOR_JOB_RETENTION", "100")),
+            ttl=float(os.getenv("DELEGATOR_JOB_TTL", "3600")),
+            path=os.getenv("DELEGATOR_JOBS_FILE") or None,
+        )
+
+    def submit(
+        self,
+        agent: str,
+        task_id: Optional[str],
+        project: Optional[str],
+        run: Callable[[], Awaitable[tuple[str, str, Optional[dict]]]],
+    ) -> Job:
+        """Start `run()` (returning (result text, provider, metadata)) as a background job."""
+        job = Job(id=uuid.uuid4().hex[:12], agent=agent, task_id=task_id, project=project, submitted=time.time())
+        self.jobs[job.id] = job
+        self.tasks[job.id] = asyncio.create_task(self._run(job, run))
+        self._prune()
+        self._save()
+        logger.info(f"[Jobs] Submitted {job.id} ({agent}, task_id: {task_id})")
+        return job
+
+    async def _run(self, job: Job, run: Callable[[], Awaitable[tuple[str, str, Optional[dict]]]]) -> None:
+        try:
+            job.result, job.provider, job.metadata = await run()
+            job.status = COMPLETED
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+        except Exception as e:
+            logger.exception(f"[Jobs] {job.id} crashed")
+            job.status, job.result = COMPLETED, f"ERROR: Unexpected error invoking {job.agent}: {e}"
+        finally:
+            job.finished = time.time()
+            self.tasks.pop(job.id, None)
+            self._save()
+        logger.info(f"[Jobs] {job.id} {job.status} via {job.provider}")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._prune()
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """Like get(), but first wait up to `timeout` seconds for a running job."""
+        task = self.tasks.get(job_id)
+        if task and timeout > 0:
+            # shield: a poll timing out must not cancel the job
+            await asyncio.wait([asyncio.shield(task)], timeout=timeout)
+        return self.get(job_id)
+
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a running job (killing its provider process)."""
+        task = self.tasks.get(job_id)
+        if task:
+            task.cancel()
+            await asyncio.wait([task])
+        return self.jobs.get(job_id)
+
+    def _prune(self) -> None:
+        """Drop finished jobs older than the TTL or beyond the retention count."""
+        now = time.time()
+        finished = sorted(
+            (job for job in self.jobs.values() if job.finished is not None),
+            key=lambda job: job.finished,
+        )
+        expired = [job for job in finished if now - job.finished > self.ttl]
+        overflow = finished[:max(0, len(finished) - self.max_finished)]
+        for job in expired + overflow:
+            self.jobs.pop(job.id, None)
+
+    def _load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            records = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.error(f"[Jobs] Ignoring unreadable jobs file {self.path}: {e}")
+            return
+        if not isinstance(records, list):
+            logger.error(f"[Jobs] Ignoring jobs file {self.path}: expected a list of jobs")
+            return
+        for record in records:
+            try:
+                job = Job(**record)
+            except TypeError as e:
+                # Written by another version, or edited by hand
+                logger.error(f"[Jobs] Skipping invalid job record in {self.path}: {e}")
+                continue
+            if job.status == RUNNING:
+                job.status, job.finished = INTERRUPTED, time.time()
+                job.result = "Job was still running when the delegator restarted; submit it again."
+            self.jobs[job.id] = job
+        self._prune()
+
+    def _save(self) -> None:
+        if not self.path:
+            return
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            tmp.write_text(json.dumps([asdict(job) for job in self.jobs.values()]), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.error(f"[Jobs] Could not persist jobs to {self.path}: {e}")
@@ -0,0 +1,111 @@
+"""Parsers turning provider CLI output into the final answer plus usage.
+
+Run in their machine-readable modes, the CLIs report reasoning, tool calls
+and token usage as structured events. Only the agent's final message goes
+back to the orchestrator; the rest becomes metadata.
+
+    text         Plain stdout (any CLI)
+    codex-jsonl  `codex exec --json` event stream
+    gemini-json  `gemini --output-format json` result object
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProviderOutput:
+    """What a provider answered, and what it cost."""
+    text: str
+    usage: dict[str, int] = field(default_factory=dict)  # input_tokens, cached_input_tokens, output_tokens
+    tool_calls: int = 0
+    duration_s: float = 0.0
+    error: Optional[str] = None  # Failure reported inside the output (non-zero exits)
+
+    def metadata(self) -> dict:
+        return {"usage": self.usage, "tool_calls": self.tool_calls, "duration_s": round(self.duration_s, 2)}
+
+
+def parse_text(stdout: str) -> ProviderOutput:
+    return ProviderOutput(text=stdout.strip())
+
+
+# Codex item types that are tool use rather than conversation
+CODEX_TOOL_ITEMS = {"command_execution", "mcp_tool_call", "file_change", "web_search"}
+
+
+def _add_usage(output: ProviderOutput, key: str, value: Any) -> None:
+    """Add a token count to output.usage; null or non-numeric counts are skipped."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        output.usage[key] = output.usage.get(key, 0) + int(value)
+
+
+def parse_codex_jsonl(stdout: str) -> ProviderOutput:
+    """Last agent message, summed turn usage and tool items from `codex exec --json`."""
+    output = ProviderOutput(text="")
+    messages = []
+    parsed_any = False
+    for line in stdout.splitlines():
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(event, dict):
+            continue
+        parsed_any = True
+        kind = event.get("type", "")
+        item = event.get("item") or {}
+        if kind == "item.completed":
+            if item.get("type") in ("agent_message", "assistant_message"):
+                messages.append(item.get("text", ""))
+            elif item.get("type") in CODEX_TOOL_ITEMS:
+                output.tool_calls += 1
+        elif kind == "turn.completed":
+            usage = event.get("usage")
+            for key, value in (usage.items() if isinstance(usage, dict) else ()):
+                _add_usage(output, key, value)
+        elif kind == "turn.failed":
+            output.error = (event.get("error") or {}).get("message", "turn failed")
+        elif kind == "error":
+            output.error = event.get("message", "error")
+
+    if not parsed_any:
+        logger.warning("[Codex] Expected a JSON event stream, returning raw output")
+        return parse_text(stdout)
+    output.text = messages[-1].strip() if messages else ""
+    return output
+
+
+def parse_gemini_json(stdout: str) -> ProviderOutput:
+    """Response, per-model token totals and tool calls from `gemini --output-format json`."""
+    try:
+        result = json.loads(stdout)
+    except ValueError:
+        result = None
+    if not isinstance(result, dict):
+        logger.warning("[Gemini] Expected a JSON result, returning raw output")
+        return parse_text(stdout)
+
+    output = ProviderOutput(text=(result.get("response") or "").strip())
+    stats = result.get("stats") or {}
+    for model in (stats.get("models") or {}).values():
+        tokens = model.get("tokens") or {}
+        for key, source in (("input_tokens", "prompt"), ("cached_input_tokens", "cached"), ("output_tokens", "candidates")):
+            _add_usage(output, key, tokens.get(source))
+    tool_calls = (stats.get("tools") or {}).get("totalCalls")
+    output.tool_calls = int(tool_calls) if isinstance(tool_calls, (int, float)) else 0
+    error = result.get("error")
+    if error:
+        output.error = error.get("message", "error") if isinstance(error, dict) else str(error)
+    return output
+
+
+OUTPUT_PARSERS: dict[str, Callable[[str], ProviderOutput]] = {
+    "text": parse_text,
+    "codex-jsonl": parse_codex_jsonl,
+    "gemini-json": parse_gemini_json,
+}
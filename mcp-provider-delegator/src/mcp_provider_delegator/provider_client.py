@@ -3,9 +3,17 @@
 import asyncio
 import logging
 import os
+import signal
+import tempfile
+import time
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Iterator, Optional
+
+from .output_parsers import OUTPUT_PARSERS, ProviderOutput
+from .rate_limiter import RateLimiter
+from .routing import AdaptiveRouter
 
 logger = logging.getLogger(__name__)
 
@@ -44,18 +52,215 @@ class InvokeResult:
     provider: str
     error: Optional[str] = None
     fallback_hint: Optional[FallbackHint] = None
+    metadata: Optional[dict] = None  # Usage, tool calls and timing of the answering provider
+
+
+class PromptTransport(ABC):
+    """How a prompt reaches a provider CLI.
+
+    Prompts include the full agent system prompt, so putting them on the
+    command line can exceed ARG_MAX and exposes them in `ps`.
+    """
+
+    name: str = "base"
+
+    @abstractmethod
+    @contextmanager
+    def prepare(self, client: "ProviderClient", prompt: str) -> Iterator[tuple[list[str], Any]]:
+        """Yield (argv, stdin) for one invocation; stdin is bytes, a file or None."""
+
+
+class ArgvTransport(PromptTransport):
+    """Prompt as a command-line argument (legacy behaviour)."""
+
+    name = "argv"
+
+    @contextmanager
+    def prepare(self, client, prompt):
+        yield client.build_command(prompt), None
+
+
+class StdinTransport(PromptTransport):
+    """Prompt streamed through a pipe on stdin."""
+
+    name = "stdin"
+
+    @contextmanager
+    def prepare(self, client, prompt):
+        yield client.build_command(client.stdin_prompt_arg), prompt.encode("utf-8")
+
+
+class FileTransport(PromptTransport):
+    """Prompt written to a private temp file that becomes the CLI's stdin."""
+
+    name = "file"
+
+    @contextmanager
+    def prepare(self, client, prompt):
+        fd, path = tempfile.mkstemp(prefix=f"{client.name}-prompt-", suffix=".txt")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(prompt.encode("utf-8"))
+            with open(path, "rb") as stdin:
+                yield client.build_command(client.stdin_prompt_arg), stdin
+        finally:
+            os.unlink(path)
+
+
+PROMPT_TRANSPORTS = {
+    transport.name: transport
+    for transport in (ArgvTransport(), StdinTransport(), FileTransport())
+}
 
 
 class ProviderClient(ABC):
-    """Abstract base class for AI provider clients."""
+    """Base class for AI provider CLIs.
+
+    Subclasses describe the command line (build_command); spawning, timeouts
+    and error handling are shared.
+    """
 
     name: str = "base"
+    model: str = ""
+
+    # Default prompt transport; override with <NAME>_PROMPT_TRANSPORT=argv|stdin|file
+    default_transport: str = "stdin"
+
+    # Prompt argument telling the CLI to read the prompt from stdin (None: omit it)
+    stdin_prompt_arg: Optional[str] = None
+
+    # Shown when the CLI is not installed
+    install_hint: str = ""
+
+    # Output parser (see output_parsers.py); override with <NAME>_OUTPUT=text
+    output_format: str = "text"
+
+    def __init__(self, cwd: Optional[str] = None, timeout: Optional[float] = None):
+        """
+        Args:
+            cwd: Directory the CLI runs in (default: the server's working directory)
+            timeout: Seconds before the CLI is killed (default: no limit)
+        """
+        self.cwd = cwd
+        self.timeout = timeout
+
+    @property
+    def label(self) -> str:
+        """Display name used in logs and errors."""
+        return self.name.capitalize()
 
     @abstractmethod
-    async def invoke(self, prompt: str) -> str:
-        """Invoke the provider with a prompt."""
+    def build_command(self, prompt_arg: Optional[str]) -> list[str]:
+        """Build the CLI argv, with prompt_arg as the prompt argument (None: omit it)."""
         pass
 
+    def env_setting(self, setting: str, default: str) -> str:
+        """Read <NAME>_<SETTING> from the environment."""
+        return os.getenv(f"{self.name.upper().replace('-', '_')}_{setting}", default)
+
+    @property
+    def transport(self) -> PromptTransport:
+        """Prompt transport for this provider."""
+        configured = self.env_setting("PROMPT_TRANSPORT", self.default_transport)
+        transport = PROMPT_TRANSPORTS.get(configured.lower())
+        if transport is None:
+            logger.warning(f"Unknown {self.name} prompt transport '{configured}', using {self.default_transport}")
+            transport = PROMPT_TRANSPORTS[self.default_transport]
+        return transport
+
+    @property
+    def output(self) -> str:
+        """Name of the output parser for this provider ("text": raw stdout)."""
+        configured = self.env_setting("OUTPUT", self.output_format).lower()
+        if configured not in OUTPUT_PARSERS:
+            logger.warning(f"Unknown {self.name} output format '{configured}', using {self.output_format}")
+            return self.output_format
+        return configured
+
+    async def run_cli(self, prompt: str) -> tuple[int, bytes, bytes]:
+        """Spawn the CLI with the prompt sent via this provider's transport.
+
+        Returns:
+            (returncode, stdout, stderr)
+
+        Raises:
+            RuntimeError: If the CLI runs longer than the timeout
+        """
+        with self.transport.prepare(self, prompt) as (cmd, stdin):
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                # Never inherit our stdin: under MCP stdio it is the protocol stream
+                stdin=asyncio.subprocess.PIPE if isinstance(stdin, bytes) else (stdin or asyncio.subprocess.DEVNULL),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=os.environ.copy(),
+                cwd=self.cwd or os.getcwd(),
+                # Own process group, so a kill also reaches node/npx shims and wrapper scripts
+                start_new_session=os.name == "posix",
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(stdin if isinstance(stdin, bytes) else None),
+                    self.timeout,
+                )
+            except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+                # Cancelled call (e.g. cancel_agent_job) or timeout: don't leave the CLI running
+                self.kill_process_group(process)
+                await process.wait()
+                if isinstance(e, asyncio.TimeoutError):
+                    raise RuntimeError(f"{self.label} timed out after {self.timeout:g}s")
+                raise
+            return process.returncode, stdout, stderr
+
+    @staticmethod
+    def kill_process_group(process: asyncio.subprocess.Process) -> None:
+        """Kill the CLI and everything it started.
+
+        process.kill() only reaches the direct child; a grandchild holding the
+        stdout pipe would keep running under the server.
+        """
+        if os.name != "posix":
+            process.kill()
+            return
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    async def invoke(self, prompt: str) -> ProviderOutput:
+        """Invoke the provider with a prompt.
+
+        Returns:
+            The final answer, with usage and tool-call counts when the
+            CLI reports them
+
+        Raises:
+            RateLimitError: If the provider reports rate limiting
+            RuntimeError: If the CLI is missing, fails or times out
+        """
+        logger.info(f"[{self.label}] Invoking with model: {self.model} (prompt via {self.transport.name}, output: {self.output})")
+
+        started = time.monotonic()
+        try:
+            returncode, stdout, stderr = await self.run_cli(prompt)
+        except FileNotFoundError:
+            raise RuntimeError(f"{self.label} CLI not found. {self.install_hint}".strip())
+
+        output = OUTPUT_PARSERS[self.output](stdout.decode(errors="replace"))
+        output.duration_s = time.monotonic() - started
+
+        if returncode != 0 or (output.error and not output.text):
+            error_msg = (stderr.decode(errors="replace") if stderr else "") or output.error or "Unknown error"
+            if self.is_rate_limit_error(error_msg):
+                raise RateLimitError(f"{self.label} rate limit: {error_msg}")
+            raise RuntimeError(f"{self.label} failed: {error_msg}")
+
+        logger.info(
+            f"[{self.label}] Response length: {len(output.text)} chars "
+            f"(raw {len(stdout)} bytes, {output.tool_calls} tool calls, usage {output.usage})"
+        )
+        return output
+
     def is_rate_limit_error(self, error_msg: str) -> bool:
         """Check if error message indicates rate limiting."""
         rate_limit_indicators = [
@@ -73,6 +278,11 @@ class CodexClient(ProviderClient):
     """Client for OpenAI Codex."""
 
     name = "codex"
+    install_hint = "Install with: codex login"
+    output_format = "codex-jsonl"
+
+    # `codex exec -` reads the prompt from stdin
+    stdin_prompt_arg = "-"
 
     # Map agent model preferences to Codex models
     MODEL_MAPPING = {
@@ -81,52 +291,38 @@ class CodexClient(ProviderClient):
         "opus": "gpt-5.1-codex-max",
     }
 
-    def __init__(self, model: str = "gpt-5.2-codex"):
+    def __init__(
+        self,
+        model: str = "gpt-5.2-codex",
+        cwd: Optional[str] = None,
+        timeout: Optional[float] = None,
+        read_only: bool = False,
+    ):
+        """
+        Args:
+            read_only: Run in Codex's read-only sandbox (agents without write tools)
+        """
+        super().__init__(cwd, timeout)
         self.model = model
+        self.sandbox = "read-only" if read_only else "workspace-write"
 
     @classmethod
     def map_model(cls, agent_model: str) -> str:
         """Map agent's preferred model to Codex model."""
         return cls.MODEL_MAPPING.get(agent_model, "gpt-5.2-codex")
 
-    async def invoke(self, prompt: str) -> str:
-        """Invoke Codex with prompt."""
+    def build_command(self, prompt_arg: Optional[str]) -> list[str]:
         cmd = [
             "codex",
             "exec",
             "-m", self.model,
-            "--sandbox", "workspace-write",
-            prompt,
+            "--sandbox", self.sandbox,
         ]
-
-        logger.info(f"[Codex] Invoking with model: {self.model}")
-
-        try:
-            cwd = os.getcwd()
-            env = os.environ.copy()
-
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                env=env,
-                cwd=cwd,
-            )
-
-            stdout, stderr = await process.communicate()
-
-            if process.returncode != 0:
-                error_msg = stderr.decode() if stderr else "Unknown error"
-                if self.is_rate_limit_error(error_msg):
-                    raise RateLimitError(f"Codex rate limit: {error_msg}")
-                raise RuntimeError(f"Codex failed: {error_msg}")
-
-            response = stdout.decode().strip()
-            logger.info(f"[Codex] Response length: {len(response)} chars")
-            return response
-
-        except FileNotFoundError:
-            raise RuntimeError("Codex CLI not found. Install with: codex login")
+        if self.output == "codex-jsonl":
+            cmd.append("--json")  # JSONL event stream
+        if prompt_arg is not None:
+            cmd.append(prompt_arg)
+        return cmd
 
 
 class GeminiClient(ProviderClient):
@@ -134,44 +330,85 @@ class GeminiClient(ProviderClient):
 
     name = "gemini"
     model = "gemini-3-flash-preview"
+    install_hint = "Install with: pip install gemini-cli"
+    output_format = "gemini-json"
 
-    async def invoke(self, prompt: str) -> str:
-        """Invoke Gemini with prompt."""
-        cmd = [
-            "gemini",
-            "-p", prompt,
+    # Without -p, Gemini runs non-interactively on a prompt piped to stdin
+    stdin_prompt_arg = None
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        cwd: Optional[str] = None,
+        timeout: Optional[float] = None,
+        read_only: bool = False,
+    ):
+        """
+        Args:
+            read_only: Don't auto-approve tool calls, so headless Gemini runs
+                without its file-editing and shell tools
+        """
+        super().__init__(cwd, timeout)
+        if model:
+            self.model = model
+        self.approval_mode = "default" if read_only else "yolo"
+
+    def build_command(self, prompt_arg: Optional[str]) -> list[str]:
+        cmd = ["gemini"]
+        if prompt_arg is not None:
+            cmd += ["-p", prompt_arg]
+        cmd += [
             "-m", self.model,
-            "-y",  # Auto-approve tool calls for agentic execution
+            # yolo auto-approves tool calls for agentic execution
+            "--approval-mode", self.approval_mode,
         ]
+        if self.output == "gemini-json":
+            cmd += ["--output-format", "json"]
+        return cmd
 
-        logger.info(f"[Gemini] Invoking with model: {self.model}")
-
-        try:
-            cwd = os.getcwd()
-            env = os.environ.copy()
-
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                env=env,
-                cwd=cwd,
-            )
 
-            stdout, stderr = await process.communicate()
+class CommandProvider(ProviderClient):
+    """Any CLI described by a command template, e.g. from the chain config.
 
-            if process.returncode != 0:
-                error_msg = stderr.decode() if stderr else "Unknown error"
-                if self.is_rate_limit_error(error_msg):
-                    raise RateLimitError(f"Gemini rate limit: {error_msg}")
-                raise RuntimeError(f"Gemini failed: {error_msg}")
+    In the template, "{model}" is replaced with the model, and an argument
+    that is exactly "{prompt}" is the prompt argument: the prompt itself with
+    the argv transport, stdin_arg (or nothing) with stdin/file transports.
+    read_only_command, if given, is the template used for read-only agents;
+    without it the command runs unrestricted.
+    """
 
-            response = stdout.decode().strip()
-            logger.info(f"[Gemini] Response length: {len(response)} chars")
-            return response
+    def __init__(
+        self,
+        name: str,
+        command: list[str],
+        model: str = "",
+        transport: str = "stdin",
+        stdin_arg: Optional[str] = None,
+        install_hint: str = "",
+        output: str = "text",
+        cwd: Optional[str] = None,
+        timeout: Optional[float] = None,
+        read_only_command: Optional[list[str]] = None,
+        read_only: bool = False,
+    ):
+        super().__init__(cwd, timeout)
+        self.name = name
+        self.output_format = output
+        self.command = list(read_only_command if read_only and read_only_command else command)
+        self.model = model
+        self.default_transport = transport
+        self.stdin_prompt_arg = stdin_arg
+        self.install_hint = install_hint
 
-        except FileNotFoundError:
-            raise RuntimeError("Gemini CLI not found. Install with: pip install gemini-cli")
+    def build_command(self, prompt_arg: Optional[str]) -> list[str]:
+        cmd = []
+        for arg in self.command:
+            if arg == "{prompt}":
+                if prompt_arg is not None:
+                    cmd.append(prompt_arg)
+            else:
+                cmd.append(arg.replace("{model}", self.model))
+        return cmd
 
 
 # Map agent names to Claude Task subagent_types for fallback
@@ -201,6 +438,9 @@ class ProviderChain:
         allow_skip: bool = False,
         agent_name: str = "",
         agent_model: str = "sonnet",
+        rate_limiter: Optional[RateLimiter] = None,
+        router: Optional[AdaptiveRouter] = None,
+        subagent_type: Optional[str] = None,
     ):
         """
         Initialize provider chain.
@@ -210,15 +450,21 @@ class ProviderChain:
             allow_skip: If True, return skip message when all providers fail
             agent_name: Name of the agent (for fallback hints)
             agent_model: Agent's preferred model (for fallback hints)
+            rate_limiter: Shared limiter consulted before each provider call
+            router: Adaptive policy that reorders providers per agent
+            subagent_type: Task subagent for fallback hints (default: AGENT_TO_SUBAGENT)
         """
         self.providers = providers
         self.allow_skip = allow_skip
         self.agent_name = agent_name
         self.agent_model = agent_model
+        self.rate_limiter = rate_limiter
+        self.router = router
+        self.subagent_type = subagent_type
 
     def _create_fallback_hint(self, user_prompt: str) -> FallbackHint:
         """Create a fallback hint for Claude Task tool."""
-        subagent_type = AGENT_TO_SUBAGENT.get(self.agent_name, "general-purpose")
+        subagent_type = self.subagent_type or AGENT_TO_SUBAGENT.get(self.agent_name, "general-purpose")
         task_model = AGENT_MODEL_TO_TASK_MODEL.get(self.agent_model, "sonnet")
         return FallbackHint(
             subagent_type=subagent_type,
@@ -226,6 +472,19 @@ class ProviderChain:
             prompt=user_prompt,
         )
 
+    def _record(self, provider: ProviderClient, success: bool, started: float) -> None:
+        """Feed one attempt's outcome and latency to the adaptive router."""
+        if self.router:
+            self.router.record(self.agent_name, provider.name, success, time.monotonic() - started)
+
+    @staticmethod
+    def build_prompt(system_prompt: str, user_prompt: str, task_id: Optional[str] = None) -> str:
+        """The combined prompt sent to every provider."""
+        combined_prompt = f"{system_prompt}\n\n---\n\n{user_prompt}"
+        if task_id:
+            combined_prompt = f"TASK_ID: {task_id}\n\n{combined_prompt}"
+        return combined_prompt
+
     async def invoke(
         self,
         system_prompt: str,
@@ -238,28 +497,39 @@ class ProviderChain:
         Returns:
             InvokeResult with success status, response, and provider used
         """
-        combined_prompt = f"{system_prompt}\n\n---\n\n{user_prompt}"
-        if task_id:
-            combined_prompt = f"TASK_ID: {task_id}\n\n{combined_prompt}"
+        combined_prompt = self.build_prompt(system_prompt, user_prompt, task_id)
 
         errors = []
+        providers = self.router.order(self.agent_name, self.providers) if self.router else self.providers
 
-        for provider in self.providers:
+        for provider in providers:
+            model = provider.model
+            if self.rate_limiter and await self.rate_limiter.acquire(provider.name, model) is None:
+                logger.warning(f"{provider.name} over local rate limit, skipping")
+                errors.append(f"{provider.name}: local rate limit")
+                continue
+            started = time.monotonic()
             try:
                 logger.info(f"Trying provider: {provider.name}")
-                response = await provider.invoke(combined_prompt)
+                output = await provider.invoke(combined_prompt)
+                self._record(provider, True, started)
                 return InvokeResult(
                     success=True,
-                    response=response,
+                    response=output.text,
                     provider=provider.name,
+                    metadata=output.metadata(),
                 )
             except RateLimitError as e:
                 logger.warning(f"{provider.name} rate limited: {e}")
                 errors.append(f"{provider.name}: rate limited")
+                self._record(provider, False, started)
+                if self.rate_limiter:
+                    self.rate_limiter.penalize(provider.name, model)
                 continue
             except RuntimeError as e:
                 logger.error(f"{provider.name} failed: {e}")
                 errors.append(f"{provider.name}: {e}")
+                self._record(provider, False, started)
                 continue
 
         # All providers failed
@@ -275,7 +545,7 @@ class ProviderChain:
         fallback_hint = self._create_fallback_hint(user_prompt)
         fallback_response = f"""PROVIDER_FALLBACK_REQUIRED
 
-All external providers (Codex, Gemini) failed for agent '{self.agent_name}'.
+All external providers ({', '.join(p.name for p in self.providers)}) failed for agent '{self.agent_name}'.
 Errors: {'; '.join(errors)}
 
 To complete this task, use Claude Task tool instead:
@@ -293,30 +563,59 @@ Note: The Task tool runs locally and doesn't have the same rate limits."""
         )
 
 
-def create_provider_chain(agent_model: str, agent_name: str) -> ProviderChain:
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """Process-wide limiter from the environment, or None when none is configured."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter.from_env()
+    return _rate_limiter if _rate_limiter.enabled else None
+
+
+_router: Optional[AdaptiveRouter] = None
+
+
+def get_router() -> Optional[AdaptiveRouter]:
+    """Process-wide adaptive router, or None for the static chain order."""
+    global _router
+    if _router is None and os.getenv("DELEGATOR_ROUTING", "static").lower() != "static":
+        _router = AdaptiveRouter.from_env()
+    return _router
+
+
+def create_provider_chain(
+    agent_model: str,
+    agent_name: str,
+    cwd: Optional[str] = None,
+    read_only: bool = False,
+) -> ProviderChain:
     """
     Create a provider chain for an agent.
 
+    The providers, models, timeouts and skip policy come from the chain
+    config (see chain_config.py); without one, Codex then Gemini, and only
+    code-reviewer may skip.
+
     Args:
         agent_model: Agent's preferred model (haiku, sonnet, opus)
         agent_name: Name of the agent (for skip logic and fallback hints)
+        cwd: Project directory the provider CLIs run in (default: server cwd)
+        read_only: Agent has no write tools; sandbox the CLIs read-only where supported
 
     Returns:
         ProviderChain configured for the agent
     """
-    codex_model = CodexClient.map_model(agent_model)
-
-    providers = [
-        CodexClient(model=codex_model),
-        GeminiClient(),
-    ]
-
-    # Code reviewer can be skipped if all providers fail
-    allow_skip = agent_name == "code-reviewer"
+    from .chain_config import get_chain_config  # chain_config imports this module
 
+    config = get_chain_config()
     return ProviderChain(
-        providers=providers,
-        allow_skip=allow_skip,
+        providers=config.build_providers(agent_name, agent_model, cwd, read_only),
+        allow_skip=config.allow_skip(agent_name),
         agent_name=agent_name,
         agent_model=agent_model,
+        rate_limiter=get_rate_limiter(),
+        router=get_router(),
+        subagent_type=config.subagent(agent_name),
     )
@@ -0,0 +1,176 @@
+"""Cross-process token-bucket rate limiting for provider calls.
+
+Every delegator process on the machine (one per Claude session, or a shared
+daemon) reads and updates the same SQLite file, so together they stay under
+each provider's rate instead of tripping each other's 429s.
+
+Configuration (environment):
+    DELEGATOR_RATE_LIMITS          "codex=30/min,gemini:gemini-3-flash-preview=60/min"
+                                   Keys are provider or provider:model; a bucket
+                                   holds N calls and refills N per period
+                                   (s, min or h). Unlisted providers are unlimited.
+    DELEGATOR_RATE_LIMIT_WAIT      Max seconds to wait for a token before skipping
+                                   to the next provider (default 10)
+    DELEGATOR_RATE_LIMIT_COOLDOWN  Seconds every process backs off a provider:model
+                                   after it returns a 429 (default 0 = off)
+    DELEGATOR_RATE_LIMIT_DB        State file (default
+                                   ~/.claude/mcp-servers/.state/rate-limits.sqlite3)
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path.home() / ".claude" / "mcp-servers" / ".state" / "rate-limits.sqlite3"
+
+PERIODS = {"s": 1, "sec": 1, "min": 60, "m": 60, "h": 3600, "hour": 3600}
+
+
+@dataclass
+class Limit:
+    """A bucket of `capacity` calls refilled at `rate` calls per second."""
+    capacity: float
+    rate: float
+
+
+def parse_limits(spec: str) -> dict[str, Limit]:
+    """Parse "codex=30/min,gemini=1/s" into {key: Limit}.
+
+    Raises:
+        ValueError: If an entry is malformed
+    """
+    limits = {}
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        key, _, value = entry.partition("=")
+        count, _, period = value.partition("/")
+        if not key or not count or period not in PERIODS:
+            raise ValueError(f"Invalid rate limit '{entry}' (expected provider[:model]=N/s|min|h)")
+        calls = float(count)
+        limits[key.strip()] = Limit(capacity=calls, rate=calls / PERIODS[period])
+    return limits
+
+
+class RateLimiter:
+    """Token buckets shared between processes through a SQLite file."""
+
+    def __init__(
+        self,
+        limits: dict[str, Limit],
+        db_path: Path = DEFAULT_DB_PATH,
+        max_wait: float = 10.0,
+        cooldown: float = 0.0,
+    ):
+        self.limits = limits
+        self.db_path = Path(db_path)
+        self.max_wait = max_wait
+        self.cooldown = cooldown
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        """Build a limiter from the DELEGATOR_RATE_LIMIT* environment variables."""
+        try:
+            limits = parse_limits(os.getenv("DELEGATOR_RATE_LIMITS", ""))
+        except ValueError as e:
+            logger.error(f"Ignoring DELEGATOR_RATE_LIMITS: {e}")
+            limits = {}
+        return cls(
+            limits=limits,
+            db_path=Path(os.getenv("DELEGATOR_RATE_LIMIT_DB") or DEFAULT_DB_PATH),
+            max_wait=float(os.getenv("DELEGATOR_RATE_LIMIT_WAIT", "10")),
+            cooldown=float(os.getenv("DELEGATOR_RATE_LIMIT_COOLDOWN", "0")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.limits) or self.cooldown > 0
+
+    def limit_for(self, provider: str, model: str) -> Optional[Limit]:
+        return self.limits.get(f"{provider}:{model}") or self.limits.get(provider)
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL,"
+            " blocked_until REAL NOT NULL DEFAULT 0)"
+        )
+        return conn
+
+    def _reserve(self, key: str, limit: Optional[Limit], budget: float) -> Optional[float]:
+        """Atomically reserve one call; returns seconds to wait, or None if over budget."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            # IMMEDIATE takes the write lock up front: one process at a time
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT tokens, updated, blocked_until FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            capacity = limit.capacity if limit else 1.0
+            tokens, updated, blocked_until = row if row else (capacity, now, 0.0)
+
+            wait = max(0.0, blocked_until - now)
+            if limit:
+                tokens = min(limit.capacity, tokens + (now - updated) * limit.rate)
+                # Tokens may go negative: each waiter owns the slot it reserved
+                wait = max(wait, (1 - tokens) / limit.rate if tokens < 1 else 0.0)
+
+            if wait > budget:
+                conn.execute("ROLLBACK")
+                return None
+
+            if limit:
+                tokens -= 1
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated, blocked_until) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                (key, tokens, now, blocked_until),
+            )
+            conn.execute("COMMIT")
+            return wait
+        finally:
+            conn.close()
+
+    async def acquire(self, provider: str, model: str, budget: Optional[float] = None) -> Optional[float]:
+        """Wait for permission to call provider:model.
+
+        Returns:
+            Seconds waited, or None if the wait would exceed the budget
+            (the caller should skip to the next provider)
+        """
+        limit = self.limit_for(provider, model)
+        if limit is None and self.cooldown <= 0:
+            return 0.0
+        key = f"{provider}:{model}"
+        wait = await asyncio.to_thread(self._reserve, key, limit, self.max_wait if budget is None else budget)
+        if wait:
+            logger.info(f"[RateLimit] Waiting {wait:.2f}s for {key}")
+            await asyncio.sleep(wait)
+        return wait
+
+    def penalize(self, provider: str, model: str) -> None:
+        """Back off provider:model in every process after a 429."""
+        if self.cooldown <= 0:
+            return
+        key = f"{provider}:{model}"
+        until = time.time() + self.cooldown
+        limit = self.limit_for(provider, model)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO buckets (key, tokens, updated, blocked_until) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(key) DO UPDATE SET blocked_until = MAX(blocked_until, excluded.blocked_until)",
+                (key, limit.capacity if limit else 1.0, time.time(), until),
+            )
+        finally:
+            conn.close()
+        logger.warning(f"[RateLimit] {key} cooling down for {self.cooldown:.0f}s after 429")
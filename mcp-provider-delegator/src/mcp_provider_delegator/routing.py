@@ -0,0 +1,136 @@
+"""Adaptive provider ordering per agent.
+
+Every provider attempt is recorded per (agent, provider) in a SQLite file
+shared by all delegator processes: attempts, successes and a moving average
+of the latency of successful calls. The adaptive policy orders an agent's chain by expected time to
+a successful answer (average latency / success rate), and with probability
+`exploration` promotes a random other provider so the stats stay current.
+
+Configuration (environment):
+    DELEGATOR_ROUTING              "static" (default: chain order as defined)
+                                   or "adaptive"
+    DELEGATOR_ROUTING_EXPLORATION  Chance of trying a non-best provider first (default 0.1)
+    DELEGATOR_ROUTING_DB           Stats file (default
+                                   ~/.claude/mcp-servers/.state/routing.sqlite3)
+"""
+
+import logging
+import os
+import random
+import sqlite3
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Sequence
+
+if TYPE_CHECKING:
+    from .provider_client import ProviderClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = Path.home() / ".claude" / "mcp-servers" / ".state" / "routing.sqlite3"
+
+# Weight of the newest sample in the latency moving average
+LATENCY_ALPHA = 0.2
+
+# Providers with fewer attempts stay ahead of measured ones until seeded
+MIN_SAMPLES = 3
+
+
+class AdaptiveRouter:
+    """Per-agent provider statistics and the ordering policy built on them."""
+
+    def __init__(self, db_path: Path = DEFAULT_DB_PATH, exploration: float = 0.1, rng: Optional[random.Random] = None):
+        self.db_path = Path(db_path)
+        self.exploration = exploration
+        self.rng = rng or random.Random()
+
+    @classmethod
+    def from_env(cls) -> Optional["AdaptiveRouter"]:
+        """An adaptive router if DELEGATOR_ROUTING=adaptive, else None (static order)."""
+        policy = os.getenv("DELEGATOR_ROUTING", "static").lower()
+        if policy == "static":
+            return None
+        if policy != "adaptive":
+            logger.warning(f"Unknown DELEGATOR_ROUTING '{policy}', using static order")
+            return None
+        return cls(
+            db_path=Path(os.getenv("DELEGATOR_ROUTING_DB") or DEFAULT_DB_PATH),
+            exploration=float(os.getenv("DELEGATOR_ROUTING_EXPLORATION", "0.1")),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS provider_stats ("
+            " agent TEXT NOT NULL, provider TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL, successes INTEGER NOT NULL, latency REAL NOT NULL,"
+            " PRIMARY KEY (agent, provider))"
+        )
+        return conn
+
+    def stats(self, agent: str) -> dict[str, dict]:
+        """{provider: {"attempts", "successes", "latency"}} for one agent."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT provider, attempts, successes, latency FROM provider_stats WHERE agent = ?", (agent,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return {
+            provider: {"attempts": attempts, "successes": successes, "latency": latency}
+            for provider, attempts, successes, latency in rows
+        }
+
+    def record(self, agent: str, provider: str, success: bool, latency: float) -> None:
+        """Record one provider attempt for an agent."""
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT INTO provider_stats (agent, provider, attempts, successes, latency)"
+                " VALUES (?, ?, 1, ?, ?)"
+                " ON CONFLICT(agent, provider) DO UPDATE SET"
+                "  attempts = attempts + 1,"
+                "  successes = successes + excluded.successes,"
+                "  latency = CASE WHEN excluded.successes = 1 OR successes = 0"
+                "   THEN latency + ? * (excluded.latency - latency) ELSE latency END",
+                (agent, provider, int(success), latency, LATENCY_ALPHA),
+            )
+        except sqlite3.Error as e:
+            logger.error(f"[Routing] Could not record {agent}/{provider}: {e}")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def expected_cost(stat: dict) -> float:
+        """Expected seconds to a successful answer (smoothed success rate)."""
+        success_rate = (stat["successes"] + 1) / (stat["attempts"] + 2)
+        return stat["latency"] / success_rate
+
+    def order(self, agent: str, providers: Sequence["ProviderClient"]) -> list["ProviderClient"]:
+        """Providers for `agent`, best first.
+
+        Providers without MIN_SAMPLES attempts keep their configured position
+        ahead of the measured ones, so new providers get tried.
+        """
+        providers = list(providers)
+        if len(providers) < 2:
+            return providers
+        try:
+            stats = self.stats(agent)
+        except sqlite3.Error as e:
+            logger.error(f"[Routing] Stats unavailable, using static order: {e}")
+            return providers
+
+        unseeded = [p for p in providers if stats.get(p.name, {}).get("attempts", 0) < MIN_SAMPLES]
+        measured = sorted(
+            (p for p in providers if p not in unseeded),
+            key=lambda p: self.expected_cost(stats[p.name]),
+        )
+        ordered = unseeded + measured
+        if self.rng.random() < self.exploration:
+            explored = ordered.pop(self.rng.randrange(1, len(ordered)))
+            ordered.insert(0, explored)
+            logger.info(f"[Routing] Exploring {explored.name} first for {agent}")
+        return ordered
@@ -1,16 +1,26 @@
 """MCP server for delegating agents to AI providers with fallback support."""
 
 import asyncio
+import hashlib
+import json
 import logging
 import os
-from typing import Any
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 
 from .agent_loader import AgentLoader
-from .provider_client import create_provider_chain
+from .artifacts import apply_budget
+from .chain_config import get_chain_config
+from .jobs import Job, JobTable
+from .provider_client import InvokeResult, ProviderChain, create_provider_chain
+from .worktrees import read_only_snapshot, task_worktree
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -19,11 +29,78 @@ logger = logging.getLogger(__name__)
 # AGENT_TEMPLATES_PATH should be set via .mcp.json env config
 AGENT_TEMPLATES_PATH = os.getenv("AGENT_TEMPLATES_PATH", ".claude/agents")
 
-agent_loader = AgentLoader(templates_path=AGENT_TEMPLATES_PATH)
+# Daemon mode: one server for many projects. Each client names its project
+# with these headers (set in .mcp.json); stdio sessions use the env config.
+TEMPLATES_PATH_HEADER = "x-agent-templates-path"
+PROJECT_DIR_HEADER = "x-project-dir"
+
+# Loaders per templates path, shared by every session of the process
+agent_loaders: dict[str, AgentLoader] = {}
+
+
+def get_agent_loader(templates_path: str = AGENT_TEMPLATES_PATH) -> AgentLoader:
+    """Cached loader for a templates path (AGENT_TEMPLATES_PATH by default).
+
+    Built on first use, so a daemon started outside any project only needs
+    templates once a request without X-Agent-Templates-Path arrives.
+    """
+    loader = agent_loaders.get(templates_path)
+    if loader is None:
+        loader = agent_loaders[templates_path] = AgentLoader(templates_path=templates_path)
+    return loader
+
+
+# Max concurrent invoke_agent calls across all sessions (0 = unlimited)
+MAX_CONCURRENCY = int(os.getenv("DELEGATOR_MAX_CONCURRENCY", "0"))
+_call_slots: Optional[asyncio.Semaphore] = None
+
+# Process-wide health state, reported by the daemon's /health endpoint
+stats = {
+    "started": time.time(),
+    "calls": 0,
+    "coalesced": 0,
+    "in_flight": 0,
+    "providers": {},
+    "projects": set(),
+}
+
+# Background jobs from submit_agent_job
+jobs = JobTable.from_env()
 
 # Initialize MCP server
 app = Server("provider-delegator")
 
+AGENT_TASK_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "agent": {
+            "type": "string",
+            "enum": ["scout", "detective", "architect", "scribe", "code-reviewer"],
+            "description": "Which agent to invoke",
+        },
+        "task_prompt": {
+            "type": "string",
+            "description": "The task prompt/instructions for the agent",
+        },
+        "task_id": {
+            "type": "string",
+            "description": (
+                "Optional bead/Kanban task ID (e.g., RCH-123) for tracking. "
+                "If .worktrees/bd-{ID} exists, the agent runs in that worktree."
+            ),
+        },
+    },
+    "required": ["agent", "task_prompt"],
+}
+
+JOB_ID_PROPERTY = {
+    "type": "string",
+    "description": "Job ID returned by submit_agent_job",
+}
+
+# Longest get_agent_job may block waiting for a job to finish
+MAX_JOB_WAIT_SECONDS = 60
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available tools."""
@@ -36,81 +113,253 @@ async def list_tools() -> list[Tool]:
                 "Available agents: scout, detective, architect, scribe, code-reviewer. "
                 "Agents have full MCP tool access (context7, vibe_kanban, playwright, github)."
             ),
+            inputSchema=AGENT_TASK_SCHEMA,
+        ),
+        Tool(
+            name="submit_agent_job",
+            description=(
+                "Start invoke_agent in the background and return a job ID immediately. "
+                "Keep working, then collect the result with get_agent_job."
+            ),
+            inputSchema=AGENT_TASK_SCHEMA,
+        ),
+        Tool(
+            name="get_agent_job",
+            description=(
+                "Status and, once completed, result of a submitted agent job. "
+                "Optionally waits up to wait_seconds for it to finish."
+            ),
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "agent": {
-                        "type": "string",
-                        "enum": ["scout", "detective", "architect", "scribe", "code-reviewer"],
-                        "description": "Which agent to invoke",
-                    },
-                    "task_prompt": {
-                        "type": "string",
-                        "description": "The task prompt/instructions for the agent",
-                    },
-                    "task_id": {
-                        "type": "string",
-                        "description": "Optional Kanban task ID (e.g., RCH-123) for tracking",
+                    "job_id": JOB_ID_PROPERTY,
+                    "wait_seconds": {
+                        "type": "number",
+                        "description": f"Wait up to this long for a running job (max {MAX_JOB_WAIT_SECONDS}, default 0)",
                     },
                 },
-                "required": ["agent", "task_prompt"],
+                "required": ["job_id"],
             },
-        )
+        ),
+        Tool(
+            name="cancel_agent_job",
+            description="Cancel a running agent job and stop its provider process.",
+            inputSchema={
+                "type": "object",
+                "properties": {"job_id": JOB_ID_PROPERTY},
+                "required": ["job_id"],
+            },
+        ),
     ]
 
-@app.call_tool()
-async def call_tool(name: str, arguments: Any) -> list[TextContent]:
-    """Handle tool calls."""
-    if name != "invoke_agent":
-        raise ValueError(f"Unknown tool: {name}")
+def set_max_concurrency(limit: int) -> None:
+    """Cap concurrent invoke_agent calls across all sessions (0 = unlimited)."""
+    global MAX_CONCURRENCY, _call_slots
+    MAX_CONCURRENCY = limit
+    _call_slots = asyncio.Semaphore(limit) if limit > 0 else None
 
-    agent_name = arguments["agent"]
-    task_prompt = arguments["task_prompt"]
-    task_id = arguments.get("task_id")
 
-    logger.info(f"Invoking agent: {agent_name} (task_id: {task_id})")
+set_max_concurrency(MAX_CONCURRENCY)
+
+
+def resolve_project() -> tuple[AgentLoader, Optional[str]]:
+    """Agent loader and working directory for the current request.
+
+    Over HTTP, the X-Agent-Templates-Path / X-Project-Dir headers select the
+    project (the project dir defaults to the templates path's
+    .claude/agents grandparent). Stdio sessions use AGENT_TEMPLATES_PATH and
+    the server's own working directory.
+    """
+    try:
+        request = app.request_context.request
+    except LookupError:
+        request = None
+    if request is None:
+        return get_agent_loader(), None
+
+    templates_path = request.headers.get(TEMPLATES_PATH_HEADER)
+    if not templates_path:
+        return get_agent_loader(), request.headers.get(PROJECT_DIR_HEADER)
+    if not os.path.isabs(templates_path):
+        raise ValueError(f"{TEMPLATES_PATH_HEADER} must be an absolute path: {templates_path}")
+
+    loader = get_agent_loader(templates_path)
+    project_dir = request.headers.get(PROJECT_DIR_HEADER) or str(Path(templates_path).parent.parent)
+    return loader, project_dir
+
+
+@dataclass
+class _Flight:
+    """One provider run shared by every caller with the same request."""
+    task: "asyncio.Task[InvokeResult]"
+    waiters: int = 0
 
+
+# Identical delegations currently running, by coalescing key
+_in_flight: dict[str, _Flight] = {}
+
+
+async def invoke_once(key: str, invoke: Callable[[], Awaitable[InvokeResult]]) -> InvokeResult:
+    """Single-flight: concurrent callers with the same key share one invoke().
+
+    The run is cancelled only when every caller waiting on it has been
+    cancelled.
+    """
+    flight = _in_flight.get(key)
+    if flight is None:
+        flight = _in_flight[key] = _Flight(task=asyncio.create_task(invoke()))
+        flight.task.add_done_callback(
+            lambda _: _in_flight.pop(key) if _in_flight.get(key) is flight else None
+        )
+    else:
+        stats["coalesced"] += 1
+        logger.info(f"Coalesced duplicate delegation {key[:12]} ({stats['coalesced']} so far)")
+
+    flight.waiters += 1
+    try:
+        return await asyncio.shield(flight.task)
+    except asyncio.CancelledError:
+        if flight.waiters == 1:
+            flight.task.cancel()
+        raise
+    finally:
+        flight.waiters -= 1
+
+
+async def run_agent(
+    agent_name: str,
+    task_prompt: str,
+    task_id: Optional[str],
+    loader: AgentLoader,
+    project_dir: Optional[str],
+) -> tuple[str, str, Optional[dict]]:
+    """Run one delegation through the provider chain.
+
+    Returns:
+        (response text, provider used, usage/timing metadata); errors are
+        returned as "ERROR: ..." text
+    """
     try:
         # Load agent template
-        template = agent_loader.load_agent(agent_name)
+        template = loader.load_agent(agent_name)
         logger.info(f"Loaded template for {agent_name} (model: {template.model})")
 
-        # Create provider chain with fallback support
-        chain = create_provider_chain(
-            agent_model=template.model,
-            agent_name=agent_name,
-        )
+        # The bead's worktree if it has one, so parallel tasks don't share a tree
+        cwd = task_worktree(project_dir or os.getcwd(), task_id) or project_dir
+        if cwd != project_dir:
+            logger.info(f"Running {agent_name} in worktree {cwd}")
 
-        # Invoke with fallback chain: Codex -> Gemini -> Skip (for code-reviewer)
-        result = await chain.invoke(
-            system_prompt=template.system_prompt,
-            user_prompt=task_prompt,
-            task_id=task_id,
-        )
+        def workdir():
+            # Read-only agents outside a bead worktree get a snapshot of HEAD
+            # instead of the main checkout that supervisors are editing
+            if template.read_only and cwd == project_dir:
+                return read_only_snapshot(project_dir or os.getcwd())
+            return nullcontext(cwd)
+
+        async def invoke() -> InvokeResult:
+            # Invoke with fallback chain: Codex -> Gemini -> Skip (for code-reviewer)
+            stats["calls"] += 1
+            stats["in_flight"] += 1
+            try:
+                async with _call_slots or nullcontext(), workdir() as run_dir:
+                    if run_dir and run_dir != cwd:
+                        logger.info(f"Running {agent_name} in snapshot {run_dir}")
+                    # Create provider chain with fallback support
+                    chain = create_provider_chain(
+                        agent_model=template.model,
+                        agent_name=agent_name,
+                        cwd=run_dir or cwd,
+                        read_only=template.read_only,
+                    )
+                    result = await chain.invoke(
+                        system_prompt=template.system_prompt,
+                        user_prompt=task_prompt,
+                        task_id=task_id,
+                    )
+            finally:
+                stats["in_flight"] -= 1
+            stats["providers"][result.provider] = stats["providers"].get(result.provider, 0) + 1
+            return result
+
+        combined_prompt = ProviderChain.build_prompt(template.system_prompt, task_prompt, task_id)
+        key = hashlib.sha256(
+            "\0".join([agent_name, template.version, cwd or "", combined_prompt]).encode("utf-8")
+        ).hexdigest()
+        result = await invoke_once(key, invoke)
 
         if result.success:
             logger.info(f"Agent {agent_name} completed via {result.provider}")
-            return [TextContent(
-                type="text",
-                text=result.response
-            )]
         else:
-            # Return fallback hint response (includes Task() suggestion)
+            # Response contains PROVIDER_FALLBACK_REQUIRED with Task() hint
             logger.warning(f"Agent {agent_name} failed, returning fallback hint")
-            return [TextContent(
-                type="text",
-                text=result.response  # Contains PROVIDER_FALLBACK_REQUIRED with Task() hint
-            )]
+
+        # Oversized answers go to .beads/artifacts/; the caller gets an excerpt
+        response, artifact = apply_budget(
+            result.response, get_chain_config().response_budget(agent_name), project_dir,
+        )
+        metadata = result.metadata
+        if artifact and metadata is not None:
+            metadata = {**metadata, "artifact": str(artifact.path), "sha256": artifact.sha256, "chars": artifact.chars}
+        return response, result.provider, metadata
 
     except FileNotFoundError as e:
         error_msg = f"Agent template not found: {agent_name}. Error: {e}"
         logger.error(error_msg)
-        return [TextContent(type="text", text=f"ERROR: {error_msg}")]
+        return f"ERROR: {error_msg}", "none", None
 
     except Exception as e:
         error_msg = f"Unexpected error invoking {agent_name}: {e}"
         logger.exception(error_msg)
+        return f"ERROR: {error_msg}", "none", None
+
+
+def job_response(job: Optional[Job], job_id: str) -> list[TextContent]:
+    """A job's status as JSON, or an error for unknown (or expired) job IDs."""
+    if job is None:
+        return [TextContent(type="text", text=f"ERROR: Unknown or expired job: {job_id}")]
+    return [TextContent(type="text", text=json.dumps(job.to_dict(), indent=2))]
+
+
+@app.call_tool()
+async def call_tool(name: str, arguments: Any) -> list[TextContent]:
+    """Handle tool calls."""
+    if name == "get_agent_job":
+        wait = min(float(arguments.get("wait_seconds") or 0), MAX_JOB_WAIT_SECONDS)
+        return job_response(await jobs.wait(arguments["job_id"], wait), arguments["job_id"])
+    if name == "cancel_agent_job":
+        return job_response(await jobs.cancel(arguments["job_id"]), arguments["job_id"])
+    if name not in ("invoke_agent", "submit_agent_job"):
+        raise ValueError(f"Unknown tool: {name}")
+
+    agent_name = arguments["agent"]
+    task_prompt = arguments["task_prompt"]
+    task_id = arguments.get("task_id")
+
+    logger.info(f"Invoking agent: {agent_name} (task_id: {task_id})")
+
+    try:
+        # Resolve now: the request context is gone once a job runs in the background
+        loader, project_dir = resolve_project()
+    except (ValueError, FileNotFoundError) as e:
+        error_msg = f"Invalid project for {agent_name}: {e}"
+        logger.error(error_msg)
         return [TextContent(type="text", text=f"ERROR: {error_msg}")]
+    if project_dir:
+        stats["projects"].add(project_dir)
+
+    if name == "submit_agent_job":
+        job = jobs.submit(
+            agent_name, task_id, project_dir,
+            lambda: run_agent(agent_name, task_prompt, task_id, loader, project_dir),
+        )
+        return job_response(job, job.id)
+
+    text, provider, metadata = await run_agent(agent_name, task_prompt, task_id, loader, project_dir)
+    content = [TextContent(type="text", text=text)]
+    if metadata:
+        # Kept out of the answer itself: usage, tool calls and timing as JSON
+        content.append(TextContent(type="text", text=json.dumps({"provider": provider, **metadata})))
+    return content
 
 async def main():
     """Run the MCP server."""
@@ -126,8 +375,33 @@ async def main():
         )
 
 def run():
-    """Entry point for CLI."""
-    asyncio.run(main())
+    """Entry point for CLI.
+
+    With no arguments, serves one session over stdio. With --http or --uds,
+    runs as a shared daemon (see daemon.py).
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="MCP provider delegator")
+    parser.add_argument("--http", action="store_true",
+                        help="Serve streamable HTTP for many sessions instead of stdio")
+    parser.add_argument("--host", default="127.0.0.1", help="HTTP bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="HTTP port (default: 8765)")
+    parser.add_argument("--uds", help="Serve HTTP on this Unix socket instead of a TCP port")
+    parser.add_argument("--max-concurrency", type=int, default=None,
+                        help="Max concurrent agent calls across all sessions (default: $DELEGATOR_MAX_CONCURRENCY or unlimited)")
+    args = parser.parse_args()
+
+    if args.max_concurrency is not None:
+        set_max_concurrency(args.max_concurrency)
+
+    if args.http or args.uds:
+        from .daemon import serve
+        asyncio.run(serve(host=args.host, port=args.port, uds=args.uds))
+    else:
+        asyncio.run(main())
 
 if __name__ == "__main__":
-    run()
+    # Run from the package module, not __main__, so daemon.py shares its state
+    from mcp_provider_delegator import server as _server
+    _server.run()
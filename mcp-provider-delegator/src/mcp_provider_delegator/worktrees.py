@@ -0,0 +1,79 @@
+"""Run delegated agents in their bead's worktree.
+
+Supervisors work in .worktrees/bd-{BEAD_ID}/. When invoke_agent gets that
+bead as task_id, the provider CLI runs there too, so parallel delegations
+for different beads each see (and write to) their own tree instead of
+sharing the main checkout. Read-only agents without a bead worktree run in
+a detached snapshot of HEAD, so they never read half-applied edits.
+"""
+
+import asyncio
+import logging
+import re
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+logger = logging.getLogger(__name__)
+
+WORKTREES_DIR = ".worktrees"
+
+# Bead IDs as used in worktree names (prefix-hash, epic children add .N)
+TASK_ID_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+def task_worktree(project_dir: str, task_id: Optional[str]) -> Optional[str]:
+    """The existing worktree for task_id, or None.
+
+    Tries .worktrees/bd-{task_id}, then .worktrees/{task_id} for IDs that
+    already carry the bd- prefix.
+    """
+    if not task_id or not TASK_ID_PATTERN.match(task_id) or ".." in task_id:
+        return None
+    worktrees = Path(project_dir) / WORKTREES_DIR
+    for name in (f"bd-{task_id}", task_id if task_id.startswith("bd-") else None):
+        if name and (worktrees / name / ".git").exists():
+            return str(worktrees / name)
+    return None
+
+
+async def _git(cwd: str, *args: str) -> bool:
+    """Run a git command in cwd; True if it succeeded."""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "git", *args,
+            cwd=cwd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except FileNotFoundError:
+        return False
+    _, stderr = await process.communicate()
+    if process.returncode != 0:
+        logger.warning(f"git {' '.join(args)} failed: {stderr.decode(errors='replace').strip()}")
+    return process.returncode == 0
+
+
+@asynccontextmanager
+async def read_only_snapshot(project_dir: str) -> AsyncIterator[Optional[str]]:
+    """A detached worktree of project_dir's HEAD, removed on exit.
+
+    Yields None when project_dir is not a git checkout or the worktree
+    can't be created; the caller then runs in project_dir itself.
+    """
+    if not (Path(project_dir) / ".git").exists():
+        yield None
+        return
+    path = tempfile.mkdtemp(prefix="delegator-snapshot-")
+    if not await _git(project_dir, "worktree", "add", "--detach", path, "HEAD"):
+        shutil.rmtree(path, ignore_errors=True)
+        yield None
+        return
+    try:
+        yield path
+    finally:
+        await _git(project_dir, "worktree", "remove", "--force", path)
+        shutil.rmtree(path, ignore_errors=True)
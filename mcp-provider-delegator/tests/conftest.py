@@ -0,0 +1,35 @@
+"""Shared pytest fixtures."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+FAKES_BIN_DIR = Path(__file__).parent / "fakes" / "bin"
+
+# The server reads this path at import but only loads templates from it on
+# first use (get_agent_loader); the fixture scout template is enough offline.
+# Point it at templates/agents for integration runs.
+os.environ.setdefault("AGENT_TEMPLATES_PATH", str(Path(__file__).parent / "fixtures"))
+
+
+@pytest.fixture
+def fake_providers(monkeypatch, tmp_path):
+    """Put the fake codex/gemini CLIs first on PATH.
+
+    Returns a function that sets FAKE_* settings, e.g.
+    ``fake_providers(CODEX_RATE_LIMIT_RATE=1)``. Invocations are logged to
+    ``tmp_path / "calls.log"`` (one line per spawned CLI).
+    """
+    monkeypatch.setenv("PATH", f"{FAKES_BIN_DIR}{os.pathsep}{os.environ.get('PATH', '')}")
+    monkeypatch.setenv("FAKE_PROVIDER_PYTHON", sys.executable)
+    log_path = tmp_path / "calls.log"
+    monkeypatch.setenv("FAKE_PROVIDER_LOG", str(log_path))
+
+    def configure(**settings):
+        for name, value in settings.items():
+            monkeypatch.setenv(f"FAKE_{name}", str(value))
+        return log_path
+
+    return configure
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Deterministic stand-in for the `codex` and `gemini` CLIs.
+
+Invoked through the `bin/codex` and `bin/gemini` shims with the same
+arguments the real CLIs receive. Behaviour is configured per provider with
+FAKE_<PROVIDER>_<SETTING> environment variables, falling back to
+FAKE_PROVIDER_<SETTING> for all providers:
+
+    LATENCY           Seconds before answering: "0.05", "uniform:0.01,0.2",
+                      "normal:0.1,0.02", "lognormal:-2.5,0.5", "exp:0.1"
+    OUTPUT_BYTES      Response size: "2048" or "uniform:1024,65536"
+    RATE_LIMIT_RATE   Probability of failing with a 429 on stderr
+    ERROR_RATE        Probability of failing with a generic error
+    HANG_RATE         Probability of hanging before answering
+    HANG_SECONDS      How long a hang lasts before exiting non-zero (default 30)
+    SEED              Seed mixed into every decision (default "0")
+    LOG               File receiving one line per invocation:
+                      "<provider> <model> <prompt digest> <prompt chars> <argv bytes> <cwd>"
+    TOOL_CALLS        Tool calls reported in structured output (default 2)
+
+With `codex exec --json` or `gemini --output-format json` the answer is
+wrapped like the real CLIs do: a JSONL event stream with reasoning and
+command items around the final agent message, or a JSON result with stats.
+
+Every random decision is drawn from a generator seeded with the seed, the
+provider and the prompt, so a given prompt always gets the same outcome no
+matter how many calls run concurrently.
+"""
+
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+
+
+def setting(provider: str, name: str, default: str) -> str:
+    """Read FAKE_<PROVIDER>_<NAME>, then FAKE_PROVIDER_<NAME>."""
+    return os.environ.get(
+        f"FAKE_{provider.upper()}_{name}",
+        os.environ.get(f"FAKE_PROVIDER_{name}", default),
+    )
+
+
+def sample(spec: str, rng: random.Random) -> float:
+    """Sample a value from a "kind:params" distribution spec (bare number = fixed)."""
+    kind, _, params = spec.partition(":")
+    if not params:
+        return float(kind)
+    values = [float(v) for v in params.split(",")]
+    if kind == "fixed":
+        return values[0]
+    if kind == "uniform":
+        return rng.uniform(values[0], values[1])
+    if kind == "normal":
+        return max(0.0, rng.gauss(values[0], values[1]))
+    if kind == "lognormal":
+        return rng.lognormvariate(values[0], values[1])
+    if kind == "exp":
+        return rng.expovariate(1.0 / values[0])
+    raise ValueError(f"Unknown distribution: {spec}")
+
+
+def parse_invocation(provider: str, args: list[str]) -> tuple[str, str]:
+    """Extract (model, prompt) from the CLI arguments (or stdin, like the real CLIs)."""
+    model = ""
+    prompt = ""
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "-m" and i + 1 < len(args):
+            model = args[i + 1]
+            i += 2
+            continue
+        if arg == "-p" and i + 1 < len(args):
+            prompt = args[i + 1]
+            i += 2
+            continue
+        if arg in ("--sandbox", "--output-format"):
+            i += 2
+            continue
+        if provider == "codex" and (arg == "-" or not arg.startswith("-")) and arg != "exec":
+            prompt = arg
+        i += 1
+    # `codex exec -` reads stdin; gemini reads stdin when there is no -p
+    if prompt == "-" or (provider == "gemini" and "-p" not in args):
+        prompt = sys.stdin.read()
+    return model, prompt
+
+
+def main() -> int:
+    provider = sys.argv[1]
+    model, prompt = parse_invocation(provider, sys.argv[2:])
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+
+    log_path = setting(provider, "LOG", "")
+    if log_path:
+        with open(log_path, "a", encoding="utf-8") as f:
+            argv_bytes = sum(len(arg.encode("utf-8")) for arg in sys.argv)
+            f.write(f"{provider} {model} {digest} {len(prompt)} {argv_bytes} {os.getcwd()}\n")
+
+    rng = random.Random(f"{setting(provider, 'SEED', '0')}:{provider}:{prompt}")
+
+    if rng.random() < float(setting(provider, "HANG_RATE", "0")):
+        time.sleep(float(setting(provider, "HANG_SECONDS", "30")))
+        print(f"{provider}: hung", file=sys.stderr)
+        return 1
+
+    time.sleep(sample(setting(provider, "LATENCY", "0"), rng))
+
+    outcome = rng.random()
+    rate_limit_rate = float(setting(provider, "RATE_LIMIT_RATE", "0"))
+    error_rate = float(setting(provider, "ERROR_RATE", "0"))
+    if outcome < rate_limit_rate:
+        print("ERROR: 429 Too Many Requests - rate limit exceeded, retry later", file=sys.stderr)
+        return 1
+    if outcome < rate_limit_rate + error_rate:
+        print(f"ERROR: {provider} internal error", file=sys.stderr)
+        return 2
+
+    size = int(sample(setting(provider, "OUTPUT_BYTES", "256"), rng))
+    header = f"[fake-{provider}] model={model} prompt={digest}\n"
+    filler = (f"{digest} " * (size // 13 + 1))[: max(0, size - len(header))]
+    answer = header + filler
+    tool_calls = int(setting(provider, "TOOL_CALLS", "2"))
+    usage = {"input_tokens": len(prompt) // 4, "cached_input_tokens": 0, "output_tokens": len(answer) // 4}
+
+    if provider == "codex" and "--json" in sys.argv:
+        events = [
+            {"type": "thread.started", "thread_id": digest},
+            {"type": "turn.started"},
+            {"type": "item.completed", "item": {"id": "item_0", "type": "reasoning", "text": "**Planning** the search"}},
+        ]
+        for n in range(tool_calls):
+            events.append({"type": "item.completed", "item": {
+                "id": f"item_{n + 1}", "type": "command_execution", "command": f"rg -n {digest}",
+                "aggregated_output": "src/app.py:1:match\n" * 20, "exit_code": 0, "status": "completed",
+            }})
+        events.append({"type": "item.completed", "item": {"id": f"item_{tool_calls + 1}", "type": "agent_message", "text": answer}})
+        events.append({"type": "turn.completed", "usage": usage})
+        sys.stdout.write("".join(json.dumps(event) + "\n" for event in events))
+    elif provider == "gemini" and "--output-format" in sys.argv:
+        json.dump({"response": answer, "stats": {
+            "models": {model: {"tokens": {
+                "prompt": usage["input_tokens"], "candidates": usage["output_tokens"],
+                "cached": 0, "total": usage["input_tokens"] + usage["output_tokens"],
+            }}},
+            "tools": {"totalCalls": tool_calls},
+        }}, sys.stdout)
+    else:
+        sys.stdout.write(answer + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Tests for spilling oversized responses to artifacts."""
+
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+from mcp_provider_delegator import server
+from mcp_provider_delegator.agent_loader import AgentLoader
+from mcp_provider_delegator.artifacts import apply_budget
+
+
+def test_small_response_is_returned_unchanged(tmp_path):
+    assert apply_budget("short answer", 100, str(tmp_path)) == ("short answer", None)
+    assert not (tmp_path / ".beads").exists()
+
+
+def test_large_response_spills_to_content_addressed_file(tmp_path):
+    text = "HEAD " + "x" * 5000 + " TAIL"
+
+    excerpt, artifact = apply_budget(text, 400, str(tmp_path))
+
+    assert artifact.sha256 == hashlib.sha256(text.encode()).hexdigest()
+    assert artifact.path == (tmp_path / ".beads" / "artifacts" / f"{artifact.sha256[:16]}.md").resolve()
+    assert artifact.path.read_text() == text
+    assert excerpt.startswith("HEAD ") and excerpt.endswith(" TAIL")
+    assert str(artifact.path) in excerpt and artifact.sha256 in excerpt
+    assert len(excerpt) < 400 + 300  # Budget plus the pointer line
+
+    # Same content, same file
+    assert apply_budget(text, 400, str(tmp_path))[1].path == artifact.path
+    assert len(list(artifact.path.parent.iterdir())) == 1
+
+
+def test_zero_budget_disables_spilling(tmp_path):
+    assert apply_budget("x" * 10000, 0, str(tmp_path))[1] is None
+
+
+@pytest.mark.asyncio
+async def test_invoke_agent_returns_excerpt_and_artifact(fake_providers, tmp_path, monkeypatch):
+    fake_providers(PROVIDER_OUTPUT_BYTES=100_000)
+    # Stdio sessions spill into the server's cwd; keep the templates path valid from there
+    templates = str(Path(server.AGENT_TEMPLATES_PATH).resolve())
+    monkeypatch.setitem(server.agent_loaders, server.AGENT_TEMPLATES_PATH, AgentLoader(templates))
+    monkeypatch.chdir(tmp_path)
+
+    result = await server.call_tool("invoke_agent", {"agent": "scout", "task_prompt": "Map everything"})
+
+    metadata = json.loads(result[1].text)
+    assert len(result[0].text) < 25_000
+    assert result[0].text.startswith("[fake-codex]")
+    assert metadata["chars"] > 99_000
+    assert metadata["artifact"].startswith(str(tmp_path.resolve() / ".beads" / "artifacts"))
+    assert metadata["artifact"] in result[0].text
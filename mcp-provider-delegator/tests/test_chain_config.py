@@ -0,0 +1,176 @@
+"""Tests for config-driven provider chains and CommandProvider."""
+
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+from mcp_provider_delegator.chain_config import ChainConfig
+from mcp_provider_delegator.provider_client import CommandProvider, ProviderChain
+
+ECHO = [sys.executable, "-c", "import sys; print('{model}:', sys.stdin.read().split()[-1])"]
+
+
+def write(path, text, bump=0):
+    path.write_text(text)
+    # Make every rewrite visible to the mtime check, however fast the test runs
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump * 1_000_000_000))
+
+
+def test_builtin_chain_matches_defaults():
+    config = ChainConfig()
+
+    providers = config.build_providers("architect", "opus")
+
+    assert [(p.name, p.model) for p in providers] == [("codex", "gpt-5.1-codex-max"), ("gemini", "gemini-3-flash-preview")]
+    assert config.allow_skip("code-reviewer") and not config.allow_skip("scout")
+    assert config.subagent("architect") == "Plan"
+
+
+def test_yaml_config_routes_agent_to_command_provider(tmp_path):
+    path = tmp_path / "chains.yaml"
+    write(path, f"""
+providers:
+  local:
+    command: {ECHO!r}
+    model: tiny
+    timeout: 30
+agents:
+  scout:
+    chain: [local, gemini]
+    models: {{gemini: gemini-2.5-flash-lite}}
+    allow_skip: true
+""")
+    config = ChainConfig(path)
+
+    scout = config.build_providers("scout", "haiku", cwd="/tmp")
+    detective = config.build_providers("detective", "haiku")
+
+    assert [(p.name, p.model) for p in scout] == [("local", "tiny"), ("gemini", "gemini-2.5-flash-lite")]
+    assert isinstance(scout[0], CommandProvider) and scout[0].timeout == 30 and scout[0].cwd == "/tmp"
+    assert config.allow_skip("scout")
+    assert [p.name for p in detective] == ["codex", "gemini"]
+
+
+def test_toml_config(tmp_path):
+    path = tmp_path / "chains.toml"
+    write(path, """
+[providers.local]
+command = ["echo", "{prompt}"]
+transport = "argv"
+
+[agents.default]
+chain = ["local"]
+""")
+
+    assert [p.name for p in ChainConfig(path).build_providers("scout", "haiku")] == ["local"]
+
+
+def test_config_reloads_on_change_and_keeps_last_good(tmp_path):
+    path = tmp_path / "chains.yaml"
+    write(path, "agents:\n  scout:\n    chain: [gemini]\n")
+    config = ChainConfig(path)
+    assert [p.name for p in config.build_providers("scout", "haiku")] == ["gemini"]
+
+    write(path, "agents:\n  scout:\n    chain: [gemini, codex]\n", bump=1)
+    assert [p.name for p in config.build_providers("scout", "haiku")] == ["gemini", "codex"]
+
+    write(path, "agents:\n  scout:\n    chain: [nope]\n", bump=2)
+    assert [p.name for p in config.build_providers("scout", "haiku")] == ["gemini", "codex"]
+
+
+def test_argv_transport_requires_prompt_placeholder(tmp_path):
+    path = tmp_path / "chains.yaml"
+    write(path, "providers:\n  bad:\n    command: [echo]\n    transport: argv\n")
+
+    # Invalid file: the built-in config stays in effect
+    assert [p.name for p in ChainConfig(path).build_providers("scout", "haiku")] == ["codex", "gemini"]
+
+
+def test_read_only_command_for_read_only_agents(tmp_path):
+    path = tmp_path / "chains.yaml"
+    write(path, """
+providers:
+  local:
+    command: [tool, --write]
+    read_only_command: [tool, --read-only]
+agents:
+  default:
+    chain: [local]
+""")
+    config = ChainConfig(path)
+
+    assert config.build_providers("scout", "haiku", read_only=True)[0].build_command(None) == ["tool", "--read-only"]
+    assert config.build_providers("scout", "haiku")[0].build_command(None) == ["tool", "--write"]
+
+
+@pytest.mark.parametrize("text", [
+    "agents:\n  scout:\n",
+    "agents: [scout]\n",
+    "agents:\n  scout:\n    timeout: abc\n",
+    "providers:\n  codex:\n    timeout: [1]\n",
+])
+def test_malformed_entries_keep_builtin_config(tmp_path, text):
+    path = tmp_path / "chains.yaml"
+    write(path, text)
+
+    assert [p.name for p in ChainConfig(path).build_providers("scout", "haiku")] == ["codex", "gemini"]
+
+
+@pytest.mark.asyncio
+async def test_command_provider_runs_template():
+    provider = CommandProvider("local", ECHO, model="tiny")
+
+    assert (await provider.invoke("say hello")).text == "tiny: hello"
+
+
+@pytest.mark.asyncio
+async def test_timed_out_provider_falls_through():
+    slow = CommandProvider("slow", [sys.executable, "-c", "import time; time.sleep(30)"], timeout=0.5)
+    fast = CommandProvider("fast", ECHO, model="fast")
+    chain = ProviderChain([slow, fast], agent_name="scout")
+
+    result = await chain.invoke(system_prompt="Scout.", user_prompt="go")
+
+    assert result.provider == "fast"
+    assert result.response == "fast: go"
+
+
+@pytest.mark.asyncio
+async def test_fallback_hint_names_the_configured_providers():
+    failing = [sys.executable, "-c", "import sys; sys.exit(1)"]
+    chain = ProviderChain([CommandProvider("local", failing), CommandProvider("backup", failing)], agent_name="scout")
+
+    result = await chain.invoke(system_prompt="Scout.", user_prompt="go")
+
+    assert "All external providers (local, backup) failed for agent 'scout'" in result.response
+
+
+def is_running(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+@pytest.mark.asyncio
+async def test_timeout_kills_processes_started_by_the_cli(tmp_path):
+    pid_file = tmp_path / "grandchild.pid"
+    # A wrapper script whose child keeps stdout open, like a node/npx shim
+    wrapper = CommandProvider("wrapped", ["sh", "-c", f"sleep 30 & echo $! > {pid_file}; wait"], timeout=0.5)
+
+    started = time.monotonic()
+    with pytest.raises(RuntimeError, match="timed out"):
+        await wrapper.invoke("go")
+
+    assert time.monotonic() - started < 5  # Not held open until the grandchild exits
+    pid = int(pid_file.read_text())
+    for _ in range(50):
+        if not is_running(pid):
+            break
+        await asyncio.sleep(0.02)
+    assert not is_running(pid)
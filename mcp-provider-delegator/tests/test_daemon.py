@@ -0,0 +1,94 @@
+"""Tests for the shared HTTP daemon (fake provider CLIs, real sockets)."""
+
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def daemon(fake_providers, tmp_path):
+    """Run the daemon in a subprocess with the fake CLIs on PATH."""
+    log_path = fake_providers()
+    port = _free_port()
+    env = dict(os.environ, AGENT_TEMPLATES_PATH=str(FIXTURES_DIR))
+    process = subprocess.Popen(
+        [sys.executable, "-m", "mcp_provider_delegator.server", "--http", "--port", str(port),
+         "--max-concurrency", "4"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(100):
+            try:
+                httpx.get(f"{url}/health", timeout=1)
+                break
+            except httpx.TransportError:
+                time.sleep(0.1)
+        yield url, log_path
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def _project(tmp_path: Path, name: str) -> Path:
+    agents = tmp_path / name / ".claude" / "agents"
+    agents.mkdir(parents=True)
+    shutil.copy(FIXTURES_DIR / "scout.md", agents / "scout.md")
+    return tmp_path / name
+
+
+async def _invoke(url: str, project: Path, prompt: str) -> str:
+    headers = {"X-Agent-Templates-Path": str(project / ".claude" / "agents")}
+    async with streamablehttp_client(f"{url}/mcp", headers=headers) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            result = await session.call_tool("invoke_agent", {"agent": "scout", "task_prompt": prompt})
+            return result.content[0].text
+
+
+@pytest.mark.asyncio
+async def test_daemon_serves_several_projects(daemon, tmp_path):
+    """Each session's headers pick its templates and the CLI's working directory."""
+    url, log_path = daemon
+    first, second = _project(tmp_path, "first"), _project(tmp_path, "second")
+
+    assert (await _invoke(url, first, "Find files")).startswith("[fake-codex]")
+    assert (await _invoke(url, second, "Find tests")).startswith("[fake-codex]")
+
+    cwds = [line.split(" ", 5)[5] for line in log_path.read_text().splitlines()]
+    assert cwds == [str(first), str(second)]
+
+    health = httpx.get(f"{url}/health").json()
+    assert health["calls"] == 2
+    assert health["max_concurrency"] == 4
+    assert health["providers"] == {"codex": 2}
+    assert health["projects"] == sorted([str(first), str(second)])
+
+
+@pytest.mark.asyncio
+async def test_daemon_rejects_relative_templates_path(daemon):
+    """Templates paths must be absolute: the daemon's cwd is not the project."""
+    url, _ = daemon
+    headers = {"X-Agent-Templates-Path": ".claude/agents"}
+    async with streamablehttp_client(f"{url}/mcp", headers=headers) as (read, write, _):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            result = await session.call_tool("invoke_agent", {"agent": "scout", "task_prompt": "x"})
+    assert result.content[0].text.startswith("ERROR: Invalid project")
@@ -1,5 +1,7 @@
 """Integration tests for full agent delegation flow."""
 
+import json
+
 import pytest
 from mcp_provider_delegator.server import app
 
@@ -15,7 +17,10 @@ async def test_invoke_scout_end_to_end():
         }
     )
 
-    assert len(result) == 1
+    # The answer, then (when the provider reported any) usage metadata as JSON
+    assert len(result) in (1, 2)
+    if len(result) == 2:
+        assert "provider" in json.loads(result[1].text)
     # Scout should report findings or indicate agent was invoked
     assert result[0].text
     assert not result[0].text.startswith("ERROR")
@@ -33,6 +38,6 @@ async def test_invoke_detective_with_task_id():
         }
     )
 
-    assert len(result) == 1
+    assert len(result) in (1, 2)
     assert result[0].text
     assert not result[0].text.startswith("ERROR")
@@ -0,0 +1,104 @@
+"""Tests for background agent jobs."""
+
+import asyncio
+import json
+import time
+
+import pytest
+from mcp_provider_delegator import server
+from mcp_provider_delegator.jobs import Job, JobTable
+
+
+async def respond(text, delay=0.0):
+    await asyncio.sleep(delay)
+    return text, "codex", {"usage": {}, "tool_calls": 0, "duration_s": delay}
+
+
+@pytest.mark.asyncio
+async def test_job_completes_in_background():
+    table = JobTable()
+    job = table.submit("scout", "bd-1", None, lambda: respond("found it", 0.05))
+
+    assert table.get(job.id).status == "running"
+    finished = await table.wait(job.id, timeout=5)
+
+    assert finished.status == "completed"
+    assert finished.to_dict()["result"] == "found it"
+    assert finished.provider == "codex"
+
+
+@pytest.mark.asyncio
+async def test_wait_timeout_does_not_cancel_job():
+    table = JobTable()
+    job = table.submit("scout", None, None, lambda: respond("late", 0.2))
+
+    assert (await table.wait(job.id, timeout=0.01)).status == "running"
+    assert (await table.wait(job.id, timeout=5)).status == "completed"
+
+
+@pytest.mark.asyncio
+async def test_retention_drops_oldest_finished_jobs():
+    table = JobTable(max_finished=2)
+    ids = []
+    for n in range(3):
+        job = table.submit("scout", None, None, lambda n=n: respond(f"r{n}"))
+        await table.wait(job.id, timeout=5)
+        ids.append(job.id)
+
+    assert table.get(ids[0]) is None
+    assert table.get(ids[2]).result == "r2"
+
+
+@pytest.mark.asyncio
+async def test_jobs_survive_restart(tmp_path):
+    path = tmp_path / "jobs.json"
+    table = JobTable(path=path)
+    done = table.submit("scout", None, None, lambda: respond("kept"))
+    await table.wait(done.id, timeout=5)
+    # A job that was still running when the server went away
+    records = json.loads(path.read_text())
+    records.append(vars(Job(id="lost", agent="scribe", task_id=None, project=None, submitted=time.time())))
+    path.write_text(json.dumps(records))
+
+    restarted = JobTable(path=path)
+
+    assert restarted.get(done.id).result == "kept"
+    assert restarted.get("lost").status == "interrupted"
+
+
+def test_invalid_job_records_are_skipped(tmp_path):
+    path = tmp_path / "jobs.json"
+    kept = vars(Job(id="kept", agent="scout", task_id=None, project=None, submitted=time.time()))
+    path.write_text(json.dumps([{"id": "old", "unknown_field": 1}, "junk", kept]))
+
+    assert [job.id for job in JobTable(path=path).jobs.values()] == ["kept"]
+
+    path.write_text(json.dumps({"id": "kept"}))
+    assert not JobTable(path=path).jobs
+
+
+@pytest.mark.asyncio
+async def test_submit_poll_and_cancel_tools(fake_providers, tmp_path):
+    """Submitted jobs run against the fake CLIs; cancel kills the hung provider."""
+    fake_providers()
+    submitted = await server.call_tool("submit_agent_job", {"agent": "scout", "task_prompt": "Find files"})
+    job_id = json.loads(submitted[0].text)["job_id"]
+
+    polled = json.loads((await server.call_tool("get_agent_job", {"job_id": job_id, "wait_seconds": 10}))[0].text)
+
+    assert polled["status"] == "completed"
+    assert polled["result"].startswith("[fake-codex]")
+
+    fake_providers(PROVIDER_HANG_RATE=1, PROVIDER_HANG_SECONDS=30)
+    submitted = await server.call_tool("submit_agent_job", {"agent": "scout", "task_prompt": "Hang"})
+    job_id = json.loads(submitted[0].text)["job_id"]
+    await asyncio.sleep(0.5)
+    started = time.monotonic()
+
+    cancelled = json.loads((await server.call_tool("cancel_agent_job", {"job_id": job_id}))[0].text)
+
+    assert cancelled["status"] == "cancelled"
+    assert time.monotonic() - started < 5
+
+    unknown = await server.call_tool("get_agent_job", {"job_id": "nope"})
+    assert unknown[0].text.startswith("ERROR: Unknown or expired job")
@@ -0,0 +1,89 @@
+"""Tests for provider output parsers."""
+
+import json
+
+from mcp_provider_delegator.output_parsers import parse_codex_jsonl, parse_gemini_json
+
+
+def jsonl(*events):
+    return "".join(json.dumps(event) + "\n" for event in events)
+
+
+def test_codex_keeps_last_agent_message_and_sums_usage():
+    stdout = jsonl(
+        {"type": "thread.started", "thread_id": "t"},
+        {"type": "item.completed", "item": {"type": "reasoning", "text": "thinking"}},
+        {"type": "item.completed", "item": {"type": "agent_message", "text": "Looking around."}},
+        {"type": "item.completed", "item": {"type": "command_execution", "command": "ls", "aggregated_output": "a\nb"}},
+        {"type": "item.completed", "item": {"type": "mcp_tool_call", "server": "github"}},
+        {"type": "item.completed", "item": {"type": "agent_message", "text": "  Found it.  "}},
+        {"type": "turn.completed", "usage": {"input_tokens": 100, "cached_input_tokens": 40, "output_tokens": 7}},
+        {"type": "turn.completed", "usage": {"input_tokens": 10, "output_tokens": 3}},
+    ) + "progress noise that is not JSON\n"
+
+    output = parse_codex_jsonl(stdout)
+
+    assert output.text == "Found it."
+    assert output.tool_calls == 2
+    assert output.usage == {"input_tokens": 110, "cached_input_tokens": 40, "output_tokens": 10}
+    assert output.error is None
+
+
+def test_codex_skips_null_and_non_numeric_usage():
+    stdout = jsonl(
+        {"type": "item.completed", "item": {"type": "agent_message", "text": "Done."}},
+        {"type": "turn.completed", "usage": {"input_tokens": 10, "cached_input_tokens": None, "output_tokens": "n/a"}},
+        {"type": "turn.completed", "usage": None},
+    )
+
+    output = parse_codex_jsonl(stdout)
+
+    assert output.text == "Done."
+    assert output.usage == {"input_tokens": 10}
+
+
+def test_codex_failed_turn_reports_error():
+    output = parse_codex_jsonl(jsonl({"type": "turn.failed", "error": {"message": "429 Too Many Requests"}}))
+
+    assert output.text == ""
+    assert output.error == "429 Too Many Requests"
+
+
+def test_codex_plain_text_passes_through():
+    assert parse_codex_jsonl("  just text\n").text == "just text"
+
+
+def test_gemini_result_and_stats():
+    stdout = json.dumps({
+        "response": "Answer.\n",
+        "stats": {
+            "models": {
+                "gemini-3-flash-preview": {"tokens": {"prompt": 50, "candidates": 5, "cached": 10, "total": 55}},
+                "gemini-2.5-flash-lite": {"tokens": {"prompt": 5, "candidates": 1, "total": 6}},
+            },
+            "tools": {"totalCalls": 4},
+        },
+    })
+
+    output = parse_gemini_json(stdout)
+
+    assert output.text == "Answer."
+    assert output.tool_calls == 4
+    assert output.usage == {"input_tokens": 55, "cached_input_tokens": 10, "output_tokens": 6}
+
+
+def test_gemini_skips_null_token_counts():
+    stdout = json.dumps({
+        "response": "Answer.",
+        "stats": {"models": {"gemini-3-flash-preview": {"tokens": {"prompt": None, "candidates": 5}}}, "tools": {"totalCalls": None}},
+    })
+
+    output = parse_gemini_json(stdout)
+
+    assert output.usage == {"output_tokens": 5}
+    assert output.tool_calls == 0
+
+
+def test_gemini_error_and_plain_text():
+    assert parse_gemini_json(json.dumps({"error": {"message": "quota exceeded"}})).error == "quota exceeded"
+    assert parse_gemini_json("Loaded cached credentials.\nhello").text.endswith("hello")
@@ -1,10 +1,14 @@
 """Tests for Provider API clients."""
 
+import os
+
 import pytest
 from mcp_provider_delegator.provider_client import (
     CodexClient,
+    FileTransport,
     GeminiClient,
     ProviderChain,
+    StdinTransport,
     RateLimitError,
     create_provider_chain,
 )
@@ -32,6 +36,34 @@ def test_create_provider_chain_other_agents():
     assert len(chain.providers) == 2
 
 
+def test_stdin_transport_keeps_prompt_out_of_argv():
+    """Prompts go to stdin: `codex exec -` and gemini without -p."""
+    with StdinTransport().prepare(CodexClient(model="gpt-5.2-codex"), "secret prompt") as (cmd, stdin):
+        assert cmd[-1] == "-"
+        assert stdin == b"secret prompt"
+    with StdinTransport().prepare(GeminiClient(), "secret prompt") as (cmd, stdin):
+        assert "-p" not in cmd
+        assert "secret prompt" not in cmd
+
+
+def test_file_transport_removes_temp_file():
+    """The temp file backing stdin is deleted after the call."""
+    with FileTransport().prepare(GeminiClient(), "secret prompt") as (cmd, stdin):
+        path = stdin.name
+        assert stdin.read() == b"secret prompt"
+    assert not os.path.exists(path)
+
+
+def test_prompt_transport_env_override(monkeypatch):
+    """<PROVIDER>_PROMPT_TRANSPORT selects the transport; unknown values fall back."""
+    client = CodexClient()
+    assert client.transport.name == "stdin"
+    monkeypatch.setenv("CODEX_PROMPT_TRANSPORT", "argv")
+    assert client.transport.name == "argv"
+    monkeypatch.setenv("CODEX_PROMPT_TRANSPORT", "carrier-pigeon")
+    assert client.transport.name == "stdin"
+
+
 @pytest.mark.integration
 @pytest.mark.asyncio
 async def test_invoke_codex_simple():
@@ -42,7 +74,7 @@ async def test_invoke_codex_simple():
         prompt="You are a helpful assistant. Say hello."
     )
 
-    assert "hello" in result.lower()
+    assert "hello" in result.text.lower()
 
 
 @pytest.mark.integration
@@ -55,4 +87,4 @@ async def test_invoke_gemini_simple():
         prompt="You are a helpful assistant. Say hello."
     )
 
-    assert "hello" in result.lower()
+    assert "hello" in result.text.lower()
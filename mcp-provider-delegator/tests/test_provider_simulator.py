@@ -0,0 +1,131 @@
+"""Offline tests for the provider chain against the fake codex/gemini CLIs."""
+
+import pytest
+from mcp_provider_delegator.provider_client import create_provider_chain
+
+
+@pytest.mark.asyncio
+async def test_codex_answers_first(fake_providers):
+    """Codex is used when it succeeds; Gemini is never spawned."""
+    log_path = fake_providers()
+    chain = create_provider_chain("haiku", "scout")
+
+    result = await chain.invoke(system_prompt="You are a scout.", user_prompt="Find files")
+
+    assert result.success
+    assert result.provider == "codex"
+    assert result.response.startswith("[fake-codex] model=gpt-5.1-codex-mini")
+    assert [line.split()[0] for line in log_path.read_text().splitlines()] == ["codex"]
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_codex_falls_back_to_gemini(fake_providers):
+    """A 429 from Codex falls through to Gemini."""
+    fake_providers(CODEX_RATE_LIMIT_RATE=1)
+    chain = create_provider_chain("opus", "detective")
+
+    result = await chain.invoke(system_prompt="You are a detective.", user_prompt="Why?")
+
+    assert result.success
+    assert result.provider == "gemini"
+    assert result.response.startswith("[fake-gemini]")
+
+
+@pytest.mark.asyncio
+async def test_all_providers_failing_returns_fallback_hint(fake_providers):
+    """Non-skippable agents get a Task() fallback hint when every provider fails."""
+    fake_providers(PROVIDER_RATE_LIMIT_RATE=1)
+    chain = create_provider_chain("haiku", "scout")
+
+    result = await chain.invoke(system_prompt="You are a scout.", user_prompt="Find files")
+
+    assert not result.success
+    assert result.response.startswith("PROVIDER_FALLBACK_REQUIRED")
+    assert result.fallback_hint.subagent_type == "scout"
+
+
+@pytest.mark.asyncio
+async def test_code_reviewer_skips_when_all_providers_fail(fake_providers):
+    """code-reviewer is skipped rather than falling back."""
+    fake_providers(PROVIDER_ERROR_RATE=1)
+    chain = create_provider_chain("haiku", "code-reviewer")
+
+    result = await chain.invoke(system_prompt="Review.", user_prompt="Review the diff")
+
+    assert result.success
+    assert result.provider == "skip"
+
+
+@pytest.mark.asyncio
+async def test_outcomes_are_deterministic_per_prompt(fake_providers):
+    """The same prompt always gets the same simulated outcome."""
+    fake_providers(CODEX_RATE_LIMIT_RATE=0.5, PROVIDER_OUTPUT_BYTES="uniform:100,5000")
+    chain = create_provider_chain("haiku", "scout")
+
+    first = [await chain.invoke("sys", f"prompt {i}") for i in range(6)]
+    second = [await chain.invoke("sys", f"prompt {i}") for i in range(6)]
+
+    assert [(r.provider, r.response) for r in first] == [(r.provider, r.response) for r in second]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("transport", ["stdin", "file"])
+async def test_large_prompt_bypasses_argv(fake_providers, monkeypatch, transport):
+    """Prompts larger than ARG_MAX reach both CLIs without touching argv."""
+    log_path = fake_providers(CODEX_RATE_LIMIT_RATE=1)
+    monkeypatch.setenv("CODEX_PROMPT_TRANSPORT", transport)
+    monkeypatch.setenv("GEMINI_PROMPT_TRANSPORT", transport)
+    chain = create_provider_chain("opus", "architect")
+    system_prompt = "architecture notes " * 200_000  # ~3.8 MB
+
+    result = await chain.invoke(system_prompt=system_prompt, user_prompt="Design it")
+
+    assert result.success
+    assert result.provider == "gemini"
+    calls = [line.split() for line in log_path.read_text().splitlines()]
+    assert [call[0] for call in calls] == ["codex", "gemini"]
+    for _, _, _, prompt_chars, argv_bytes, _ in calls:
+        assert int(prompt_chars) > len(system_prompt)
+        assert int(argv_bytes) < 1024
+
+
+@pytest.mark.asyncio
+async def test_argv_transport_still_available(fake_providers, monkeypatch):
+    """CODEX_PROMPT_TRANSPORT=argv keeps the prompt on the command line."""
+    log_path = fake_providers()
+    monkeypatch.setenv("CODEX_PROMPT_TRANSPORT", "argv")
+    chain = create_provider_chain("haiku", "scout")
+
+    result = await chain.invoke(system_prompt="You are a scout.", user_prompt="Find files")
+
+    assert result.provider == "codex"
+    _, _, _, prompt_chars, argv_bytes, _ = log_path.read_text().split()
+    assert int(argv_bytes) > int(prompt_chars)
+
+
+@pytest.mark.asyncio
+async def test_structured_output_returns_only_the_final_answer(fake_providers):
+    """Codex events and Gemini JSON are reduced to the answer plus usage metadata."""
+    fake_providers(PROVIDER_TOOL_CALLS=3)
+    codex = await create_provider_chain("haiku", "scout").invoke(system_prompt="Scout.", user_prompt="Find files")
+    fake_providers(CODEX_RATE_LIMIT_RATE=1)
+    gemini = await create_provider_chain("haiku", "scout").invoke(system_prompt="Scout.", user_prompt="Find files")
+
+    for result in (codex, gemini):
+        assert result.response.startswith(f"[fake-{result.provider}]")
+        assert "command_execution" not in result.response and "src/app.py" not in result.response
+        assert result.metadata["tool_calls"] == 3
+        assert result.metadata["usage"]["input_tokens"] > 0
+        assert result.metadata["duration_s"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_text_output_override(fake_providers, monkeypatch):
+    """<PROVIDER>_OUTPUT=text drops the JSON flags and returns stdout as-is."""
+    fake_providers()
+    monkeypatch.setenv("CODEX_OUTPUT", "text")
+
+    result = await create_provider_chain("haiku", "scout").invoke(system_prompt="Scout.", user_prompt="Find files")
+
+    assert result.response.startswith("[fake-codex]")
+    assert result.metadata["usage"] == {}
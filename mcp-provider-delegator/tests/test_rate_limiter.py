@@ -0,0 +1,88 @@
+"""Tests for the cross-process provider rate limiter."""
+
+import time
+
+import pytest
+from mcp_provider_delegator.provider_client import CodexClient, GeminiClient, ProviderChain
+from mcp_provider_delegator.rate_limiter import Limit, RateLimiter, parse_limits
+
+
+def test_parse_limits():
+    limits = parse_limits("codex=30/min, gemini:gemini-3-flash-preview=2/s")
+
+    assert limits["codex"] == Limit(capacity=30, rate=0.5)
+    assert limits["gemini:gemini-3-flash-preview"] == Limit(capacity=2, rate=2)
+    assert parse_limits("") == {}
+    with pytest.raises(ValueError):
+        parse_limits("codex=30/day")
+
+
+def test_model_specific_limit_wins(tmp_path):
+    limiter = RateLimiter(parse_limits("codex=10/min,codex:gpt-5.2=1/min"), tmp_path / "rl.db")
+
+    assert limiter.limit_for("codex", "gpt-5.2").capacity == 1
+    assert limiter.limit_for("codex", "gpt-5.1-codex-mini").capacity == 10
+    assert limiter.limit_for("gemini", "any") is None
+
+
+@pytest.mark.asyncio
+async def test_bucket_is_shared_through_the_state_file(tmp_path):
+    """Two limiters on one file (two processes) draw from the same bucket."""
+    db = tmp_path / "rl.db"
+    first = RateLimiter({"codex": Limit(capacity=2, rate=0.01)}, db, max_wait=0)
+    second = RateLimiter({"codex": Limit(capacity=2, rate=0.01)}, db, max_wait=0)
+
+    assert await first.acquire("codex", "m") == 0
+    assert await second.acquire("codex", "m") == 0
+    assert await first.acquire("codex", "m") is None
+    assert await second.acquire("codex", "m") is None
+    # Other models have their own bucket
+    assert await second.acquire("codex", "other") == 0
+
+
+@pytest.mark.asyncio
+async def test_waits_within_budget(tmp_path):
+    limiter = RateLimiter({"codex": Limit(capacity=1, rate=10)}, tmp_path / "rl.db", max_wait=1)
+
+    await limiter.acquire("codex", "m")
+    started = time.monotonic()
+    waited = await limiter.acquire("codex", "m")
+
+    assert 0 < waited <= 0.1
+    assert time.monotonic() - started >= waited * 0.9
+
+
+@pytest.mark.asyncio
+async def test_429_cooldown_applies_to_every_process(tmp_path):
+    db = tmp_path / "rl.db"
+    RateLimiter({}, db, cooldown=60).penalize("codex", "m")
+
+    assert await RateLimiter({}, db, max_wait=5, cooldown=60).acquire("codex", "m") is None
+    assert await RateLimiter({}, db, max_wait=5, cooldown=60).acquire("gemini", "m") == 0
+
+
+@pytest.mark.asyncio
+async def test_chain_skips_to_next_provider_when_bucket_is_empty(fake_providers, tmp_path):
+    log_path = fake_providers()
+    limiter = RateLimiter({"codex": Limit(capacity=1, rate=0.001)}, tmp_path / "rl.db", max_wait=0.5)
+    chain = ProviderChain([CodexClient(), GeminiClient()], agent_name="scout", rate_limiter=limiter)
+
+    first = await chain.invoke(system_prompt="Scout.", user_prompt="one")
+    second = await chain.invoke(system_prompt="Scout.", user_prompt="two")
+
+    assert (first.provider, second.provider) == ("codex", "gemini")
+    assert [line.split()[0] for line in log_path.read_text().splitlines()] == ["codex", "gemini"]
+
+
+@pytest.mark.asyncio
+async def test_chain_429_starts_shared_cooldown(fake_providers, tmp_path):
+    log_path = fake_providers(CODEX_RATE_LIMIT_RATE=1)
+    limiter = RateLimiter({}, tmp_path / "rl.db", max_wait=0, cooldown=60)
+    chain = ProviderChain([CodexClient(), GeminiClient()], agent_name="scout", rate_limiter=limiter)
+
+    await chain.invoke(system_prompt="Scout.", user_prompt="one")
+    result = await chain.invoke(system_prompt="Scout.", user_prompt="two")
+
+    assert result.provider == "gemini"
+    # Codex was spawned once; the second call skipped it without spawning
+    assert [line.split()[0] for line in log_path.read_text().splitlines()] == ["codex", "gemini", "gemini"]
@@ -0,0 +1,67 @@
+"""Tests for adaptive provider ordering."""
+
+import random
+
+import pytest
+from mcp_provider_delegator.provider_client import CodexClient, GeminiClient, ProviderChain
+from mcp_provider_delegator.routing import MIN_SAMPLES, AdaptiveRouter
+
+
+def names(providers):
+    return [p.name for p in providers]
+
+
+def seed(router, agent, provider, successes, failures, latency):
+    for _ in range(successes):
+        router.record(agent, provider, True, latency)
+    for _ in range(failures):
+        router.record(agent, provider, False, 0.01)
+
+
+def test_unmeasured_providers_keep_configured_order(tmp_path):
+    router = AdaptiveRouter(tmp_path / "routing.db", exploration=0)
+
+    assert names(router.order("scout", [CodexClient(), GeminiClient()])) == ["codex", "gemini"]
+
+
+def test_faster_provider_goes_first_per_agent(tmp_path):
+    router = AdaptiveRouter(tmp_path / "routing.db", exploration=0)
+    seed(router, "scout", "codex", MIN_SAMPLES, 0, latency=4.0)
+    seed(router, "scout", "gemini", MIN_SAMPLES, 0, latency=1.0)
+    seed(router, "architect", "codex", MIN_SAMPLES, 0, latency=2.0)
+    seed(router, "architect", "gemini", MIN_SAMPLES, 0, latency=3.0)
+
+    assert names(router.order("scout", [CodexClient(), GeminiClient()])) == ["gemini", "codex"]
+    assert names(router.order("architect", [CodexClient(), GeminiClient()])) == ["codex", "gemini"]
+
+
+def test_unreliable_provider_is_demoted(tmp_path):
+    """Quick failures don't make a provider look fast."""
+    router = AdaptiveRouter(tmp_path / "routing.db", exploration=0)
+    seed(router, "scout", "codex", 1, 9, latency=1.0)
+    seed(router, "scout", "gemini", MIN_SAMPLES, 0, latency=2.0)
+
+    assert router.stats("scout")["codex"]["latency"] == pytest.approx(1.0)
+    assert names(router.order("scout", [CodexClient(), GeminiClient()])) == ["gemini", "codex"]
+
+
+def test_exploration_promotes_another_provider(tmp_path):
+    router = AdaptiveRouter(tmp_path / "routing.db", exploration=1, rng=random.Random(0))
+
+    assert names(router.order("scout", [CodexClient(), GeminiClient()])) == ["gemini", "codex"]
+
+
+@pytest.mark.asyncio
+async def test_chain_records_attempts_and_follows_the_stats(fake_providers, tmp_path):
+    fake_providers(CODEX_RATE_LIMIT_RATE=1)
+    router = AdaptiveRouter(tmp_path / "routing.db", exploration=0)
+    chain = ProviderChain([CodexClient(), GeminiClient()], agent_name="scout", router=router)
+
+    for n in range(MIN_SAMPLES):
+        result = await chain.invoke(system_prompt="Scout.", user_prompt=f"task {n}")
+        assert result.provider == "gemini"
+
+    stats = router.stats("scout")
+    assert (stats["codex"]["attempts"], stats["codex"]["successes"]) == (MIN_SAMPLES, 0)
+    assert stats["gemini"]["successes"] == MIN_SAMPLES
+    assert names(router.order("scout", chain.providers)) == ["gemini", "codex"]
@@ -1,14 +1,20 @@
 """Tests for MCP server."""
 
+import asyncio
+import os
+import subprocess
+import sys
+
 import pytest
 from mcp_provider_delegator import server
 
 @pytest.mark.asyncio
 async def test_list_tools():
-    """Test that invoke_agent tool is registered."""
+    """Test that invoke_agent and the job tools are registered."""
     tools = await server.list_tools()
-    assert len(tools) == 1
-    assert tools[0].name == "invoke_agent"
+    assert [tool.name for tool in tools] == [
+        "invoke_agent", "submit_agent_job", "get_agent_job", "cancel_agent_job",
+    ]
     assert "scout" in str(tools[0].inputSchema)
 
 @pytest.mark.asyncio
@@ -26,3 +32,45 @@ async def test_invoke_agent_error_handling():
     assert result[0].text
     # Either succeeds (if providers configured) or returns error
     assert isinstance(result[0].text, str)
+
+@pytest.mark.asyncio
+async def test_identical_concurrent_delegations_share_one_provider_run(fake_providers):
+    """Duplicates in flight await the same run; different prompts don't."""
+    log_path = fake_providers(PROVIDER_LATENCY=0.5)
+    coalesced = server.stats["coalesced"]
+    same = {"agent": "scout", "task_prompt": "Find files"}
+
+    results = await asyncio.gather(
+        server.call_tool("invoke_agent", same),
+        server.call_tool("invoke_agent", same),
+        server.call_tool("invoke_agent", {"agent": "scout", "task_prompt": "Find tests"}),
+    )
+
+    assert results[0][0].text == results[1][0].text
+    assert results[0][0].text != results[2][0].text
+    assert server.stats["coalesced"] == coalesced + 1
+    assert len(log_path.read_text().splitlines()) == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_duplicate_keeps_the_shared_run(fake_providers):
+    log_path = fake_providers(PROVIDER_LATENCY=0.5)
+    request = {"agent": "scout", "task_prompt": "Map modules"}
+    first = asyncio.create_task(server.call_tool("invoke_agent", request))
+    second = asyncio.create_task(server.call_tool("invoke_agent", request))
+    await asyncio.sleep(0.1)
+
+    first.cancel()
+    result = await second
+
+    assert result[0].text.startswith("[fake-codex]")
+    assert len(log_path.read_text().splitlines()) == 1
+
+def test_server_imports_outside_a_project(tmp_path):
+    """The daemon can start from a directory without .claude/agents; loaders are built per request."""
+    env = {k: v for k, v in os.environ.items() if k != "AGENT_TEMPLATES_PATH"}
+    result = subprocess.run(
+        [sys.executable, "-c", "from mcp_provider_delegator import server; assert not server.agent_loaders"],
+        cwd=tmp_path, env=env, capture_output=True, text=True,
+    )
+    assert result.returncode == 0, result.stderr
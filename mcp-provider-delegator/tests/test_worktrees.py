@@ -0,0 +1,95 @@
+"""Tests for running delegated agents in their bead's worktree."""
+
+import asyncio
+import subprocess
+from pathlib import Path
+
+import pytest
+from mcp_provider_delegator import server
+from mcp_provider_delegator.agent_loader import AgentLoader, AgentTemplate
+from mcp_provider_delegator.provider_client import create_provider_chain
+from mcp_provider_delegator.worktrees import task_worktree
+
+
+def make_worktree(project, name):
+    path = project / ".worktrees" / name
+    path.mkdir(parents=True)
+    (path / ".git").write_text("gitdir: ../../.git/worktrees/x\n")
+    return path
+
+
+def test_task_worktree_resolution(tmp_path):
+    bead = make_worktree(tmp_path, "bd-proj-a1b.2")
+    prefixed = make_worktree(tmp_path, "bd-x9")
+    (tmp_path / ".worktrees" / "bd-plain-dir").mkdir()
+
+    assert task_worktree(str(tmp_path), "proj-a1b.2") == str(bead)
+    assert task_worktree(str(tmp_path), "bd-x9") == str(prefixed)
+    assert task_worktree(str(tmp_path), "plain-dir") is None  # Not a git worktree
+    assert task_worktree(str(tmp_path), "missing") is None
+    assert task_worktree(str(tmp_path), "../etc") is None
+    assert task_worktree(str(tmp_path), None) is None
+
+
+def test_read_only_agents_get_read_only_sandbox():
+    scout = AgentTemplate("scout", "haiku", "", ["Read", "Glob", "Grep"], "")
+    reviewer = AgentTemplate("code-reviewer", "haiku", "", ["Read", "Bash"], "")
+    assert scout.read_only and not reviewer.read_only
+
+    codex = create_provider_chain("haiku", "scout", read_only=True).providers[0]
+    assert codex.build_command("-")[codex.build_command("-").index("--sandbox") + 1] == "read-only"
+    codex = create_provider_chain("haiku", "code-reviewer").providers[0]
+    assert "workspace-write" in codex.build_command("-")
+
+
+def test_read_only_covers_string_tool_lists_and_gemini():
+    assert AgentTemplate("scout", "haiku", "", "Read, Glob, Grep", "").read_only
+    assert not AgentTemplate("fixer", "haiku", "", "Read, Write, Edit", "").read_only
+    assert not AgentTemplate("git", "haiku", "", ["Read", "Bash(git:*)"], "").read_only
+
+    gemini = create_provider_chain("haiku", "scout", read_only=True).providers[1]
+    command = gemini.build_command(None)
+    assert command[command.index("--approval-mode") + 1] == "default"
+    gemini = create_provider_chain("haiku", "code-reviewer").providers[1]
+    assert "yolo" in gemini.build_command(None)
+
+
+@pytest.mark.asyncio
+async def test_parallel_tasks_run_in_their_own_worktrees(fake_providers, tmp_path, monkeypatch):
+    log_path = fake_providers(PROVIDER_LATENCY=0.2)
+    templates = str(Path(server.AGENT_TEMPLATES_PATH).resolve())
+    monkeypatch.setitem(server.agent_loaders, server.AGENT_TEMPLATES_PATH, AgentLoader(templates))
+    monkeypatch.chdir(tmp_path)
+    first = make_worktree(tmp_path, "bd-t-1")
+    second = make_worktree(tmp_path, "bd-t-2")
+
+    await asyncio.gather(
+        server.call_tool("invoke_agent", {"agent": "scout", "task_prompt": "Map it", "task_id": "t-1"}),
+        server.call_tool("invoke_agent", {"agent": "scout", "task_prompt": "Map it", "task_id": "t-2"}),
+        server.call_tool("invoke_agent", {"agent": "scout", "task_prompt": "Map it", "task_id": "t-3"}),
+    )
+
+    cwds = sorted(line.split()[-1] for line in log_path.read_text().splitlines())
+    assert cwds == sorted([str(first), str(second), str(tmp_path)])
+
+
+@pytest.mark.asyncio
+async def test_read_only_agents_run_in_a_snapshot_of_head(fake_providers, tmp_path, monkeypatch):
+    log_path = fake_providers()
+    templates = str(Path(server.AGENT_TEMPLATES_PATH).resolve())
+    monkeypatch.setitem(server.agent_loaders, server.AGENT_TEMPLATES_PATH, AgentLoader(templates))
+    monkeypatch.chdir(tmp_path)
+    git = ["git", "-c", "user.name=t", "-c", "user.email=t@example.com"]
+    subprocess.run([*git, "init", "-q"], check=True)
+    (tmp_path / "file.txt").write_text("committed\n")
+    subprocess.run([*git, "add", "file.txt"], check=True)
+    subprocess.run([*git, "commit", "-q", "-m", "initial"], check=True)
+    (tmp_path / "file.txt").write_text("half-applied edit\n")
+
+    await server.call_tool("invoke_agent", {"agent": "scout", "task_prompt": "Map it", "task_id": "t-9"})
+
+    snapshot = Path(log_path.read_text().split()[-1])
+    assert snapshot != tmp_path
+    assert not snapshot.exists()  # Removed after the run
+    worktrees = subprocess.run(["git", "worktree", "list"], capture_output=True, text=True, check=True).stdout
+    assert len(worktrees.splitlines()) == 1
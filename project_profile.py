@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""
+Project introspection for beads-based orchestration.
+
+Scans the project root ONCE (a single os.scandir pass) and derives a profile of
+name, languages, frameworks, package managers and infrastructure. Manifests are
+only opened when a field that depends on them is requested, and only the fields
+that matter are extracted.
+
+The profile is shared by bootstrap.py (project name inference) and the generated
+agents: bootstrap persists it to .beads/project-profile.json, and the discovery
+agent reads that file instead of rescanning the tree.
+
+Usage:
+    python project_profile.py [DIR]            # Human-readable summary
+    python project_profile.py [DIR] --json     # Profile as JSON
+"""
+
+import json
+import os
+import sys
+from dataclasses import asdict, dataclass, field
+from functools import cached_property
+from pathlib import Path
+from typing import Optional
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+PROFILE_VERSION = 1
+PROFILE_FILE = Path(".beads") / "project-profile.json"
+
+# Manifest file -> language it implies
+MANIFEST_LANGUAGES = {
+    "package.json": "javascript",
+    "tsconfig.json": "typescript",
+    "pyproject.toml": "python",
+    "requirements.txt": "python",
+    "setup.py": "python",
+    "Pipfile": "python",
+    "Cargo.toml": "rust",
+    "go.mod": "go",
+    "Gemfile": "ruby",
+    "composer.json": "php",
+    "pom.xml": "java",
+    "build.gradle": "java",
+    "build.gradle.kts": "kotlin",
+    "Package.swift": "swift",
+    "Podfile": "swift",
+    "pubspec.yaml": "dart",
+}
+
+# Lockfile / manifest -> package manager (first match per ecosystem wins in listing order)
+PACKAGE_MANAGER_FILES = {
+    "pnpm-lock.yaml": "pnpm",
+    "yarn.lock": "yarn",
+    "bun.lockb": "bun",
+    "bun.lock": "bun",
+    "package-lock.json": "npm",
+    "uv.lock": "uv",
+    "poetry.lock": "poetry",
+    "Pipfile": "pipenv",
+    "requirements.txt": "pip",
+    "Cargo.toml": "cargo",
+    "go.mod": "go",
+    "Gemfile": "bundler",
+    "composer.json": "composer",
+    "pom.xml": "maven",
+    "build.gradle": "gradle",
+    "build.gradle.kts": "gradle",
+    "Package.swift": "swiftpm",
+    "Podfile": "cocoapods",
+    "pubspec.yaml": "pub",
+}
+
+# Root entries -> infrastructure tooling
+INFRASTRUCTURE_FILES = {
+    "Dockerfile": "docker",
+    "docker-compose.yml": "docker-compose",
+    "docker-compose.yaml": "docker-compose",
+    "compose.yml": "docker-compose",
+    "compose.yaml": "docker-compose",
+    "terraform": "terraform",
+    ".github": "github-actions",
+}
+
+# Dependency name -> framework, per ecosystem
+NODE_FRAMEWORKS = {
+    "next": "nextjs",
+    "react": "react",
+    "react-native": "react-native",
+    "nuxt": "nuxt",
+    "vue": "vue",
+    "svelte": "svelte",
+    "@sveltejs/kit": "sveltekit",
+    "@angular/core": "angular",
+    "express": "express",
+    "fastify": "fastify",
+    "@nestjs/core": "nestjs",
+    "electron": "electron",
+}
+PYTHON_FRAMEWORKS = {
+    "django": "django",
+    "flask": "flask",
+    "fastapi": "fastapi",
+    "starlette": "starlette",
+}
+GO_FRAMEWORKS = {
+    "github.com/gin-gonic/gin": "gin",
+    "github.com/labstack/echo": "echo",
+    "github.com/gofiber/fiber": "fiber",
+}
+RUST_FRAMEWORKS = {
+    "axum": "axum",
+    "actix-web": "actix-web",
+    "rocket": "rocket",
+    "tauri": "tauri",
+}
+
+
+def _normalize_requirement(requirement: str) -> str:
+    """Reduce a requirement string ('Django>=4 ; python_version...') to its name."""
+    name = requirement.strip()
+    for separator in ("[", ";", "=", "<", ">", "~", "!", " ", "@"):
+        name = name.split(separator, 1)[0]
+    return name.lower().replace("_", "-")
+
+
+def _display_name(name: str) -> str:
+    return name.replace("-", " ").replace("_", " ").title()
+
+
+@dataclass
+class ProjectProfile:
+    """Serializable snapshot of what a project is built with."""
+    name: str
+    display_name: str
+    languages: list[str]
+    frameworks: list[str]
+    package_managers: list[str]
+    infrastructure: list[str]
+    manifests: list[str]
+    fingerprint: list[list] = field(default_factory=list)
+    version: int = PROFILE_VERSION
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class ProjectScanner:
+    """Lazily derives a ProjectProfile from a single scan of the project root."""
+
+    def __init__(self, project_dir: Path):
+        """
+        Initialize scanner.
+
+        Args:
+            project_dir: Project root to scan (not recursed into)
+        """
+        self.project_dir = Path(project_dir)
+        self.entries: dict[str, os.DirEntry] = {}
+        try:
+            with os.scandir(self.project_dir) as it:
+                for entry in it:
+                    self.entries[entry.name] = entry
+        except OSError:
+            pass
+
+    def _has(self, name: str) -> bool:
+        return name in self.entries
+
+    def _read_text(self, name: str) -> Optional[str]:
+        if not self._has(name):
+            return None
+        try:
+            return (self.project_dir / name).read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    # ------------------------------------------------------------------
+    # Manifest parsing (each manifest is parsed at most once)
+    # ------------------------------------------------------------------
+
+    @cached_property
+    def _package_json(self) -> dict:
+        content = self._read_text("package.json")
+        try:
+            data = json.loads(content) if content else {}
+        except json.JSONDecodeError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _load_toml(self, name: str) -> dict:
+        if tomllib is None:
+            return {}
+        content = self._read_text(name)
+        try:
+            return tomllib.loads(content) if content else {}
+        except Exception:
+            return {}
+
+    @cached_property
+    def _pyproject(self) -> dict:
+        return self._load_toml("pyproject.toml")
+
+    @cached_property
+    def _cargo(self) -> dict:
+        return self._load_toml("Cargo.toml")
+
+    @cached_property
+    def _go_mod_lines(self) -> list[str]:
+        content = self._read_text("go.mod")
+        return content.splitlines() if content else []
+
+    @cached_property
+    def _python_dependencies(self) -> set[str]:
+        deps = set()
+        project = self._pyproject.get("project", {})
+        for requirement in project.get("dependencies", []):
+            deps.add(_normalize_requirement(requirement))
+        for group in project.get("optional-dependencies", {}).values():
+            deps.update(_normalize_requirement(requirement) for requirement in group)
+        poetry_deps = self._pyproject.get("tool", {}).get("poetry", {}).get("dependencies", {})
+        deps.update(_normalize_requirement(name) for name in poetry_deps)
+
+        requirements = self._read_text("requirements.txt")
+        if requirements:
+            for line in requirements.splitlines():
+                line = line.strip()
+                if line and not line.startswith(("#", "-")):
+                    deps.add(_normalize_requirement(line))
+        return deps
+
+    # ------------------------------------------------------------------
+    # Profile fields
+    # ------------------------------------------------------------------
+
+    @cached_property
+    def name(self) -> str:
+        """Project name from the first manifest that declares one, else the directory name."""
+        if name := self._package_json.get("name"):
+            return name
+        if tomllib and self._has("pyproject.toml"):
+            if name := self._pyproject.get("project", {}).get("name"):
+                return name
+            if name := self._pyproject.get("tool", {}).get("poetry", {}).get("name"):
+                return name
+        if tomllib and self._has("Cargo.toml"):
+            if name := self._cargo.get("package", {}).get("name"):
+                return name
+        for line in self._go_mod_lines:
+            if line.startswith("module "):
+                return line.split()[1].split("/")[-1]
+        return self.project_dir.resolve().name
+
+    @cached_property
+    def languages(self) -> list[str]:
+        languages = []
+        for manifest, language in MANIFEST_LANGUAGES.items():
+            if self._has(manifest) and language not in languages:
+                languages.append(language)
+        if any(name.endswith(".xcodeproj") for name in self.entries) and "swift" not in languages:
+            languages.append("swift")
+        if "typescript" not in languages and "typescript" in self._node_dependencies:
+            languages.append("typescript")
+        return languages
+
+    @cached_property
+    def _node_dependencies(self) -> set[str]:
+        deps = set()
+        for key in ("dependencies", "devDependencies", "peerDependencies"):
+            section = self._package_json.get(key)
+            if isinstance(section, dict):
+                deps.update(section)
+        return deps
+
+    @cached_property
+    def frameworks(self) -> list[str]:
+        frameworks = []
+        if self._has("package.json"):
+            frameworks += [fw for dep, fw in NODE_FRAMEWORKS.items() if dep in self._node_dependencies]
+        if self._has("pyproject.toml") or self._has("requirements.txt"):
+            frameworks += [fw for dep, fw in PYTHON_FRAMEWORKS.items() if dep in self._python_dependencies]
+        if self._has("go.mod"):
+            requires = "\n".join(self._go_mod_lines)
+            frameworks += [fw for module, fw in GO_FRAMEWORKS.items() if module in requires]
+        if self._has("Cargo.toml"):
+            cargo_deps = self._cargo.get("dependencies", {})
+            frameworks += [fw for dep, fw in RUST_FRAMEWORKS.items() if dep in cargo_deps]
+        if self._has("pubspec.yaml"):
+            pubspec = self._read_text("pubspec.yaml") or ""
+            if "flutter:" in pubspec:
+                frameworks.append("flutter")
+        if self._has("Gemfile") and "rails" in (self._read_text("Gemfile") or ""):
+            frameworks.append("rails")
+        return frameworks
+
+    @cached_property
+    def package_managers(self) -> list[str]:
+        managers = []
+        for manifest, manager in PACKAGE_MANAGER_FILES.items():
+            if self._has(manifest) and manager not in managers:
+                managers.append(manager)
+        # package.json without a lockfile still implies npm
+        if self._has("package.json") and not {"npm", "yarn", "pnpm", "bun"} & set(managers):
+            managers.append("npm")
+        return managers
+
+    @cached_property
+    def infrastructure(self) -> list[str]:
+        infrastructure = []
+        for name, tool in INFRASTRUCTURE_FILES.items():
+            if not self._has(name) or tool in infrastructure:
+                continue
+            if tool == "github-actions" and not (self.project_dir / ".github" / "workflows").is_dir():
+                continue
+            infrastructure.append(tool)
+        if "terraform" not in infrastructure and any(name.endswith(".tf") for name in self.entries):
+            infrastructure.append("terraform")
+        return infrastructure
+
+    @cached_property
+    def manifests(self) -> list[str]:
+        known = set(MANIFEST_LANGUAGES) | set(PACKAGE_MANAGER_FILES)
+        return sorted(name for name in self.entries if name in known)
+
+    def fingerprint(self) -> list[list]:
+        """(name, mtime_ns, size) of manifests and infrastructure files - staleness check for cached profiles.
+
+        Directories (.github/workflows, terraform/) are stat'ed themselves: their
+        mtime changes when files are added or removed.
+        """
+        names = set(self.manifests)
+        names.update(name for name in self.entries if name in INFRASTRUCTURE_FILES or name.endswith(".tf"))
+        stats = []
+        for name in sorted(names):
+            try:
+                stats.append((name, self.entries[name].stat()))
+            except OSError:
+                continue
+        if self._has(".github"):
+            try:
+                stats.append((".github/workflows", (self.project_dir / ".github" / "workflows").stat()))
+            except OSError:
+                pass
+        return [[name, st.st_mtime_ns, st.st_size] for name, st in stats]
+
+    def profile(self) -> ProjectProfile:
+        return ProjectProfile(
+            name=self.name,
+            display_name=_display_name(self.name),
+            languages=self.languages,
+            frameworks=self.frameworks,
+            package_managers=self.package_managers,
+            infrastructure=self.infrastructure,
+            manifests=self.manifests,
+            fingerprint=self.fingerprint(),
+        )
+
+
+# In-process cache: one scan per project directory per run
+_PROFILE_CACHE: dict[Path, ProjectProfile] = {}
+
+
+def scan_project(project_dir: Path) -> ProjectProfile:
+    """
+    Return the profile for a project, scanning its root at most once per process.
+
+    Args:
+        project_dir: Project root
+
+    Returns:
+        ProjectProfile for the directory
+    """
+    key = Path(project_dir).resolve()
+    if key not in _PROFILE_CACHE:
+        _PROFILE_CACHE[key] = ProjectScanner(key).profile()
+    return _PROFILE_CACHE[key]
+
+
+def load_profile(project_dir: Path) -> Optional[ProjectProfile]:
+    """
+    Load the persisted profile if it is still valid for the project.
+
+    The persisted fingerprint is compared against a fresh directory listing
+    (no manifest is opened), so a stale or missing profile returns None.
+    """
+    profile_path = Path(project_dir) / PROFILE_FILE
+    try:
+        data = json.loads(profile_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get("version") != PROFILE_VERSION:
+        return None
+    if data.get("fingerprint") != ProjectScanner(Path(project_dir)).fingerprint():
+        return None
+    try:
+        return ProjectProfile(**data)
+    except TypeError:
+        return None
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Detect project name and tech stack")
+    parser.add_argument("project_dir", nargs="?", default=".", help="Project directory")
+    parser.add_argument("--json", action="store_true", help="Print profile as JSON")
+    args = parser.parse_args()
+
+    project_dir = Path(args.project_dir)
+    profile = load_profile(project_dir) or scan_project(project_dir)
+
+    if args.json:
+        print(json.dumps(profile.to_dict(), indent=2))
+        return
+
+    print(f"Project:          {profile.display_name}")
+    print(f"Languages:        {', '.join(profile.languages) or '-'}")
+    print(f"Frameworks:       {', '.join(profile.frameworks) or '-'}")
+    print(f"Package managers: {', '.join(profile.package_managers) or '-'}")
+    print(f"Infrastructure:   {', '.join(profile.infrastructure) or '-'}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
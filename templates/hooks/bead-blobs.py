@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+bead-blobs.py - Keep large bead comment bodies out of .beads/issues.jsonl
+
+Usage:
+  echo "text" | .claude/hooks/bead-blobs.py compact     # Print the comment to post (stored if large)
+  echo "text" | .claude/hooks/bead-blobs.py comment BEAD_ID   # compact, then post via the comment spool
+  .claude/hooks/bead-blobs.py cat SHA256                # Print a stored body
+  .claude/hooks/bead-blobs.py show BEAD_ID              # bd show with blob references expanded
+  echo "text" | .claude/hooks/bead-blobs.py expand      # Expand references in any text
+
+A comment longer than BEAD_BLOB_THRESHOLD chars (default 512) is stored
+once, by content hash, in .beads/blobs/<2 hex>/<sha256>.md. The comment
+keeps its first line (e.g. the DISPATCH_PROMPT header), a short excerpt and
+a reference:
+
+  [blob sha256:<64 hex> 1873 chars: .beads/blobs/ab/ab12....md]
+
+so every reader of issues.jsonl skips the bulk, and readers that need the
+full text resolve references only when they show a comment.
+"""
+
+import hashlib
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+THRESHOLD = int(os.environ.get("BEAD_BLOB_THRESHOLD", 512))
+EXCERPT_CHARS = 200
+
+REFERENCE = re.compile(r"\[blob sha256:([0-9a-f]{64})[^\]]*\]")
+# What compact() posts: header line, excerpt line, reference
+COMPACTED = re.compile(r"[^\n]*\n\n[^\n]*\.\.\.\n\n\[blob sha256:([0-9a-f]{64})[^\]]*\]")
+
+
+def project_dir() -> Path:
+    if os.environ.get("CLAUDE_PROJECT_DIR"):
+        return Path(os.environ["CLAUDE_PROJECT_DIR"])
+    # From a supervisor's worktree, .beads/ is in the main checkout
+    result = subprocess.run(["git", "rev-parse", "--path-format=absolute", "--git-common-dir"],
+                            capture_output=True, text=True)
+    return Path(result.stdout.strip()).parent if result.returncode == 0 else Path(".")
+
+
+def blob_path(digest: str) -> Path:
+    return Path(".beads") / "blobs" / digest[:2] / f"{digest}.md"
+
+
+def store(text: str) -> str:
+    """Write text to the blob store (once per content) and return its sha256."""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    path = project_dir() / blob_path(digest)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+    return digest
+
+
+def compact(text: str) -> str:
+    """The comment to post for text: unchanged if short, else header, excerpt and reference."""
+    if len(text) <= THRESHOLD:
+        return text
+    digest = store(text)
+    header, _, body = text.partition("\n")
+    excerpt = " ".join(body.split())[:EXCERPT_CHARS]
+    return f"{header}\n\n{excerpt}...\n\n[blob sha256:{digest} {len(text)} chars: {blob_path(digest)}]"
+
+
+def load(digest: str):
+    try:
+        return (project_dir() / blob_path(digest)).read_text(encoding="utf-8")
+    except OSError:
+        return None
+
+
+def expand(text: str) -> str:
+    """Replace compacted comments and bare references with the stored bodies.
+
+    Missing blobs stay as they are.
+    """
+    if "[blob sha256:" not in text:
+        return text
+    text = COMPACTED.sub(lambda m: load(m.group(1)) or m.group(0), text)
+    return REFERENCE.sub(lambda m: load(m.group(1)) or m.group(0), text)
+
+
+def show(bead_id: str) -> int:
+    result = subprocess.run(["bd", "show", bead_id, "--json"], capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        return result.returncode
+    issues = json.loads(result.stdout or "[]")
+    for issue in issues if isinstance(issues, list) else [issues]:
+        for comment in issue.get("comments") or []:
+            comment["text"] = expand(comment.get("text", ""))
+    print(json.dumps(issues, indent=2))
+    return 0
+
+
+def main() -> int:
+    args = sys.argv[1:]
+    command = args[0] if args else ""
+    if command == "compact":
+        print(compact(sys.stdin.read().rstrip("\n")))
+        return 0
+    if command == "comment" and len(args) > 1:
+        text = compact(sys.stdin.read().rstrip("\n"))
+        spool = Path(__file__).with_name("comment-spool.py")
+        if spool.exists():
+            return subprocess.run([sys.executable, str(spool), "enqueue", args[1]], input=text, text=True).returncode
+        return subprocess.run(["bd", "comment", args[1], text]).returncode
+    if command == "cat" and len(args) > 1:
+        body = load(args[1].removeprefix("sha256:"))
+        if body is None:
+            print(f"No blob {args[1]}", file=sys.stderr)
+            return 1
+        print(body)
+        return 0
+    if command == "expand":
+        print(expand(sys.stdin.read().rstrip("\n")))
+        return 0
+    if command == "show" and len(args) > 1:
+        return show(args[1])
+    print(__doc__.strip())
+    return 0 if command in ("-h", "--help") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
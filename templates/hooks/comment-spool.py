@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+comment-spool.py - Write-behind bead comments, so hooks never wait on bd
+
+Usage:
+  echo "text" | .claude/hooks/comment-spool.py enqueue BEAD_ID   # Spool, start a flush, return
+  .claude/hooks/comment-spool.py flush                            # Deliver everything pending
+  .claude/hooks/comment-spool.py status
+
+Each comment is written atomically to .beads/spool/ under a time-ordered
+name. One flusher at a time delivers them: all pending comments for a bead
+go out in a single `bd comment` (oldest first, separated by a --- line),
+and a spool file is deleted only after bd accepted it. Comments over the
+blob threshold are stored in .beads/blobs/ first (see bead-blobs.py).
+
+A failed bead is retried with backoff (COMMENT_SPOOL_RETRIES attempts per
+flush, default 3) and left in the spool for the next flush; after
+COMMENT_SPOOL_MAX_FLUSHES failed flushes (default 20) its comments move to
+.beads/spool/failed/, which SessionStart reports.
+"""
+
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: enqueue delivers synchronously instead
+    fcntl = None
+
+RETRIES = int(os.environ.get("COMMENT_SPOOL_RETRIES", 3))
+MAX_FLUSHES = int(os.environ.get("COMMENT_SPOOL_MAX_FLUSHES", 20))
+SEPARATOR = "\n\n---\n\n"
+
+
+def project_dir() -> Path:
+    return Path(os.environ.get("CLAUDE_PROJECT_DIR") or ".")
+
+
+def spool_dir() -> Path:
+    return project_dir() / ".beads" / "spool"
+
+
+def pending_files() -> list:
+    directory = spool_dir()
+    return sorted(directory.glob("*.json")) if directory.is_dir() else []
+
+
+def enqueue(bead_id: str, text: str) -> int:
+    directory = spool_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    # Nanosecond time first so sorted names are submission order
+    name = f"{time.time_ns():020d}-{os.getpid()}"
+    tmp = directory / f".{name}.tmp"
+    tmp.write_text(json.dumps({"bead": bead_id, "text": text, "ts": int(time.time()), "flushes": 0}), encoding="utf-8")
+    os.replace(tmp, directory / f"{name}.json")
+
+    if fcntl is None:
+        return flush()
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "flush"],
+        cwd=project_dir(), stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    return 0
+
+
+def compactor():
+    """bead-blobs.py's compact(), or None if it isn't installed next to this script."""
+    path = Path(__file__).with_name("bead-blobs.py")
+    if not path.exists():
+        return None
+    spec = importlib.util.spec_from_file_location("bead_blobs", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.compact
+
+
+def deliver(bead_id: str, texts: list) -> bool:
+    """One bd comment with every pending text for the bead, retried with backoff.
+
+    Large texts go to the blob store first; the comment carries a reference.
+    """
+    compact = compactor()
+    if compact:
+        texts = [compact(text) for text in texts]
+    for attempt in range(RETRIES):
+        if attempt:
+            time.sleep(2 ** (attempt - 1))
+        try:
+            result = subprocess.run(["bd", "comment", bead_id, SEPARATOR.join(texts)],
+                                    cwd=project_dir(), capture_output=True, timeout=30)
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        if result.returncode == 0:
+            return True
+    return False
+
+
+def flush_pending() -> None:
+    batches = {}
+    for path in pending_files():
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue  # Unreadable; left for `status` and the next flush
+        batches.setdefault(record["bead"], []).append((path, record))
+
+    for bead_id, entries in batches.items():
+        if deliver(bead_id, [record["text"] for _, record in entries]):
+            for path, _ in entries:
+                path.unlink(missing_ok=True)
+            continue
+        for path, record in entries:
+            record["flushes"] = record.get("flushes", 0) + 1
+            target = path
+            if record["flushes"] >= MAX_FLUSHES:
+                target = spool_dir() / "failed" / path.name
+                target.parent.mkdir(exist_ok=True)
+            # Written aside and renamed, so a crash never leaves a truncated record
+            tmp = spool_dir() / f".{path.stem}.{os.getpid()}.tmp"
+            tmp.write_text(json.dumps(record), encoding="utf-8")
+            os.replace(tmp, target)
+            if target != path:
+                path.unlink(missing_ok=True)
+
+
+def flush() -> int:
+    """Deliver pending comments unless another flusher is already at it."""
+    directory = spool_dir()
+    if not directory.is_dir():
+        return 0
+    lock_path = directory / ".flush.lock"
+    while True:
+        with open(lock_path, "a") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return 0  # The running flusher re-checks the spool after releasing
+            before = {p.name for p in pending_files()}
+            flush_pending()
+        # A comment spooled while we held the lock saw it taken; pick it up now
+        if not {p.name for p in pending_files()} - before:
+            return 0
+
+
+def status() -> int:
+    failed = spool_dir() / "failed"
+    failed_count = len(list(failed.glob("*.json"))) if failed.is_dir() else 0
+    beads = {}
+    for path in pending_files():
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        beads[record["bead"]] = beads.get(record["bead"], 0) + 1
+    print(f"Spool: {sum(beads.values())} pending comment(s) for {len(beads)} bead(s), {failed_count} failed")
+    for bead_id, count in sorted(beads.items()):
+        print(f"  {bead_id:<24} {count}")
+    return 0
+
+
+def main() -> int:
+    args = sys.argv[1:]
+    command = args[0] if args else ""
+    if command == "enqueue" and len(args) > 1:
+        text = sys.stdin.read().rstrip("\n")
+        return enqueue(args[1], text) if text.strip() else 0
+    if command == "flush":
+        return flush()
+    if command == "status":
+        return status()
+    print(__doc__.strip())
+    return 0 if command in ("-h", "--help") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -44,7 +44,7 @@ if [[ "$BEAD_ID" == *"."* ]]; then
 
   if [[ -n "$BLOCKERS" ]]; then
     cat << EOF
-{"hookSpecificOutput":{"hookEventName":"PreToolUse","permissionDecision":"deny","permissionDecisionReason":"<blocked-task>\nCannot dispatch ${BEAD_ID} - unresolved blockers: ${BLOCKERS}\n\nComplete blocking tasks first, then dispatch this one.\n\nUse: bd ready --json to see tasks with no blockers.\n</blocked-task>"}}
+{"hookSpecificOutput":{"hookEventName":"PreToolUse","permissionDecision":"deny","permissionDecisionReason":"<blocked-task>\nCannot dispatch ${BEAD_ID} - unresolved blockers: ${BLOCKERS}\n\nComplete blocking tasks first, then dispatch this one.\n\nUse: .claude/hooks/epic-scheduler.py next ${EPIC_ID} to see which children can run now (in parallel).\n</blocked-task>"}}
 EOF
     exit 0
   fi
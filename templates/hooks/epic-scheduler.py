@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+epic-scheduler.py - Dispatch an epic's children in parallel waves
+
+Usage:
+  .claude/hooks/epic-scheduler.py plan EPIC_ID               # Waves, critical path and next set
+  .claude/hooks/epic-scheduler.py next EPIC_ID [--max N] [--json]
+
+Builds the dependency DAG of the epic's children (EPIC_ID.N) from their
+`blocks` dependencies. Wave 1 is every open child whose blockers are all
+closed; wave k holds children whose blockers are in earlier waves. The
+critical path is the longest chain of open children, weighted by
+estimated_minutes when beads set it.
+
+`next` is the set to dispatch now: open children with no unresolved
+blocker, longest remaining chain first, skipping any whose `scope:<dir>`
+labels overlap a child already running or already picked (same directory
+or one inside the other), so parallel supervisors don't edit the same
+files. Children without scope labels are assumed not to overlap. --max caps
+the set at the number of supervisors you want running.
+
+Beads come from `bd`; without it, from .beads/issues.jsonl.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+DONE = ("closed", "done")
+RUNNING = ("in_progress", "inreview")
+
+# Dependency types that don't order work
+NON_BLOCKING = ("related", "discovered-from", "parent-child")
+
+
+@dataclass
+class Child:
+    id: str
+    title: str
+    status: str
+    priority: int
+    weight: int
+    scope: list
+    blockers: set = field(default_factory=set)  # Unresolved blocker IDs (epic children or external)
+
+
+def project_dir() -> Path:
+    return Path(os.environ.get("CLAUDE_PROJECT_DIR") or ".")
+
+
+def bd_json(*args):
+    result = subprocess.run(["bd", *args, "--json"], capture_output=True, text=True, timeout=30)
+    if result.returncode != 0:
+        raise RuntimeError(f"bd {' '.join(args)}: {result.stderr.strip()}")
+    return json.loads(result.stdout or "[]")
+
+
+def scope_of(issue: dict) -> list:
+    return [label[len("scope:"):].strip("/") for label in issue.get("labels") or [] if label.startswith("scope:")]
+
+
+def make_child(issue: dict) -> Child:
+    return Child(
+        id=issue["id"],
+        title=issue.get("title", ""),
+        status=issue.get("status", "open"),
+        priority=int(issue.get("priority", 2)),
+        weight=max(1, int(issue.get("estimated_minutes") or 1)),
+        scope=scope_of(issue),
+    )
+
+
+def load_from_bd(epic_id: str) -> dict:
+    issues = bd_json("list")
+    status = {issue["id"]: issue.get("status") for issue in issues}
+    children = {i["id"]: make_child(i) for i in issues if i["id"].startswith(epic_id + ".")}
+
+    def blockers(child_id):
+        deps = bd_json("dep", "list", child_id)
+        return {
+            dep["id"] for dep in deps
+            if dep.get("id") != epic_id
+            and dep.get("dependency_type", "blocks") not in NON_BLOCKING
+            and (dep.get("status") or status.get(dep["id"])) not in DONE
+        }
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for child, found in zip(children.values(), pool.map(blockers, list(children))):
+            child.blockers = found
+    return children
+
+
+def load_from_jsonl(epic_id: str) -> dict:
+    issues = []
+    with open(project_dir() / ".beads" / "issues.jsonl", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                issues.append(json.loads(line))
+    status = {issue["id"]: issue.get("status") for issue in issues}
+    children = {}
+    for issue in issues:
+        if not issue["id"].startswith(epic_id + "."):
+            continue
+        child = make_child(issue)
+        child.blockers = {
+            dep["depends_on_id"] for dep in issue.get("dependencies") or []
+            if dep.get("depends_on_id") != epic_id
+            and dep.get("type", "blocks") not in NON_BLOCKING
+            and status.get(dep["depends_on_id"]) not in DONE
+        }
+        children[child.id] = child
+    return children
+
+
+def load_children(epic_id: str) -> dict:
+    try:
+        return load_from_bd(epic_id)
+    except (OSError, RuntimeError, ValueError, subprocess.TimeoutExpired):
+        return load_from_jsonl(epic_id)
+
+
+# ============================================================================
+# SCHEDULING
+# ============================================================================
+
+def waves(children: dict) -> list:
+    """Open and running children layered so every blocker sits in an earlier wave.
+
+    Raises ValueError on a dependency cycle.
+    """
+    pending = {c.id: c for c in children.values() if c.status not in DONE}
+    placed, layers = set(), []
+    while pending:
+        layer = sorted(
+            (c for c in pending.values() if all(b in placed or b not in pending for b in c.blockers)),
+            key=lambda c: (c.priority, c.id),
+        )
+        if not layer:
+            raise ValueError(f"Dependency cycle among: {', '.join(sorted(pending))}")
+        layers.append(layer)
+        for child in layer:
+            placed.add(child.id)
+            del pending[child.id]
+    return layers
+
+
+def remaining_chain(children: dict, layers: list) -> dict:
+    """Weight of the longest chain of open work starting at each child."""
+    dependents = {c.id: [] for layer in layers for c in layer}
+    for layer in layers:
+        for child in layer:
+            for blocker in child.blockers:
+                if blocker in dependents:
+                    dependents[blocker].append(child.id)
+    chain = {}
+    for layer in reversed(layers):
+        for child in layer:
+            chain[child.id] = child.weight + max((chain[d] for d in dependents[child.id]), default=0)
+    return chain
+
+
+def critical_path(children: dict, layers: list) -> list:
+    chain = remaining_chain(children, layers)
+    if not chain:
+        return []
+    path = [max((c for c in layers[0]), key=lambda c: (chain[c.id], -c.priority)).id]
+    while True:
+        following = [c for layer in layers for c in layer if path[-1] in c.blockers]
+        if not following:
+            return path
+        path.append(max(following, key=lambda c: (chain[c.id], -c.priority)).id)
+
+
+def overlaps(a: list, b: list) -> bool:
+    """Whether two scope lists share a directory (equal, or one inside the other)."""
+    for x in a:
+        for y in b:
+            if x == y or not x or not y or x.startswith(y + "/") or y.startswith(x + "/"):
+                return True
+    return False
+
+
+def next_set(children: dict, limit: int = 0) -> tuple:
+    """(children to dispatch now, {child id: reason held back})."""
+    layers = waves(children)
+    chain = remaining_chain(children, layers)
+    running = [c for c in children.values() if c.status in RUNNING]
+    ready = sorted(
+        (c for c in children.values() if c.status == "open" and not c.blockers),
+        key=lambda c: (-chain[c.id], c.priority, c.id),
+    )
+    chosen, held = [], {}
+    slots = max(0, limit - len(running)) if limit else len(ready)
+    for child in ready:
+        conflict = next((o for o in running + chosen if overlaps(child.scope, o.scope)), None)
+        if conflict:
+            held[child.id] = f"scope overlaps {conflict.id}"
+        elif len(chosen) >= slots:
+            held[child.id] = "supervisor limit reached"
+        else:
+            chosen.append(child)
+    return chosen, held
+
+
+# ============================================================================
+# COMMANDS
+# ============================================================================
+
+def describe(child: Child) -> str:
+    scope = f" [{', '.join(child.scope)}]" if child.scope else ""
+    return f"{child.id} ({child.status}) {child.title}{scope}"
+
+
+def plan(epic_id: str) -> int:
+    children = load_children(epic_id)
+    if not children:
+        print(f"No children found for {epic_id}")
+        return 1
+    layers = waves(children)
+    remaining = sum(len(layer) for layer in layers)
+    print(f"{epic_id}: {remaining} open or running children in {len(layers)} wave(s)\n")
+    for number, layer in enumerate(layers, 1):
+        print(f"Wave {number}:")
+        for child in layer:
+            print(f"  {describe(child)}")
+    print(f"\nCritical path: {' -> '.join(critical_path(children, layers)) or '(none)'}")
+    chosen, held = next_set(children)
+    print(f"Dispatch now: {', '.join(c.id for c in chosen) or '(nothing)'}")
+    for child_id, reason in held.items():
+        print(f"  held: {child_id} ({reason})")
+    return 0
+
+
+def next_command(epic_id: str, limit: int, as_json: bool) -> int:
+    children = load_children(epic_id)
+    chosen, held = next_set(children, limit)
+    if as_json:
+        print(json.dumps({
+            "epic": epic_id,
+            "dispatch": [{"id": c.id, "title": c.title, "scope": c.scope} for c in chosen],
+            "running": sorted(c.id for c in children.values() if c.status in RUNNING),
+            "held": held,
+        }))
+    else:
+        for child in chosen:
+            print(describe(child))
+    return 0
+
+
+def count(minimum: int):
+    """argparse type for an integer of at least minimum."""
+    def parse(value: str) -> int:
+        try:
+            number = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected an integer, not {value!r}")
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}, not {number}")
+        return number
+    return parse
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="epic-scheduler",
+        description=__doc__.strip(),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    plan_parser = commands.add_parser("plan", help="Waves, critical path and next set")
+    plan_parser.add_argument("epic_id")
+    next_parser = commands.add_parser("next", help="Children to dispatch now")
+    next_parser.add_argument("epic_id")
+    next_parser.add_argument("--max", type=count(0), default=0, help="Supervisors to run at once (0: no limit)")
+    next_parser.add_argument("--json", action="store_true", help="Print the set as JSON")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "plan":
+            return plan(args.epic_id)
+        return next_command(args.epic_id, args.max, as_json=args.json)
+    except (OSError, ValueError) as e:
+        print(f"epic-scheduler: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+hook-profiler.py - Opt-in timing records for the hooks in settings.json
+
+Usage:
+  .claude/hooks/hook-profiler.py enable              # Wrap every hook command in settings.json
+  .claude/hooks/hook-profiler.py disable             # Restore the plain hook commands
+  .claude/hooks/hook-profiler.py summary [--top 10] [--sessions 5]
+  .claude/hooks/hook-profiler.py run <hook command>  # Used by the wrapped commands
+
+A wrapped hook runs unchanged (same stdin, stdout, stderr and exit status);
+the wrapper appends one JSON line per call to .beads/profile/hooks.jsonl:
+  {"ts", "session", "hook", "event", "tool", "ms", "exit", "decision", "input_bytes"}
+
+The file rotates at HOOK_PROFILE_MAX_BYTES (default 1 MB), keeping
+HOOK_PROFILE_KEEP (default 3) older files as hooks.1.jsonl, hooks.2.jsonl, ...
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: rotation races are tolerated
+    fcntl = None
+
+# Must match HOOK_PROFILER_COMMAND in bootstrap.py
+WRAPPER = ".claude/hooks/hook-profiler.py run "
+
+MAX_BYTES = int(os.environ.get("HOOK_PROFILE_MAX_BYTES", 1024 * 1024))
+KEEP = int(os.environ.get("HOOK_PROFILE_KEEP", 3))
+
+# Commands using these can't be re-executed from argv, so they stay unwrapped
+SHELL_SYNTAX = set("|&;<>()$`\\\"'*?[]{}~")
+
+
+def project_dir() -> Path:
+    return Path(os.environ.get("CLAUDE_PROJECT_DIR") or ".")
+
+
+def profile_file() -> Path:
+    return Path(os.environ.get("HOOK_PROFILE_FILE") or project_dir() / ".beads" / "profile" / "hooks.jsonl")
+
+
+def rotated(path: Path, index: int) -> Path:
+    return path.with_name(f"{path.stem}.{index}{path.suffix}")
+
+
+def decision_of(exit_code: int, stdout: bytes) -> str:
+    """Summarize what the hook told Claude: block, approve, context or allow."""
+    if exit_code == 2 or b'"deny"' in stdout or b'"block"' in stdout:
+        return "block"
+    if b'"approve"' in stdout:
+        return "approve"
+    return "context" if stdout.strip() else "allow"
+
+
+def append_record(record: dict) -> None:
+    """Append one record, rotating the file first when it is over MAX_BYTES."""
+    path = profile_file()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+    with open(path, "ab") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        if f.tell() + len(line) > MAX_BYTES and f.tell() > 0:
+            for index in range(KEEP, 1, -1):
+                if rotated(path, index - 1).exists():
+                    os.replace(rotated(path, index - 1), rotated(path, index))
+            os.replace(path, rotated(path, 1))
+            with open(path, "ab") as fresh:
+                fresh.write(line)
+            return
+        f.write(line)
+
+
+# ============================================================
+# run: execute one hook and record it
+# ============================================================
+
+def run(argv: list) -> int:
+    if not argv:
+        print("hook-profiler: no hook command given", file=sys.stderr)
+        return 0
+    stdin = sys.stdin.buffer.read()
+    started = time.perf_counter()
+    try:
+        result = subprocess.run(argv, input=stdin, capture_output=True)
+        exit_code, stdout, stderr = result.returncode, result.stdout, result.stderr
+    except OSError as e:
+        exit_code, stdout, stderr = 127, b"", f"hook-profiler: {e}\n".encode()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    # Pass the hook's output through before doing any bookkeeping
+    sys.stdout.buffer.write(stdout)
+    sys.stdout.flush()
+    sys.stderr.buffer.write(stderr)
+    sys.stderr.flush()
+
+    try:
+        event = json.loads(stdin) if stdin.strip() else {}
+    except ValueError:
+        event = {}
+    try:
+        append_record({
+            "ts": round(time.time(), 3),
+            "session": event.get("session_id", ""),
+            "hook": Path(argv[0]).name,
+            "event": event.get("hook_event_name", ""),
+            "tool": event.get("tool_name", ""),
+            "ms": round(elapsed_ms, 1),
+            "exit": exit_code,
+            "decision": decision_of(exit_code, stdout),
+            "input_bytes": len(stdin),
+        })
+    except OSError:
+        pass  # Profiling must never break a hook
+    return exit_code
+
+
+# ============================================================
+# enable / disable: rewrite settings.json
+# ============================================================
+
+def wrap(command: str) -> str:
+    if command.startswith(WRAPPER) or any(c in SHELL_SYNTAX for c in command):
+        return command
+    return WRAPPER + command
+
+
+def unwrap(command: str) -> str:
+    return command[len(WRAPPER):] if command.startswith(WRAPPER) else command
+
+
+def rewrite_settings(transform) -> int:
+    settings_path = project_dir() / ".claude" / "settings.json"
+    if not settings_path.exists():
+        print(f"No settings file at {settings_path}", file=sys.stderr)
+        return 1
+    settings = json.loads(settings_path.read_text(encoding="utf-8"))
+    changed = 0
+    for groups in settings.get("hooks", {}).values():
+        for group in groups:
+            for hook in group.get("hooks", []):
+                if hook.get("type") != "command":
+                    continue
+                new = transform(hook["command"])
+                if new != hook["command"]:
+                    hook["command"] = new
+                    changed += 1
+    if changed:
+        tmp = settings_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(settings, indent=2), encoding="utf-8")
+        os.replace(tmp, settings_path)
+    print(f"{changed} hook command(s) updated in {settings_path}")
+    return 0
+
+
+# ============================================================
+# summary: slowest hooks and their trend across sessions
+# ============================================================
+
+def read_records() -> list:
+    path = profile_file()
+    records = []
+    for file in [rotated(path, i) for i in range(KEEP, 0, -1)] + [path]:
+        if not file.exists():
+            continue
+        with open(file, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    return records
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))]
+
+
+def summary(top: int, sessions: int) -> int:
+    records = read_records()
+    if not records:
+        print(f"No hook timings recorded yet ({profile_file()}).")
+        print("Enable with: .claude/hooks/hook-profiler.py enable")
+        return 0
+
+    # Sessions in order of first appearance
+    session_order = []
+    for record in sorted(records, key=lambda r: r.get("ts", 0)):
+        if record.get("session") not in session_order:
+            session_order.append(record.get("session"))
+    recent = session_order[-sessions:]
+
+    by_hook = {}
+    for record in records:
+        by_hook.setdefault((record["hook"], record.get("event", "")), []).append(record)
+
+    rows = []
+    for (hook, event), items in by_hook.items():
+        times = [r["ms"] for r in items]
+        trend = []
+        for session in recent:
+            session_times = [r["ms"] for r in items if r.get("session") == session]
+            trend.append(f"{percentile(session_times, 50):.0f}" if session_times else "-")
+        rows.append({
+            "hook": hook, "event": event, "n": len(items),
+            "p50": percentile(times, 50), "p95": percentile(times, 95), "max": max(times),
+            "total": sum(times),
+            "blocks": sum(1 for r in items if r.get("decision") == "block"),
+            "failures": sum(1 for r in items if r.get("exit") not in (0, 2)),
+            "trend": " > ".join(trend),
+        })
+
+    total_ms = sum(r["total"] for r in rows)
+    print(f"{len(records)} hook calls across {len(session_order)} session(s), {total_ms / 1000:.1f}s total\n")
+    print(f"{'hook':<34} {'event':<16} {'n':>5} {'p50':>7} {'p95':>7} {'max':>7} {'share':>6} {'block':>5} {'fail':>4}  p50 per session (oldest > newest)")
+    for row in sorted(rows, key=lambda r: -r["p95"])[:top]:
+        share = row["total"] / total_ms if total_ms else 0
+        print(f"{row['hook']:<34} {row['event']:<16} {row['n']:>5} {row['p50']:>5.0f}ms {row['p95']:>5.0f}ms "
+              f"{row['max']:>5.0f}ms {share:>6.1%} {row['blocks']:>5} {row['failures']:>4}  {row['trend']}")
+    return 0
+
+
+def count(minimum: int):
+    """argparse type for an integer of at least minimum."""
+    import argparse
+
+    def parse(value: str) -> int:
+        try:
+            number = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected an integer, not {value!r}")
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}, not {number}")
+        return number
+    return parse
+
+
+def main() -> int:
+    # Every wrapped hook call goes through run: skip building the parser
+    if sys.argv[1:2] == ["run"]:
+        return run(sys.argv[2:])
+
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="hook-profiler",
+        description=__doc__.strip(),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("enable", help="Wrap every hook command in settings.json")
+    commands.add_parser("disable", help="Restore the plain hook commands")
+    summary_parser = commands.add_parser("summary", help="Slowest hooks and their trend")
+    summary_parser.add_argument("--top", type=count(1), default=10, help="Hooks to show")
+    summary_parser.add_argument("--sessions", type=count(1), default=5, help="Recent sessions in the trend")
+    run_parser = commands.add_parser("run", help="Used by the wrapped commands")
+    run_parser.add_argument("hook_command", nargs=argparse.REMAINDER)
+    args = parser.parse_args()
+
+    if args.command == "enable":
+        return rewrite_settings(wrap)
+    if args.command == "disable":
+        return rewrite_settings(unwrap)
+    return summary(args.top, args.sessions)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -32,8 +32,15 @@ TRUNCATED_PROMPT=$(echo "$PROMPT" | head -c 2048)
 
 # Log dispatch to bead (fail silently)
 # Prefix: DISPATCH_PROMPT — UI renders as collapsible "Prompt Used" entry
-bd comment "$BEAD_ID" "DISPATCH_PROMPT [$SUBAGENT_TYPE]:
+COMMENT="DISPATCH_PROMPT [$SUBAGENT_TYPE]:
 
-$TRUNCATED_PROMPT" 2>/dev/null || true
+$TRUNCATED_PROMPT"
+
+# Spooled and delivered in the background, so parallel dispatches don't queue on bd
+SPOOL="${CLAUDE_PROJECT_DIR:-.}/.claude/hooks/comment-spool.py"
+if [[ -x "$SPOOL" ]]; then
+  printf '%s' "$COMMENT" | "$SPOOL" enqueue "$BEAD_ID" 2>/dev/null && exit 0
+fi
+bd comment "$BEAD_ID" "$COMMENT" 2>/dev/null || true
 
 exit 0
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+merge-queue.py - Merge inreview branches in tested batches
+
+Usage:
+  .claude/hooks/merge-queue.py run [--test CMD] [--batch N] [--fetch] [--land] [--json]
+  .claude/hooks/merge-queue.py plan                      # Queue order without merging
+
+Takes every inreview bead with a bd-{BEAD_ID} branch, orders them so
+blockers merge before the beads they block and branches touching files no
+other queued branch touches go first, and merges them in batches of N
+(default 4) onto the merge-queue branch, which starts at the base branch.
+Merging happens in the .worktrees/.merge-queue worktree.
+
+The test command (--test, else MERGE_QUEUE_TEST) runs once per batch. If a
+batch fails, it is split in half and each half retried on top of what has
+passed so far, down to the single branches that break the build. A branch
+that doesn't merge cleanly is skipped and reported for the merge-supervisor.
+Each test run's output goes to .beads/merge-queue/<run>/test-N.log (the last
+5 runs are kept); a rejected branch is reported with the log that failed it.
+
+--land moves the base branch to the result: pushed to origin when it
+exists (GitHub then marks those PRs merged), else fast-forwarded locally.
+The base branch is MERGE_QUEUE_BASE, else origin's default branch, else main.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: concurrent runs are not prevented
+    fcntl = None
+
+QUEUE_BRANCH = "merge-queue"
+DEFAULT_BATCH = 4
+TEST_TIMEOUT = int(os.environ.get("MERGE_QUEUE_TEST_TIMEOUT", 1800))
+
+# Test output of the last few runs, one directory per run
+LOG_DIR = Path(".beads") / "merge-queue"
+KEEP_RUNS = 5
+
+
+def git(*args, cwd=None, check=True) -> str:
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+    if check and result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)}: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+def repo_root() -> Path:
+    start = os.environ.get("CLAUDE_PROJECT_DIR") or "."
+    return Path(git("rev-parse", "--path-format=absolute", "--git-common-dir", cwd=start)).parent
+
+
+def base_ref(root: Path) -> str:
+    if os.environ.get("MERGE_QUEUE_BASE"):
+        return os.environ["MERGE_QUEUE_BASE"]
+    remote_head = git("symbolic-ref", "--short", "refs/remotes/origin/HEAD", cwd=root, check=False)
+    return remote_head or "main"
+
+
+# ============================================================================
+# QUEUE
+# ============================================================================
+
+def inreview_beads(root: Path) -> list:
+    """Inreview beads as dicts with id and the IDs they depend on."""
+    try:
+        result = subprocess.run(["bd", "list", "--status", "inreview", "--json"],
+                                capture_output=True, text=True, timeout=30, cwd=root)
+        issues = json.loads(result.stdout) if result.returncode == 0 else None
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        issues = None
+    if issues is None:
+        path = root / ".beads" / "issues.jsonl"
+        lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+        issues = [issue for issue in map(json.loads, filter(str.strip, lines)) if issue.get("status") == "inreview"]
+    beads = []
+    for issue in issues:
+        deps = {d.get("depends_on_id") or d.get("id") for d in issue.get("dependencies") or []
+                if (d.get("type") or d.get("dependency_type") or "blocks") == "blocks"}
+        beads.append({"id": issue["id"], "title": issue.get("title", ""), "deps": deps})
+    return beads
+
+
+def branch_for(root: Path, bead_id: str):
+    for ref in (f"bd-{bead_id}", f"origin/bd-{bead_id}"):
+        if git("rev-parse", "--verify", "-q", f"{ref}^{{commit}}", cwd=root, check=False):
+            return ref
+    return None
+
+
+def build_queue(root: Path, base: str) -> list:
+    """Queued entries (id, title, branch, files), blockers first, then least overlap."""
+    entries = []
+    for bead in inreview_beads(root):
+        branch = branch_for(root, bead["id"])
+        if not branch:
+            continue
+        files = set(git("diff", "--name-only", f"{base}...{branch}", cwd=root).splitlines())
+        entries.append({**bead, "branch": branch, "files": files})
+
+    for entry in entries:
+        entry["overlap"] = sum(1 for other in entries if other is not entry and other["files"] & entry["files"])
+    queued_ids = {entry["id"] for entry in entries}
+    ordered, placed = [], set()
+    remaining = sorted(entries, key=lambda e: (e["overlap"], e["id"]))
+    while remaining:
+        # Blockers first; a dependency cycle falls back to overlap order
+        ready = [e for e in remaining if not (e["deps"] & queued_ids) - placed] or remaining[:1]
+        entry = ready[0]
+        ordered.append(entry)
+        placed.add(entry["id"])
+        remaining.remove(entry)
+    return ordered
+
+
+# ============================================================================
+# MERGING
+# ============================================================================
+
+class Integration:
+    """The merge-queue worktree and the outcome of each queued branch."""
+
+    def __init__(self, root: Path, base: str, test_command: str):
+        self.root = root
+        self.path = root / ".worktrees" / ".merge-queue"
+        self.test_command = test_command
+        self.test_runs = 0
+        self.outcomes = {}  # bead id -> merged | conflict | tests failed
+        self.logs = {}  # bead id -> test log that rejected it
+        self.log_dir = new_log_dir(root)
+        if not (self.path / ".git").exists():
+            git("worktree", "add", "-q", "--detach", str(self.path), base, cwd=root)
+        self.reset(git("rev-parse", f"{base}^{{commit}}", cwd=root))
+
+    def reset(self, commit: str) -> None:
+        git("checkout", "-q", "-f", "--detach", commit, cwd=self.path)
+        # Ignored files (dependencies, build caches) stay so each test run starts warm
+        git("clean", "-q", "-fd", cwd=self.path)
+
+    def head(self) -> str:
+        return git("rev-parse", "HEAD", cwd=self.path)
+
+    def merge(self, entries: list) -> list:
+        """Merge entries onto HEAD; returns those that merged cleanly."""
+        merged = []
+        for entry in entries:
+            result = subprocess.run(
+                ["git", "merge", "--no-ff", "--no-edit", "-m", f"Merge {entry['branch']} ({entry['id']})", entry["branch"]],
+                cwd=self.path, capture_output=True, text=True,
+            )
+            if result.returncode == 0:
+                merged.append(entry)
+            else:
+                git("merge", "--abort", cwd=self.path, check=False)
+                self.outcomes[entry["id"]] = "conflict"
+        return merged
+
+    def tests_pass(self, entries: list) -> bool:
+        """Run the test command on HEAD; its output goes to self.last_log."""
+        if not self.test_command:
+            return True
+        self.test_runs += 1
+        self.last_log = self.log_dir / f"test-{self.test_runs}.log"
+        (self.root / self.log_dir).mkdir(parents=True, exist_ok=True)
+        with open(self.root / self.last_log, "w") as log:
+            log.write(f"$ {self.test_command}\n# batch: {' '.join(e['id'] for e in entries)}\n\n")
+            log.flush()
+            try:
+                result = subprocess.run(self.test_command, shell=True, cwd=self.path,
+                                        stdout=log, stderr=subprocess.STDOUT, timeout=TEST_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                log.write(f"\n# timed out after {TEST_TIMEOUT}s\n")
+                return False
+        return result.returncode == 0
+
+    def land_batch(self, entries: list) -> None:
+        """Merge and test entries on top of HEAD, bisecting until only breaking branches are left out."""
+        start = self.head()
+        merged = self.merge(entries)
+        if not merged:
+            return
+        if self.tests_pass(merged):
+            for entry in merged:
+                self.outcomes[entry["id"]] = "merged"
+            return
+        self.reset(start)
+        if len(merged) == 1:
+            self.outcomes[merged[0]["id"]] = "tests failed"
+            self.logs[merged[0]["id"]] = str(self.last_log)
+            return
+        middle = len(merged) // 2
+        self.land_batch(merged[:middle])
+        self.land_batch(merged[middle:])
+
+
+def new_log_dir(root: Path) -> Path:
+    """A fresh log directory for this run (relative to root); older runs beyond KEEP_RUNS are removed."""
+    runs = sorted(p for p in (root / LOG_DIR).glob("*") if p.is_dir())
+    for old in runs[:max(len(runs) - KEEP_RUNS + 1, 0)]:
+        shutil.rmtree(old, ignore_errors=True)
+    return LOG_DIR / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+
+
+def land(root: Path, base: str, commit: str) -> str:
+    """Move the base branch to commit; returns where it went."""
+    branch = base.split("/", 1)[1] if base.startswith("origin/") else base
+    if "origin" in git("remote", cwd=root).split():
+        git("push", "origin", f"{commit}:refs/heads/{branch}", cwd=root)
+        return f"origin/{branch}"
+    if git("branch", "--show-current", cwd=root, check=False) == branch:
+        git("merge", "-q", "--ff-only", commit, cwd=root)
+    else:
+        git("update-ref", f"refs/heads/{branch}", commit, git("rev-parse", branch, cwd=root), cwd=root)
+    return branch
+
+
+def run(test_command: str, batch: int, fetch: bool, land_result: bool, as_json: bool) -> int:
+    root = repo_root()
+    lock_path = root / ".worktrees" / ".merge-queue.lock"
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a") as lock:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                print("merge-queue: another run is in progress", file=sys.stderr)
+                return 1
+        if fetch:
+            git("fetch", "-q", "origin", cwd=root, check=False)
+        base = base_ref(root)
+        queue = build_queue(root, base)
+        if not queue:
+            print("No inreview beads with bd-* branches")
+            return 0
+
+        integration = Integration(root, base, test_command)
+        for start in range(0, len(queue), batch):
+            integration.land_batch(queue[start:start + batch])
+        head = integration.head()
+        git("branch", "-f", QUEUE_BRANCH, head, cwd=root)
+
+        merged = [e for e in queue if integration.outcomes.get(e["id"]) == "merged"]
+        landed = land(root, base, head) if land_result and merged else None
+
+    if as_json:
+        print(json.dumps({
+            "base": base,
+            "head": head,
+            "landed": landed,
+            "test_runs": integration.test_runs,
+            "beads": [{"id": e["id"], "branch": e["branch"], "outcome": integration.outcomes.get(e["id"]),
+                       "log": integration.logs.get(e["id"])} for e in queue],
+        }))
+        return 0
+    print(f"Merge queue: {len(merged)}/{len(queue)} merged onto {base} "
+          f"in {integration.test_runs} test run(s) -> {QUEUE_BRANCH} ({head[:8]})")
+    for entry in queue:
+        log = integration.logs.get(entry["id"])
+        print(f"  {entry['id']:<24} {integration.outcomes.get(entry['id'])}" + (f" (log: {log})" if log else ""))
+    if landed:
+        print(f"Landed on {landed}. Close the merged beads: bd close {' '.join(e['id'] for e in merged)}")
+    if not test_command:
+        print("No test command (--test or MERGE_QUEUE_TEST): branches were only checked to merge cleanly")
+    if any(integration.outcomes.get(e["id"]) == "conflict" for e in queue):
+        print("Conflicting branches need the merge-supervisor")
+    return 0
+
+
+def plan() -> int:
+    root = repo_root()
+    base = base_ref(root)
+    for position, entry in enumerate(build_queue(root, base), 1):
+        print(f"{position:>3}. {entry['id']:<24} {len(entry['files'])} file(s), overlaps {entry['overlap']} other(s)")
+    return 0
+
+
+def count(minimum: int):
+    """argparse type for an integer of at least minimum."""
+    def parse(value: str) -> int:
+        try:
+            number = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected an integer, not {value!r}")
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}, not {number}")
+        return number
+    return parse
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="merge-queue",
+        description=__doc__.strip(),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="Merge and test the queue")
+    run_parser.add_argument("--test", default=os.environ.get("MERGE_QUEUE_TEST", ""), metavar="CMD",
+                            help="Test command run once per batch")
+    run_parser.add_argument("--batch", type=count(1), default=DEFAULT_BATCH, help="Branches per batch")
+    run_parser.add_argument("--fetch", action="store_true", help="Fetch the base branch first")
+    run_parser.add_argument("--land", action="store_true", help="Move the base branch to the result")
+    run_parser.add_argument("--json", action="store_true", help="Print the outcome as JSON")
+    commands.add_parser("plan", help="Queue order without merging")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "run":
+            return run(args.test, args.batch, args.fetch, args.land, args.json)
+        return plan()
+    except (RuntimeError, ValueError) as e:
+        print(f"merge-queue: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+#!/bin/bash
+#
+# SessionEnd: Precompute the session-start report into .beads/session-snapshot.md
+#
+# Usage:
+#   session-snapshot.sh           # Print the report (computed now)
+#   session-snapshot.sh --write   # Write it to the snapshot file (what the hook runs)
+#   session-snapshot.sh --stamp   # Print the freshness stamp session-start.sh compares
+#
+# The first line of the snapshot records the format version and a stamp of
+# the mtimes of .beads/issues.jsonl, the knowledge base, git HEAD and its
+# reflog, the index (staging), the branch HEAD points to (commits),
+# refs/heads/main (merges, which the report checks against) and packed-refs,
+# so session-start.sh can check it without running bd, git or gh.
+#
+
+SNAPSHOT_VERSION=1
+BEADS_DIR="$CLAUDE_PROJECT_DIR/.beads"
+SNAPSHOT_FILE="$BEADS_DIR/session-snapshot.md"
+
+snapshot_stamp() {
+  local git_dir common_dir head_ref stamp="" file
+  git_dir=$(git -C "$CLAUDE_PROJECT_DIR" rev-parse --absolute-git-dir 2>/dev/null)
+  common_dir=$(git -C "$CLAUDE_PROJECT_DIR" rev-parse --path-format=absolute --git-common-dir 2>/dev/null)
+  # None on a detached HEAD, where HEAD itself holds the commit
+  head_ref=$(git -C "$CLAUDE_PROJECT_DIR" symbolic-ref -q HEAD 2>/dev/null)
+  for file in "$BEADS_DIR/issues.jsonl" "$BEADS_DIR/memory/knowledge.jsonl" "$git_dir/HEAD" "$git_dir/logs/HEAD" \
+      "$git_dir/index" "${head_ref:+$common_dir/$head_ref}" "$common_dir/refs/heads/main" "$common_dir/packed-refs"; do
+    stamp+="$(date -r "$file" +%s 2>/dev/null || echo 0)."
+  done
+  echo "${stamp%.}"
+}
+
+if [[ "$1" == "--stamp" ]]; then
+  snapshot_stamp
+  exit 0
+fi
+
+[[ -d "$BEADS_DIR" ]] && command -v bd &>/dev/null || exit 0
+
+if [[ "$1" == "--write" ]]; then
+  # Stamp first: changes made while the report runs make it stale, not silently current
+  STAMP=$(snapshot_stamp)
+  TMP_FILE="$SNAPSHOT_FILE.$$.tmp"
+  {
+    echo "<!-- session-snapshot v$SNAPSHOT_VERSION stamp=$STAMP created=$(date +%s) -->"
+    CLAUDE_PROJECT_DIR="$CLAUDE_PROJECT_DIR" "$0"
+  } > "$TMP_FILE" 2>/dev/null && mv "$TMP_FILE" "$SNAPSHOT_FILE"
+  rm -f "$TMP_FILE"
+  exit 0
+fi
+
+# ============================================================
+# Dirty Parent Check - Warn if main directory has uncommitted changes
+# ============================================================
+REPO_ROOT=$(git -C "$CLAUDE_PROJECT_DIR" rev-parse --show-toplevel 2>/dev/null)
+if [[ -n "$REPO_ROOT" ]]; then
+  # No index refresh: rewriting .git/index would make the snapshot stale at once
+  DIRTY=$(git -C "$REPO_ROOT" --no-optional-locks status --porcelain 2>/dev/null)
+  if [[ -n "$DIRTY" ]]; then
+    echo "⚠️  WARNING: Main directory has uncommitted changes."
+    echo "   Agents should only work in .worktrees/"
+    echo ""
+  fi
+fi
+
+# ============================================================
+# Auto-cleanup: Detect merged PRs and cleanup worktrees
+# ============================================================
+WORKTREES_DIR="$CLAUDE_PROJECT_DIR/.worktrees"
+if [[ -d "$WORKTREES_DIR" ]]; then
+  for worktree in $(git -C "$REPO_ROOT" worktree list --porcelain 2>/dev/null | grep "^worktree.*\.worktrees/bd-" | awk '{print $2}'); do
+    BEAD_ID=$(basename "$worktree" | sed 's/bd-//')
+    BRANCH=$(basename "$worktree")
+    
+    # Check if branch was merged to main
+    if git -C "$REPO_ROOT" branch --merged main 2>/dev/null | grep -q "$BRANCH"; then
+      echo "✓ $BRANCH was merged - consider cleaning up"
+      echo "   Run: bd close \"$BEAD_ID\" && .claude/hooks/worktree-pool.py gc"
+      echo ""
+    fi
+  done
+fi
+
+# ============================================================
+# Open PR Reminder
+# ============================================================
+if command -v gh &>/dev/null; then
+  OPEN_PRS=$(gh pr list --author "@me" --state open --json number,title,headRefName 2>/dev/null)
+  if [[ -n "$OPEN_PRS" && "$OPEN_PRS" != "[]" ]]; then
+    echo "📋 You have open PRs:"
+    echo "$OPEN_PRS" | python3 -c "import sys, json; data = json.load(sys.stdin); [print('  #{} {} ({})'.format(i.get('number'), i.get('title'), i.get('headRefName'))) for i in data]" 2>/dev/null
+    echo ""
+  fi
+fi
+
+echo ""
+echo "## Task Status"
+echo ""
+
+# Show in-progress beads first (highest priority)
+IN_PROGRESS=$(bd list --status in_progress 2>/dev/null | head -5)
+if [[ -n "$IN_PROGRESS" ]]; then
+  echo "### In Progress (resume these):"
+  echo "$IN_PROGRESS"
+  echo ""
+fi
+
+# Show ready (unblocked) beads
+READY=$(bd ready 2>/dev/null | head -5)
+if [[ -n "$READY" ]]; then
+  echo "### Ready (no blockers):"
+  echo "$READY"
+  echo ""
+fi
+
+# Show blocked beads
+BLOCKED=$(bd blocked 2>/dev/null | head -3)
+if [[ -n "$BLOCKED" ]]; then
+  echo "### Blocked:"
+  echo "$BLOCKED"
+  echo ""
+fi
+
+# Show stale beads (no activity in 3 days)
+STALE=$(bd stale --days 3 2>/dev/null | head -3)
+if [[ -n "$STALE" ]]; then
+  echo "### Stale (no activity in 3 days):"
+  echo "$STALE"
+  echo ""
+fi
+
+# If nothing found
+if [[ -z "$IN_PROGRESS" && -z "$READY" && -z "$BLOCKED" && -z "$STALE" ]]; then
+  echo "No active beads. Create one with: bd create \"Task title\" -d \"Description\""
+fi
+
+# ============================================================
+# Knowledge Base - Surface recent learnings
+# ============================================================
+KNOWLEDGE_FILE="$BEADS_DIR/memory/knowledge.jsonl"
+if [[ -f "$KNOWLEDGE_FILE" && -s "$KNOWLEDGE_FILE" ]]; then
+  TOTAL_ENTRIES=$(wc -l < "$KNOWLEDGE_FILE" | tr -d ' ')
+  echo ""
+  echo "## Recent Knowledge ($TOTAL_ENTRIES entries)"
+  echo ""
+  # Show 5 most recent, deduplicated by key (latest wins)
+  tail -20 "$KNOWLEDGE_FILE" | python3 -c "import sys, json; lines = sys.stdin.readlines(); data = [json.loads(l) for l in lines if l.strip()]; grouped = {}; [grouped.update({i.get('key'): i}) for i in data]; sorted_data = sorted(grouped.values(), key=lambda x: x.get('ts', 0), reverse=True); [print('  [{}] {}  ({})'.format(i.get('type', '').upper()[:5], i.get('content', '')[:100], i.get('source', ''))) for i in sorted_data[:5]]" 2>/dev/null
+  echo ""
+  echo "  Search: .beads/memory/recall.sh \"keyword\""
+fi
+
+echo ""
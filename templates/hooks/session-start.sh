@@ -16,103 +16,56 @@ if ! command -v bd &>/dev/null; then
   exit 0
 fi
 
-# ============================================================
-# Dirty Parent Check - Warn if main directory has uncommitted changes
-# ============================================================
-REPO_ROOT=$(git -C "$CLAUDE_PROJECT_DIR" rev-parse --show-toplevel 2>/dev/null)
-if [[ -n "$REPO_ROOT" ]]; then
-  DIRTY=$(git -C "$REPO_ROOT" status --porcelain 2>/dev/null)
-  if [[ -n "$DIRTY" ]]; then
-    echo "⚠️  WARNING: Main directory has uncommitted changes."
-    echo "   Agents should only work in .worktrees/"
-    echo ""
-  fi
-fi
+WORKTREES_DIR="$CLAUDE_PROJECT_DIR/.worktrees"
 
 # ============================================================
-# Auto-cleanup: Detect merged PRs and cleanup worktrees
+# Worktree pool: top up and refresh idle worktrees in the background
 # ============================================================
-WORKTREES_DIR="$CLAUDE_PROJECT_DIR/.worktrees"
-if [[ -d "$WORKTREES_DIR" ]]; then
-  for worktree in $(git -C "$REPO_ROOT" worktree list --porcelain 2>/dev/null | grep "^worktree.*\.worktrees/bd-" | awk '{print $2}'); do
-    BEAD_ID=$(basename "$worktree" | sed 's/bd-//')
-    BRANCH=$(basename "$worktree")
-    
-    # Check if branch was merged to main
-    if git -C "$REPO_ROOT" branch --merged main 2>/dev/null | grep -q "$BRANCH"; then
-      echo "✓ $BRANCH was merged - consider cleaning up"
-      echo "   Run: git worktree remove \"$worktree\" && bd close \"$BEAD_ID\""
-      echo ""
-    fi
-  done
+POOL_SCRIPT="$CLAUDE_PROJECT_DIR/.claude/hooks/worktree-pool.py"
+if [[ -d "$WORKTREES_DIR/.pool" && -x "$POOL_SCRIPT" ]]; then
+  (CLAUDE_PROJECT_DIR="$CLAUDE_PROJECT_DIR" "$POOL_SCRIPT" refill --fetch >/dev/null 2>&1 &)
 fi
 
 # ============================================================
-# Open PR Reminder
+# Comment spool: deliver bead comments left over from the last session
 # ============================================================
-if command -v gh &>/dev/null; then
-  OPEN_PRS=$(gh pr list --author "@me" --state open --json number,title,headRefName 2>/dev/null)
-  if [[ -n "$OPEN_PRS" && "$OPEN_PRS" != "[]" ]]; then
-    echo "📋 You have open PRs:"
-    echo "$OPEN_PRS" | python3 -c "import sys, json; data = json.load(sys.stdin); [print('  #{} {} ({})'.format(i.get('number'), i.get('title'), i.get('headRefName'))) for i in data]" 2>/dev/null
-    echo ""
-  fi
+SPOOL_SCRIPT="$CLAUDE_PROJECT_DIR/.claude/hooks/comment-spool.py"
+if compgen -G "$BEADS_DIR/spool/*.json" >/dev/null && [[ -x "$SPOOL_SCRIPT" ]]; then
+  (CLAUDE_PROJECT_DIR="$CLAUDE_PROJECT_DIR" "$SPOOL_SCRIPT" flush >/dev/null 2>&1 &)
 fi
-
-echo ""
-echo "## Task Status"
-echo ""
-
-# Show in-progress beads first (highest priority)
-IN_PROGRESS=$(bd list --status in_progress 2>/dev/null | head -5)
-if [[ -n "$IN_PROGRESS" ]]; then
-  echo "### In Progress (resume these):"
-  echo "$IN_PROGRESS"
+FAILED_COMMENTS=$(compgen -G "$BEADS_DIR/spool/failed/*.json" | wc -l | tr -d ' ')
+if [[ "$FAILED_COMMENTS" -gt 0 ]]; then
+  echo "⚠️  WARNING: $FAILED_COMMENTS bead comment(s) could not be delivered by bd."
+  echo "   They are in .beads/spool/failed/; post them with bd comment, then delete the files."
   echo ""
 fi
 
-# Show ready (unblocked) beads
-READY=$(bd ready 2>/dev/null | head -5)
-if [[ -n "$READY" ]]; then
-  echo "### Ready (no blockers):"
-  echo "$READY"
-  echo ""
-fi
+# ============================================================
+# Session snapshot: print the report saved at the end of the last session
+# ============================================================
+# Checked against file mtimes only; a stale snapshot is still shown at once
+# and recomputed in the background for next time.
+SNAPSHOT_SCRIPT="$CLAUDE_PROJECT_DIR/.claude/hooks/session-snapshot.sh"
+SNAPSHOT_FILE="$BEADS_DIR/session-snapshot.md"
+SNAPSHOT_MAX_AGE="${SESSION_SNAPSHOT_MAX_AGE:-3600}"
 
-# Show blocked beads
-BLOCKED=$(bd blocked 2>/dev/null | head -3)
-if [[ -n "$BLOCKED" ]]; then
-  echo "### Blocked:"
-  echo "$BLOCKED"
-  echo ""
+if [[ ! -x "$SNAPSHOT_SCRIPT" ]]; then
+  exit 0
 fi
 
-# Show stale beads (no activity in 3 days)
-STALE=$(bd stale --days 3 2>/dev/null | head -3)
-if [[ -n "$STALE" ]]; then
-  echo "### Stale (no activity in 3 days):"
-  echo "$STALE"
-  echo ""
+HEADER=$(head -1 "$SNAPSHOT_FILE" 2>/dev/null)
+if [[ "$HEADER" != "<!-- session-snapshot v1 "* ]]; then
+  # No usable snapshot yet: compute it now, once
+  CLAUDE_PROJECT_DIR="$CLAUDE_PROJECT_DIR" "$SNAPSHOT_SCRIPT" --write
+  HEADER=$(head -1 "$SNAPSHOT_FILE" 2>/dev/null)
 fi
 
-# If nothing found
-if [[ -z "$IN_PROGRESS" && -z "$READY" && -z "$BLOCKED" && -z "$STALE" ]]; then
-  echo "No active beads. Create one with: bd create \"Task title\" -d \"Description\""
-fi
+tail -n +2 "$SNAPSHOT_FILE" 2>/dev/null
 
-# ============================================================
-# Knowledge Base - Surface recent learnings
-# ============================================================
-KNOWLEDGE_FILE="$BEADS_DIR/memory/knowledge.jsonl"
-if [[ -f "$KNOWLEDGE_FILE" && -s "$KNOWLEDGE_FILE" ]]; then
-  TOTAL_ENTRIES=$(wc -l < "$KNOWLEDGE_FILE" | tr -d ' ')
-  echo ""
-  echo "## Recent Knowledge ($TOTAL_ENTRIES entries)"
-  echo ""
-  # Show 5 most recent, deduplicated by key (latest wins)
-  tail -20 "$KNOWLEDGE_FILE" | python3 -c "import sys, json; lines = sys.stdin.readlines(); data = [json.loads(l) for l in lines if l.strip()]; grouped = {}; [grouped.update({i.get('key'): i}) for i in data]; sorted_data = sorted(grouped.values(), key=lambda x: x.get('ts', 0), reverse=True); [print('  [{}] {}  ({})'.format(i.get('type', '').upper()[:5], i.get('content', '')[:100], i.get('source', ''))) for i in sorted_data[:5]]" 2>/dev/null
-  echo ""
-  echo "  Search: .beads/memory/recall.sh \"keyword\""
+SAVED_STAMP=$(echo "$HEADER" | sed -n 's/.* stamp=\([^ ]*\) .*/\1/p')
+CREATED=$(echo "$HEADER" | sed -n 's/.* created=\([0-9]*\) .*/\1/p')
+AGE=$(( $(date +%s) - ${CREATED:-0} ))
+if [[ "$SAVED_STAMP" != "$(CLAUDE_PROJECT_DIR="$CLAUDE_PROJECT_DIR" "$SNAPSHOT_SCRIPT" --stamp)" || "$AGE" -gt "$SNAPSHOT_MAX_AGE" ]]; then
+  echo "(Snapshot from $(( AGE / 60 )) min ago and may be out of date; refreshing in the background.)"
+  (CLAUDE_PROJECT_DIR="$CLAUDE_PROJECT_DIR" "$SNAPSHOT_SCRIPT" --write >/dev/null 2>&1 &)
 fi
-
-echo ""
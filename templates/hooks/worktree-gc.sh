@@ -0,0 +1,19 @@
+#!/bin/bash
+#
+# SessionEnd: Remove merged and closed-bead worktrees in the background (opt-in)
+#
+# Enable with WORKTREE_GC_ON_SESSION_END=1 (e.g. in .claude/settings.json "env").
+# Worktrees with uncommitted changes are never removed here; the report goes to
+# .worktrees/.gc.log.
+#
+
+[[ "$WORKTREE_GC_ON_SESSION_END" == "1" ]] || exit 0
+
+GC_SCRIPT="$CLAUDE_PROJECT_DIR/.claude/hooks/worktree-pool.py"
+WORKTREES_DIR="$CLAUDE_PROJECT_DIR/.worktrees"
+[[ -x "$GC_SCRIPT" && -d "$WORKTREES_DIR" ]] || exit 0
+
+# Detached so the session can exit without waiting for the deletions
+(CLAUDE_PROJECT_DIR="$CLAUDE_PROJECT_DIR" "$GC_SCRIPT" gc >"$WORKTREES_DIR/.gc.log" 2>&1 &)
+
+exit 0
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+worktree-pool.py - Pre-created worktrees for supervisors, and cleanup of finished ones
+
+Usage:
+  .claude/hooks/worktree-pool.py refill [--size N] [--fetch]   # Top up and refresh idle worktrees
+  .claude/hooks/worktree-pool.py claim BEAD_ID [--sparse PATTERN ...] [--sparse-from-bead]
+  .claude/hooks/worktree-pool.py release BEAD_ID|PATH [--force]
+  .claude/hooks/worktree-pool.py gc [--dry-run] [--force] [--jobs N]
+  .claude/hooks/worktree-pool.py status
+
+Idle worktrees live detached at the base branch in .worktrees/.pool/slot-N.
+`claim` moves one to .worktrees/bd-{BEAD_ID} and creates branch bd-{BEAD_ID}
+there (or checks it out if it already exists), then starts a background
+refill. With an empty pool it falls back to `git worktree add`.
+
+Sparse checkout (cone mode) limits the claimed tree to the given directories;
+--sparse-from-bead takes them from the bead's `scope:<dir>` labels.
+
+`release` refuses a worktree with uncommitted changes (unless --force), resets
+it to the base branch and returns it to the pool, or removes it if the pool
+is full. The bead's branch is kept.
+
+`gc` removes every .worktrees/bd-* worktree whose branch has commits that
+are all merged into the base branch, or whose bead is closed (never one
+whose bead is in progress), several at a time, then deletes the
+merged branches and prunes worktree metadata, and reports the disk space
+reclaimed. Worktrees with uncommitted or untracked changes are skipped;
+--force removes them too and also deletes unmerged branches of closed beads
+(e.g. squash-merged PRs).
+
+The pool size is remembered in .worktrees/.pool/size (default
+WORKTREE_POOL_SIZE or 2). The base is WORKTREE_POOL_BASE (e.g. origin/main
+with `refill --fetch`), else the branch checked out in the main checkout,
+as with a plain `git worktree add` from there.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows: claims are not serialized
+    fcntl = None
+
+DEFAULT_SIZE = int(os.environ.get("WORKTREE_POOL_SIZE", 2))
+
+SLOT_PREFIX = "slot-"
+PENDING_PREFIX = ".new-slot-"
+
+# Bead IDs as used in worktree names (prefix-hash, epic children add .N)
+BEAD_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+def git(*args, cwd=None, check=True) -> str:
+    result = subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True)
+    if check and result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)}: {result.stderr.strip()}")
+    return result.stdout.strip()
+
+
+def repo_root() -> Path:
+    start = os.environ.get("CLAUDE_PROJECT_DIR") or "."
+    # --git-common-dir so a claim from inside a worktree still targets the main checkout
+    common = Path(git("rev-parse", "--path-format=absolute", "--git-common-dir", cwd=start))
+    return common.parent
+
+
+def pool_dir(root: Path) -> Path:
+    return root / ".worktrees" / ".pool"
+
+
+def base_ref(root: Path) -> str:
+    if os.environ.get("WORKTREE_POOL_BASE"):
+        return os.environ["WORKTREE_POOL_BASE"]
+    # Detached main checkout: its HEAD commit
+    return git("branch", "--show-current", cwd=root, check=False) or git("rev-parse", "HEAD", cwd=root)
+
+
+def pool_size(root: Path) -> int:
+    try:
+        return int((pool_dir(root) / "size").read_text().strip())
+    except (OSError, ValueError):
+        return DEFAULT_SIZE
+
+
+@contextmanager
+def locked(root: Path, name: str = ".lock", blocking: bool = True):
+    """Hold an exclusive lock on a file in the pool directory.
+
+    Yields False when blocking=False and someone else holds it.
+    """
+    path = pool_dir(root) / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl is None:
+            yield True
+            return
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def idle_slots(root: Path) -> list:
+    pool = pool_dir(root)
+    if not pool.is_dir():
+        return []
+    slots = [p for p in pool.iterdir() if p.name.startswith(SLOT_PREFIX) and (p / ".git").exists()]
+    return sorted(slots, key=lambda p: p.name)
+
+
+def free_slot_name(root: Path) -> Path:
+    pool = pool_dir(root)
+    taken = {p.name for p in pool.iterdir()} if pool.is_dir() else set()
+    n = 1
+    while f"{SLOT_PREFIX}{n}" in taken or f"{PENDING_PREFIX}{n}" in taken:
+        n += 1
+    return pool / f"{SLOT_PREFIX}{n}"
+
+
+def bead_worktree(root: Path, bead_id: str) -> Path:
+    if not BEAD_ID.match(bead_id) or ".." in bead_id:
+        raise ValueError(f"Invalid bead ID: {bead_id}")
+    return root / ".worktrees" / f"bd-{bead_id}"
+
+
+def reset_to_base(path: Path, base: str) -> None:
+    """Detach at base with no local changes, untracked files or sparse patterns."""
+    if git("config", "--bool", "core.sparseCheckout", cwd=path, check=False) == "true":
+        git("sparse-checkout", "disable", cwd=path)
+    git("checkout", "-q", "-f", "--detach", base, cwd=path)
+    git("clean", "-q", "-fd", cwd=path)
+
+
+# ============================================================================
+# COMMANDS
+# ============================================================================
+
+def refill(size: int = None, fetch: bool = False) -> int:
+    """Create missing slots and move idle ones to the current base."""
+    root = repo_root()
+    with locked(root, ".refill.lock", blocking=False) as acquired:
+        if not acquired:
+            print("Refill already running")
+            return 0
+        if size is not None:
+            (pool_dir(root) / "size").write_text(f"{size}\n")
+        size = pool_size(root)
+        if fetch:
+            git("fetch", "-q", "origin", cwd=root, check=False)
+        base = base_ref(root)
+        target = git("rev-parse", "--verify", f"{base}^{{commit}}", cwd=root)
+
+        for slot in idle_slots(root):
+            if git("rev-parse", "HEAD", cwd=slot, check=False) != target:
+                reset_to_base(slot, target)
+
+        while len(idle_slots(root)) < size:
+            with locked(root):
+                name = free_slot_name(root)
+                pending = name.with_name(PENDING_PREFIX + name.name[len(SLOT_PREFIX):])
+                pending.mkdir()  # Reserves the name; git accepts an empty directory
+            # Checked out under a pending name, so claim never takes a half-written tree
+            git("worktree", "add", "-q", "--detach", str(pending), target, cwd=root)
+            with locked(root):
+                git("worktree", "move", str(pending), str(name), cwd=root)
+        print(f"Pool: {len(idle_slots(root))} idle worktree(s) at {base} ({target[:8]})")
+    return 0
+
+
+def refill_in_background() -> None:
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "refill"],
+        stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def bead_scope(bead_id: str) -> list:
+    """Directories from the bead's `scope:<dir>` labels."""
+    try:
+        out = subprocess.run(["bd", "show", bead_id, "--json"], capture_output=True, text=True, timeout=10).stdout
+        data = json.loads(out)
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return []
+    issue = data[0] if isinstance(data, list) and data else data
+    labels = (issue.get("labels") or []) if isinstance(issue, dict) else []
+    return [label[len("scope:"):].strip("/") for label in labels if label.startswith("scope:")]
+
+
+def claim(bead_id: str, sparse: list) -> int:
+    root = repo_root()
+    path = bead_worktree(root, bead_id)
+    if (path / ".git").exists():
+        print(path)
+        return 0
+    branch = f"bd-{bead_id}"
+    base = base_ref(root)
+    has_branch = bool(git("rev-parse", "--verify", "-q", f"refs/heads/{branch}", cwd=root, check=False))
+
+    with locked(root):
+        slots = idle_slots(root)
+        if slots:
+            git("worktree", "move", str(slots[0]), str(path), cwd=root)
+
+    if slots:
+        try:
+            if sparse:
+                git("sparse-checkout", "set", "--cone", "--", *sparse, cwd=path)
+            if has_branch:
+                git("checkout", "-q", branch, cwd=path)
+            else:
+                # The slot may predate the last refill; branch from the current base
+                git("checkout", "-q", "-b", branch, base, cwd=path)
+        except RuntimeError:
+            # Don't leave a detached worktree at the bead's path
+            reset_to_base(path, base)
+            with locked(root):
+                git("worktree", "move", str(path), str(free_slot_name(root)), cwd=root)
+            raise
+        refill_in_background()
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        add = ["worktree", "add", "-q"] + (["--no-checkout"] if sparse else [])
+        add += [str(path), branch] if has_branch else ["-b", branch, str(path), base]
+        git(*add, cwd=root)
+        if sparse:
+            try:
+                git("sparse-checkout", "set", "--cone", "--", *sparse, cwd=path)
+                git("checkout", "-q", branch, cwd=path)
+            except RuntimeError:
+                git("worktree", "remove", "--force", str(path), cwd=root, check=False)
+                raise
+    print(path)
+    return 0
+
+
+def release(target: str, force: bool) -> int:
+    root = repo_root()
+    path = Path(target).resolve() if os.sep in target else bead_worktree(root, target)
+    if not (path / ".git").is_file():
+        print(f"Not a worktree: {path}", file=sys.stderr)
+        return 1
+    if git("status", "--porcelain", cwd=path) and not force:
+        print(f"{path} has uncommitted changes; commit them or pass --force", file=sys.stderr)
+        return 1
+
+    reset_to_base(path, base_ref(root))
+    with locked(root):
+        if len(idle_slots(root)) < pool_size(root):
+            slot = free_slot_name(root)
+            git("worktree", "move", str(path), str(slot), cwd=root)
+            print(f"Returned {path.name} to the pool as {slot.name}")
+        else:
+            git("worktree", "remove", "--force", str(path), cwd=root)
+            print(f"Pool full, removed {path.name}")
+    return 0
+
+
+def disk_usage(path: Path) -> int:
+    """Bytes allocated under path (like du -s), not following symlinks."""
+    total = 0
+    for dirpath, dirnames, filenames in os.walk(path):
+        for name in dirnames + filenames:
+            try:
+                st = os.lstat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            total += getattr(st, "st_blocks", 0) * 512 or st.st_size
+    return total
+
+
+def format_size(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def bead_worktrees(root: Path) -> list:
+    """(path, branch) of the registered .worktrees/bd-* worktrees."""
+    entries, path = [], None
+    for line in git("worktree", "list", "--porcelain", cwd=root).splitlines():
+        if line.startswith("worktree "):
+            path = Path(line[len("worktree "):])
+        elif line.startswith("branch ") and path is not None:
+            entries.append((path, line[len("branch refs/heads/"):]))
+        elif not line:
+            path = None
+    worktrees = root / ".worktrees"
+    return [(p, b) for p, b in entries if p.parent == worktrees and p.name.startswith("bd-")]
+
+
+def beads_with_status(status: str) -> set:
+    try:
+        out = subprocess.run(["bd", "list", "--status", status, "--json"], capture_output=True, text=True, timeout=30).stdout
+        return {issue.get("id") for issue in json.loads(out) or []}
+    except (OSError, ValueError, TypeError, subprocess.TimeoutExpired):
+        return set()
+
+
+def has_own_commits(root: Path, branch: str, base_commit: str) -> bool:
+    """Whether anything was ever committed on branch.
+
+    A freshly claimed branch is "merged" into the base as far as
+    `git branch --merged` goes; its reflog has only the creation entry.
+    """
+    reflog = git("reflog", "show", "--format=%H", f"refs/heads/{branch}", "--", cwd=root, check=False)
+    if reflog:
+        return len(reflog.splitlines()) > 1
+    # No reflog (e.g. reflogs disabled): the tip differing from the base has to do
+    return git("rev-parse", branch, cwd=root, check=False) != base_commit
+
+
+def gc(dry_run: bool, force: bool, jobs: int) -> int:
+    """Remove worktrees of merged branches and closed beads."""
+    root = repo_root()
+    base = base_ref(root)
+    base_commit = git("rev-parse", "--verify", f"{base}^{{commit}}", cwd=root)
+    merged = {
+        branch for branch in git("branch", "--merged", base, "--format=%(refname:short)", cwd=root).splitlines()
+        if branch.startswith("bd-") and has_own_commits(root, branch, base_commit)
+    }
+    closed = beads_with_status("closed")
+    # A running supervisor's worktree is never collected, merged or not
+    in_progress = beads_with_status("in_progress")
+    candidates = [
+        (path, branch) for path, branch in bead_worktrees(root)
+        if path.name[len("bd-"):] not in in_progress
+        and (branch in merged or path.name[len("bd-"):] in closed)
+    ]
+    if not candidates:
+        print("No merged or closed-bead worktrees to remove")
+        return 0
+
+    def collect(candidate):
+        path, branch = candidate
+        if path.exists() and git("status", "--porcelain", cwd=path, check=False) and not force:
+            return path, branch, None, "uncommitted changes, skipped (--force to remove)"
+        size = disk_usage(path) if path.exists() else 0
+        if dry_run:
+            return path, branch, size, "would remove"
+        result = subprocess.run(
+            ["git", "worktree", "remove", *(["--force"] if force else []), str(path)],
+            cwd=root, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            return path, branch, None, f"not removed: {result.stderr.strip()}"
+        return path, branch, size, "removed"
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        results = list(pool.map(collect, candidates))
+
+    reclaimed, removed_branches, kept_branches = 0, [], []
+    for path, branch, size, outcome in results:
+        print(f"  {path.name:<24} {outcome}" + (f" ({format_size(size)})" if size is not None else ""))
+        if size is None:
+            continue
+        reclaimed += size
+        if branch in merged or force:
+            removed_branches.append(branch)
+        else:
+            kept_branches.append(branch)
+
+    if not dry_run:
+        # One call: parallel ref deletions would contend on packed-refs.lock
+        if removed_branches:
+            git("branch", "-D" if force else "-d", *removed_branches, cwd=root, check=False)
+        git("worktree", "prune", cwd=root, check=False)
+    for branch in kept_branches:
+        print(f"  Kept branch {branch} (bead closed but not merged into {base}; --force deletes it)")
+    verb = "Would reclaim" if dry_run else "Reclaimed"
+    count = sum(1 for result in results if result[2] is not None)
+    print(f"{verb} {format_size(reclaimed)} from {count} worktree(s)")
+    return 0
+
+
+def status() -> int:
+    root = repo_root()
+    base = base_ref(root)
+    target = git("rev-parse", "--verify", "-q", f"{base}^{{commit}}", cwd=root, check=False)
+    slots = idle_slots(root)
+    print(f"Pool: {len(slots)}/{pool_size(root)} idle, base {base} ({target[:8] or 'missing'})")
+    for slot in slots:
+        head = git("rev-parse", "HEAD", cwd=slot, check=False)
+        print(f"  {slot.name:<10} {head[:8]}  {'current' if head == target else 'stale'}")
+    return 0
+
+
+def count(minimum: int):
+    """argparse type for an integer of at least minimum."""
+    def parse(value: str) -> int:
+        try:
+            number = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"expected an integer, not {value!r}")
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"must be at least {minimum}, not {number}")
+        return number
+    return parse
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="worktree-pool",
+        description=__doc__.strip(),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    refill_parser = commands.add_parser("refill", help="Top up and refresh idle worktrees")
+    refill_parser.add_argument("--size", type=count(0), default=None, help="Pool size to keep (remembered)")
+    refill_parser.add_argument("--fetch", action="store_true", help="Fetch the base branch first")
+
+    claim_parser = commands.add_parser("claim", help="Take a worktree for a bead")
+    claim_parser.add_argument("bead_id")
+    claim_parser.add_argument("--sparse", nargs="+", action="extend", default=[], metavar="PATTERN",
+                              help="Check out only these directories")
+    claim_parser.add_argument("--sparse-from-bead", action="store_true",
+                              help="Check out only the bead's scope: directories")
+
+    release_parser = commands.add_parser("release", help="Return a bead's worktree to the pool")
+    release_parser.add_argument("target", metavar="BEAD_ID|PATH")
+    release_parser.add_argument("--force", action="store_true", help="Discard uncommitted changes")
+
+    gc_parser = commands.add_parser("gc", help="Remove worktrees of merged or closed beads")
+    gc_parser.add_argument("--dry-run", action="store_true", help="Only report what would be removed")
+    gc_parser.add_argument("--force", action="store_true",
+                           help="Also remove dirty worktrees and unmerged branches of closed beads")
+    gc_parser.add_argument("--jobs", type=count(1), default=os.cpu_count() or 4, help="Removals run at once")
+
+    commands.add_parser("status", help="Show idle worktrees and the base")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "refill":
+            return refill(args.size, fetch=args.fetch)
+        if args.command == "claim":
+            sparse = args.sparse + (bead_scope(args.bead_id) if args.sparse_from_bead else [])
+            return claim(args.bead_id, sparse)
+        if args.command == "release":
+            return release(args.target, force=args.force)
+        if args.command == "gc":
+            return gc(dry_run=args.dry_run, force=args.force, jobs=args.jobs)
+        return status()
+    except (RuntimeError, ValueError) as e:
+        print(f"worktree-pool: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/bin/bash
+# Tests for templates/hooks/bead-blobs.py
+# Mocks bd show; blobs go to a throwaway project
+
+set -euo pipefail
+
+BLOBS="$(cd "$(dirname "$0")/.." && pwd)/templates/hooks/bead-blobs.py"
+PASS=0
+FAIL=0
+TEST_DIR=""
+
+unset BEAD_BLOB_THRESHOLD
+
+setup_project() {
+  cleanup
+  TEST_DIR=$(mktemp -d)
+  mkdir -p "$TEST_DIR/bin" "$TEST_DIR/.beads"
+  python3 -c 'print("DISPATCH_PROMPT: scout"); print("\n".join(f"line {i} of the prompt" for i in range(200)))' \
+    > "$TEST_DIR/long.txt"
+}
+
+cleanup() {
+  [ -n "$TEST_DIR" ] && rm -rf "$TEST_DIR"
+  TEST_DIR=""
+}
+trap cleanup EXIT
+
+blobs() {
+  (cd "$TEST_DIR" && PATH="$TEST_DIR/bin:$PATH" CLAUDE_PROJECT_DIR="$TEST_DIR" python3 "$BLOBS" "$@")
+}
+
+blob_count() {
+  find "$TEST_DIR/.beads/blobs" -name '*.md' 2>/dev/null | wc -l | tr -d ' '
+}
+
+check() {
+  local test_name="$1"
+  shift
+  if "$@"; then
+    echo "PASS: $test_name"
+    PASS=$((PASS + 1))
+  else
+    echo "FAIL: $test_name"
+    FAIL=$((FAIL + 1))
+  fi
+}
+
+# ---- Test 1: short comments pass through unchanged ----
+test_short_comment() {
+  setup_project
+  check "a short comment is posted as is" [ "$(echo "short note" | blobs compact)" = "short note" ]
+  check "nothing is stored for it" [ "$(blob_count)" = "0" ]
+}
+
+# ---- Test 2: compact then expand gives back the original text ----
+test_round_trip() {
+  setup_project
+  local compacted digest
+  compacted=$(blobs compact < "$TEST_DIR/long.txt")
+  digest=$(grep -o 'sha256:[0-9a-f]*' <<< "$compacted" | head -1)
+
+  check "the compacted comment keeps the header line" \
+    [ "$(head -1 <<< "$compacted")" = "DISPATCH_PROMPT: scout" ]
+  check "the compacted comment is much shorter" [ "${#compacted}" -lt 600 ]
+  check "expand restores the original text" \
+    [ "$(blobs expand <<< "$compacted")" = "$(cat "$TEST_DIR/long.txt")" ]
+  check "cat prints the stored body" [ "$(blobs cat "$digest")" = "$(cat "$TEST_DIR/long.txt")" ]
+
+  blobs compact < "$TEST_DIR/long.txt" > /dev/null
+  check "identical text is stored once" [ "$(blob_count)" = "1" ]
+}
+
+# ---- Test 3: expand leaves unknown references and other text alone ----
+test_expand_keeps_the_rest() {
+  setup_project
+  local compacted missing
+  compacted=$(blobs compact < "$TEST_DIR/long.txt")
+  missing="[blob sha256:$(printf '0%.0s' {1..64}) 10 chars: .beads/blobs/00/x.md]"
+
+  check "a reference to a missing blob stays as is" [ "$(blobs expand <<< "$missing")" = "$missing" ]
+  check "text around a compacted comment is kept" \
+    [ "$(printf 'before\n---\n%s\n---\nafter' "$compacted" | blobs expand | sed -n '1p;$p' | tr '\n' ' ')" = "before after " ]
+}
+
+# ---- Test 4: show expands references in bd's comments ----
+test_show() {
+  setup_project
+  local compacted
+  compacted=$(blobs compact < "$TEST_DIR/long.txt")
+  python3 -c 'import json, sys; print(json.dumps([{"id": "b-1", "comments": [{"text": sys.argv[1]}]}]))' "$compacted" \
+    > "$TEST_DIR/show.json"
+  cat > "$TEST_DIR/bin/bd" << MOCKBD
+#!/bin/bash
+[ "\$1" = "show" ] && cat "$TEST_DIR/show.json"
+MOCKBD
+  chmod +x "$TEST_DIR/bin/bd"
+
+  check "show prints comments with the full text" \
+    [ "$(blobs show b-1 | python3 -c 'import json, sys; print(json.load(sys.stdin)[0]["comments"][0]["text"])')" = "$(cat "$TEST_DIR/long.txt")" ]
+}
+
+# ---- Run all tests ----
+echo "=== bead-blobs.py tests ==="
+echo ""
+
+test_short_comment
+test_round_trip
+test_expand_keeps_the_rest
+test_show
+
+echo ""
+echo "=== Results: $PASS passed, $FAIL failed ==="
+
+if [ "$FAIL" -gt 0 ]; then
+  exit 1
+fi
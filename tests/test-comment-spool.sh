@@ -0,0 +1,156 @@
+#!/bin/bash
+# Tests for templates/hooks/comment-spool.py
+# Mocks bd: every `bd comment` is logged, and fails while $TEST_DIR/bd-down exists
+
+set -euo pipefail
+
+HOOKS_DIR="$(cd "$(dirname "$0")/.." && pwd)/templates/hooks"
+SPOOL="$HOOKS_DIR/comment-spool.py"
+PASS=0
+FAIL=0
+TEST_DIR=""
+
+export COMMENT_SPOOL_RETRIES=1
+
+setup_project() {
+  cleanup
+  TEST_DIR=$(mktemp -d)
+  mkdir -p "$TEST_DIR/bin" "$TEST_DIR/.beads"
+  cat > "$TEST_DIR/bin/bd" << MOCKBD
+#!/bin/bash
+if [ "\$1" = "comment" ]; then
+  # Fail the first FAIL_TIMES calls (counted in bd-calls), or all of them while bd-down exists
+  calls=\$(( \$(cat "$TEST_DIR/bd-calls" 2>/dev/null || echo 0) + 1 ))
+  echo "\$calls" > "$TEST_DIR/bd-calls"
+  if [ -e "$TEST_DIR/bd-down" ] || [ "\$calls" -le "\${FAIL_TIMES:-0}" ]; then
+    exit 1
+  fi
+  python3 -c 'import json, sys; print(json.dumps(sys.argv[1:]))' "\$2" "\$3" >> "$TEST_DIR/comments.log"
+fi
+MOCKBD
+  chmod +x "$TEST_DIR/bin/bd"
+}
+
+cleanup() {
+  if [ -n "$TEST_DIR" ]; then
+    wait_for_flush
+    rm -rf "$TEST_DIR"
+  fi
+  TEST_DIR=""
+}
+trap cleanup EXIT
+
+spool() {
+  (cd "$TEST_DIR" && PATH="$TEST_DIR/bin:$PATH" CLAUDE_PROJECT_DIR="$TEST_DIR" python3 "$SPOOL" "$@")
+}
+
+# enqueue starts a background flusher; wait until it has let go of the lock
+wait_for_flush() {
+  sleep 0.5
+  [ -e "$TEST_DIR/.beads/spool/.flush.lock" ] && flock "$TEST_DIR/.beads/spool/.flush.lock" true
+  return 0
+}
+
+pending_count() {
+  find "$TEST_DIR/.beads/spool" -maxdepth 1 -name '*.json' | wc -l | tr -d ' '
+}
+
+# delivered N: the bead and text of the Nth bd comment call, as "bead|text"
+delivered() {
+  sed -n "${1}p" "$TEST_DIR/comments.log" | python3 -c 'import json, sys; print("|".join(json.load(sys.stdin)))'
+}
+
+check() {
+  local test_name="$1"
+  shift
+  if "$@"; then
+    echo "PASS: $test_name"
+    PASS=$((PASS + 1))
+  else
+    echo "FAIL: $test_name"
+    FAIL=$((FAIL + 1))
+  fi
+}
+
+# ---- Test 1: comments for a bead go out together, oldest first ----
+test_batches_in_order() {
+  setup_project
+  touch "$TEST_DIR/bd-down"
+  echo "first" | spool enqueue b-1
+  echo "other bead" | spool enqueue b-2
+  echo "second" | spool enqueue b-1
+  wait_for_flush
+
+  check "comments stay spooled while bd is down" [ "$(pending_count)" = "3" ]
+
+  rm "$TEST_DIR/bd-down"
+  spool flush
+  check "one bd comment per bead" [ "$(wc -l < "$TEST_DIR/comments.log" | tr -d ' ')" = "2" ]
+  check "a bead's comments are joined oldest first" \
+    [ "$(delivered 1)" = "$(printf 'b-1|first\n\n---\n\nsecond')" ]
+  check "the other bead gets its own comment" [ "$(delivered 2)" = "b-2|other bead" ]
+  check "delivered comments leave the spool" [ "$(pending_count)" = "0" ]
+}
+
+# ---- Test 2: a failed call is retried within the same flush ----
+test_retries() {
+  setup_project
+  touch "$TEST_DIR/bd-down"
+  echo "retry me" | spool enqueue b-1
+  wait_for_flush
+  rm "$TEST_DIR/bd-down"
+  rm -f "$TEST_DIR/bd-calls"
+  FAIL_TIMES=1 COMMENT_SPOOL_RETRIES=2 spool flush
+
+  check "the comment is delivered on the second attempt" [ "$(delivered 1)" = "b-1|retry me" ]
+  check "bd was called twice" [ "$(cat "$TEST_DIR/bd-calls")" = "2" ]
+}
+
+# ---- Test 3: after too many failed flushes, comments move to failed/ ----
+test_gives_up() {
+  setup_project
+  touch "$TEST_DIR/bd-down"
+  echo "undeliverable" | COMMENT_SPOOL_MAX_FLUSHES=2 spool enqueue b-1
+  wait_for_flush
+  COMMENT_SPOOL_MAX_FLUSHES=2 spool flush
+
+  check "the comment leaves the pending spool" [ "$(pending_count)" = "0" ]
+  check "the comment is kept in spool/failed/" \
+    grep -q '"flushes": 2' "$TEST_DIR"/.beads/spool/failed/*.json
+  check "no temp files are left behind" \
+    [ -z "$(find "$TEST_DIR/.beads/spool" -name '*.tmp')" ]
+  check "status counts the failed comment" \
+    grep -q "1 failed" <<< "$(spool status)"
+
+  local output
+  output=$(cd "$TEST_DIR" && PATH="$TEST_DIR/bin:$PATH" CLAUDE_PROJECT_DIR="$TEST_DIR" bash "$HOOKS_DIR/session-start.sh")
+  check "SessionStart warns about undelivered comments" \
+    grep -q "1 bead comment(s) could not be delivered" <<< "$output"
+}
+
+# ---- Test 4: large comments are stored as blobs before posting ----
+test_compacts_large_comments() {
+  setup_project
+  python3 -c 'print("DISPATCH_PROMPT: scout"); print("x" * 2000)' | spool enqueue b-1
+  wait_for_flush
+
+  check "the posted comment references a blob" grep -q '\[blob sha256:' "$TEST_DIR/comments.log"
+  check "the full text is in .beads/blobs/" \
+    [ "$(find "$TEST_DIR/.beads/blobs" -name '*.md' | wc -l | tr -d ' ')" = "1" ]
+}
+
+# ---- Run all tests ----
+echo "=== comment-spool.py tests ==="
+echo ""
+
+test_batches_in_order
+test_retries
+test_gives_up
+test_compacts_large_comments
+
+echo ""
+echo "=== Results: $PASS passed, $FAIL failed ==="
+
+if [ "$FAIL" -gt 0 ]; then
+  exit 1
+fi
@@ -0,0 +1,164 @@
+#!/bin/bash
+# Tests for templates/hooks/epic-scheduler.py
+# Mocks bd; the last tests use the .beads/issues.jsonl fallback
+
+set -euo pipefail
+
+SCHEDULER="$(cd "$(dirname "$0")/.." && pwd)/templates/hooks/epic-scheduler.py"
+PASS=0
+FAIL=0
+MOCK_DIR=""
+
+# Epic E:
+#   E.1 open, scope src/api           blocks E.2
+#   E.2 open, blocked by E.1
+#   E.3 open, scope src/api/auth      (inside E.1's scope)
+#   E.4 open, scope docs
+#   E.5 in_progress, scope web
+#   E.6 open, scope web/ui            (inside running E.5's scope)
+#   E.7 closed
+setup_mock_dir() {
+  MOCK_DIR=$(mktemp -d)
+  cat > "$MOCK_DIR/bd" << 'MOCKBD'
+#!/bin/bash
+if [ "$1" = "list" ] && [ "$2" = "--json" ]; then
+  echo '[
+    {"id":"E","title":"Epic","status":"open","issue_type":"epic"},
+    {"id":"E.1","title":"API","status":"open","labels":["scope:src/api"]},
+    {"id":"E.2","title":"Client","status":"open"},
+    {"id":"E.3","title":"Auth","status":"open","labels":["scope:src/api/auth"]},
+    {"id":"E.4","title":"Docs","status":"open","labels":["scope:docs/"]},
+    {"id":"E.5","title":"Web","status":"in_progress","labels":["scope:web"]},
+    {"id":"E.6","title":"UI","status":"open","labels":["scope:web/ui"]},
+    {"id":"E.7","title":"Done","status":"closed"}
+  ]'
+elif [ "$1" = "dep" ] && [ "$2" = "list" ] && [ "$3" = "E.2" ]; then
+  echo '[{"id":"E","dependency_type":"parent-child"},{"id":"E.1","dependency_type":"blocks","status":"open"},{"id":"E.7","dependency_type":"blocks","status":"closed"}]'
+elif [ "$1" = "dep" ] && [ "$2" = "list" ]; then
+  echo '[{"id":"E","dependency_type":"parent-child"}]'
+else
+  exit 1
+fi
+MOCKBD
+  chmod +x "$MOCK_DIR/bd"
+}
+
+cleanup() {
+  [ -n "$MOCK_DIR" ] && rm -rf "$MOCK_DIR"
+}
+trap cleanup EXIT
+
+scheduler() {
+  (cd "$MOCK_DIR" && PATH="$MOCK_DIR:$PATH" CLAUDE_PROJECT_DIR="$MOCK_DIR" python3 "$SCHEDULER" "$@")
+}
+
+# next_json FIELD ARGS...: one field of `next EPIC --json`, as a sorted, space-separated list
+next_json() {
+  local field="$1"
+  shift
+  scheduler next E --json "$@" | python3 -c "
+import json, sys
+value = json.load(sys.stdin)['$field']
+items = [v['id'] for v in value] if isinstance(value, list) and value and isinstance(value[0], dict) else value
+print(' '.join(f'{k}={v}' for k, v in sorted(items.items())) if isinstance(items, dict) else ' '.join(items))"
+}
+
+lacks() {
+  ! grep -q "$1" <<< "$2"
+}
+
+check() {
+  local test_name="$1"
+  shift
+  if "$@"; then
+    echo "PASS: $test_name"
+    PASS=$((PASS + 1))
+  else
+    echo "FAIL: $test_name"
+    FAIL=$((FAIL + 1))
+  fi
+}
+
+# ---- Test 1: next picks unblocked children whose scopes don't overlap ----
+test_next_set() {
+  setup_mock_dir
+  check "next dispatches the longest chain first, then non-overlapping work" \
+    [ "$(next_json dispatch)" = "E.1 E.4" ]
+  check "next reports the running child" [ "$(next_json running)" = "E.5" ]
+  check "children overlapping chosen or running scopes are held" \
+    [ "$(next_json held)" = "E.3=scope overlaps E.1 E.6=scope overlaps E.5" ]
+}
+
+# ---- Test 2: --max counts running supervisors ----
+test_next_max() {
+  setup_mock_dir
+  check "--max 2 with one running leaves one slot" [ "$(next_json dispatch --max 2)" = "E.1" ]
+  check "the rest are held for the supervisor limit" \
+    [ "$(next_json held --max 2 | grep -o 'E.4=supervisor limit reached')" = "E.4=supervisor limit reached" ]
+  check "--max 1 with one running dispatches nothing" [ "$(next_json dispatch --max 1)" = "" ]
+}
+
+# ---- Test 3: plan shows waves and the critical path ----
+test_plan() {
+  setup_mock_dir
+  local output
+  output=$(scheduler plan E)
+
+  check "plan puts blocked children in a later wave" grep -q "^Wave 2:" <<< "$output"
+  check "plan shows the critical path" grep -q "^Critical path: E.1 -> E.2$" <<< "$output"
+  check "closed children are not planned" lacks "E.7" "$output"
+}
+
+# ---- Test 4: without bd, children come from .beads/issues.jsonl ----
+test_jsonl_fallback() {
+  setup_mock_dir
+  printf '#!/bin/bash\nexit 1\n' > "$MOCK_DIR/bd"
+  chmod +x "$MOCK_DIR/bd"
+  mkdir -p "$MOCK_DIR/.beads"
+  cat > "$MOCK_DIR/.beads/issues.jsonl" << 'JSONL'
+{"id":"F","status":"open"}
+{"id":"F.1","status":"open","dependencies":[{"depends_on_id":"F","type":"parent-child"}]}
+{"id":"F.2","status":"open","dependencies":[{"depends_on_id":"F.1","type":"blocks"}]}
+JSONL
+  check "the jsonl fallback honours blocks dependencies" [ "$(scheduler next F)" = "F.1 (open) " ]
+}
+
+# ---- Test 5: dependency cycles and bad options are errors, not tracebacks ----
+test_errors() {
+  setup_mock_dir
+  printf '#!/bin/bash\nexit 1\n' > "$MOCK_DIR/bd"
+  mkdir -p "$MOCK_DIR/.beads"
+  cat > "$MOCK_DIR/.beads/issues.jsonl" << 'JSONL'
+{"id":"C.1","status":"open","dependencies":[{"depends_on_id":"C.2","type":"blocks"}]}
+{"id":"C.2","status":"open","dependencies":[{"depends_on_id":"C.1","type":"blocks"}]}
+JSONL
+  local output exit_code
+  output=$(scheduler next C 2>&1) && exit_code=0 || exit_code=$?
+  check "a dependency cycle is reported" \
+    [ "$exit_code" -ne 0 -a "$output" = "epic-scheduler: Dependency cycle among: C.1, C.2" ]
+
+  output=$(scheduler next E --max 2>&1) && exit_code=0 || exit_code=$?
+  check "--max without a value is a usage error" \
+    [ "$exit_code" -eq 2 -a "$(tail -1 <<< "$output")" = "epic-scheduler next: error: argument --max: expected one argument" ]
+
+  output=$(scheduler next E --max -1 2>&1) && exit_code=0 || exit_code=$?
+  check "a negative --max is a usage error" \
+    [ "$exit_code" -eq 2 -a "$(tail -1 <<< "$output")" = "epic-scheduler next: error: argument --max: must be at least 0, not -1" ]
+}
+
+# ---- Run all tests ----
+echo "=== epic-scheduler.py tests ==="
+echo ""
+
+test_next_set
+test_next_max
+test_plan
+test_jsonl_fallback
+test_errors
+
+echo ""
+echo "=== Results: $PASS passed, $FAIL failed ==="
+
+if [ "$FAIL" -gt 0 ]; then
+  exit 1
+fi
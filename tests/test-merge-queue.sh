@@ -0,0 +1,189 @@
+#!/bin/bash
+# Tests for templates/hooks/merge-queue.py
+# Runs against throwaway git repos; mocks bd
+
+set -euo pipefail
+
+QUEUE="$(cd "$(dirname "$0")/.." && pwd)/templates/hooks/merge-queue.py"
+PASS=0
+FAIL=0
+TEST_DIR=""
+REPO=""
+
+export GIT_AUTHOR_NAME=test GIT_AUTHOR_EMAIL=test@example.com
+export GIT_COMMITTER_NAME=test GIT_COMMITTER_EMAIL=test@example.com
+unset MERGE_QUEUE_BASE MERGE_QUEUE_TEST
+
+# Repo on main with one bd-* branch per inreview bead:
+#   q-a, q-b  clean changes to their own files
+#   q-c       adds BROKEN, which the test command rejects
+#   q-d       edits the same line as q-a (conflicts once q-a is merged)
+setup_repo() {
+  cleanup
+  TEST_DIR=$(mktemp -d)
+  REPO="$TEST_DIR/repo"
+  mkdir -p "$TEST_DIR/bin" "$REPO"
+  git -C "$REPO" init -q -b main
+  echo "shared" > "$REPO/shared.txt"
+  git -C "$REPO" add -A
+  git -C "$REPO" commit -q -m "initial"
+
+  make_branch q-a shared.txt "from a"
+  make_branch q-b b.txt "from b"
+  make_branch q-c BROKEN "oops"
+  make_branch q-d shared.txt "from d"
+
+  cat > "$TEST_DIR/bin/bd" << 'MOCKBD'
+#!/bin/bash
+if [ "$1" = "list" ] && [ "$3" = "inreview" ]; then
+  cat "$BD_INREVIEW"
+fi
+MOCKBD
+  chmod +x "$TEST_DIR/bin/bd"
+  inreview '[{"id":"q-a"},{"id":"q-b"},{"id":"q-c"},{"id":"q-d"}]'
+}
+
+inreview() {
+  echo "$1" > "$TEST_DIR/inreview.json"
+}
+
+make_branch() {
+  git -C "$REPO" checkout -q -b "bd-$1" main
+  echo "$3" > "$REPO/$2"
+  git -C "$REPO" add -A
+  git -C "$REPO" commit -q -m "$1"
+  git -C "$REPO" checkout -q main
+}
+
+cleanup() {
+  [ -n "$TEST_DIR" ] && rm -rf "$TEST_DIR"
+  TEST_DIR=""
+  REPO=""
+}
+trap cleanup EXIT
+
+queue() {
+  (cd "$REPO" && PATH="$TEST_DIR/bin:$PATH" BD_INREVIEW="$TEST_DIR/inreview.json" \
+    CLAUDE_PROJECT_DIR="$REPO" python3 "$QUEUE" "$@")
+}
+
+# outcome JSON BEAD_ID: the outcome merge-queue reported for one bead
+outcome() {
+  python3 -c "import json, sys; print({b['id']: b['outcome'] for b in json.loads(sys.argv[1])['beads']}[sys.argv[2]])" "$1" "$2"
+}
+
+# log JSON BEAD_ID: the test log merge-queue reported for one bead
+log_of() {
+  python3 -c "import json, sys; print({b['id']: b['log'] for b in json.loads(sys.argv[1])['beads']}[sys.argv[2]])" "$1" "$2"
+}
+
+json_field() {
+  python3 -c "import json, sys; print(json.loads(sys.argv[1])[sys.argv[2]])" "$1" "$2"
+}
+
+not_merged() {
+  ! git -C "$REPO" merge-base --is-ancestor "$1" merge-queue
+}
+
+check() {
+  local test_name="$1"
+  shift
+  if "$@"; then
+    echo "PASS: $test_name"
+    PASS=$((PASS + 1))
+  else
+    echo "FAIL: $test_name"
+    FAIL=$((FAIL + 1))
+  fi
+}
+
+# ---- Test 1: a failing batch is bisected down to the breaking branch ----
+test_bisects_failing_batch() {
+  setup_repo
+  local result before
+  before=$(git -C "$REPO" rev-parse main)
+  result=$(queue run --test "test ! -e BROKEN" --batch 4 --json)
+
+  check "clean branches are merged" \
+    [ "$(outcome "$result" q-a) $(outcome "$result" q-b)" = "merged merged" ]
+  check "the branch that breaks the tests is left out" [ "$(outcome "$result" q-c)" = "tests failed" ]
+  check "the conflicting branch is reported" [ "$(outcome "$result" q-d)" = "conflict" ]
+  # Queue order b, c, a (d conflicts): runs for [b c a], [b], [c a], [c], [a]
+  check "bisection tests each half until the breaking branch is alone" \
+    [ "$(json_field "$result" test_runs)" = "5" ]
+  check "the rejection points at the failing test log" \
+    grep -q "^# batch: q-c$" "$REPO/$(log_of "$result" q-c)"
+  check "merged branches have no log" [ "$(log_of "$result" q-a)" = "None" ]
+  check "the merge-queue branch holds the merged work" \
+    git -C "$REPO" merge-base --is-ancestor bd-q-b merge-queue
+  check "the merge-queue branch doesn't contain the breaking branch" not_merged bd-q-c
+  check "without --land, main is untouched" [ "$(git -C "$REPO" rev-parse main)" = "$before" ]
+}
+
+# ---- Test 2: --land fast-forwards a local base branch ----
+test_land_locally() {
+  setup_repo
+  inreview '[{"id":"q-a"},{"id":"q-b"}]'
+  queue run --land > /dev/null
+
+  check "--land moves main to the merge-queue result" \
+    [ "$(git -C "$REPO" rev-parse main)" = "$(git -C "$REPO" rev-parse merge-queue)" ]
+  check "the working tree of main follows" [ -f "$REPO/b.txt" ]
+}
+
+# ---- Test 3: --land pushes to origin when there is one ----
+test_land_to_origin() {
+  setup_repo
+  inreview '[{"id":"q-b"}]'
+  git init -q --bare -b main "$TEST_DIR/origin.git"
+  git -C "$REPO" remote add origin "$TEST_DIR/origin.git"
+  git -C "$REPO" push -q origin main
+  git -C "$REPO" remote set-head origin main
+  local before
+  before=$(git -C "$REPO" rev-parse main)
+  queue run --land > /dev/null
+
+  check "--land pushes the result to origin/main" \
+    [ "$(git -C "$TEST_DIR/origin.git" rev-parse main)" = "$(git -C "$REPO" rev-parse merge-queue)" ]
+  check "the local main branch is left for a normal pull" [ "$(git -C "$REPO" rev-parse main)" = "$before" ]
+}
+
+# ---- Test 4: blockers are queued before the beads they block ----
+test_plan_orders_blockers_first() {
+  setup_repo
+  inreview '[{"id":"q-a","dependencies":[{"depends_on_id":"q-b","type":"blocks"}]},{"id":"q-b"}]'
+  local plan
+  plan=$(queue plan)
+
+  check "the blocker comes first in the plan" [ "$(echo "$plan" | head -1 | awk '{print $2}')" = "q-b" ]
+}
+
+# ---- Test 5: invalid --batch values are rejected ----
+test_rejects_bad_batch() {
+  setup_repo
+  local output exit_code
+  output=$(queue run --batch 0 2>&1) && exit_code=0 || exit_code=$?
+  check "--batch 0 is a usage error" \
+    [ "$exit_code" -eq 2 -a "$(tail -1 <<< "$output")" = "merge-queue run: error: argument --batch: must be at least 1, not 0" ]
+
+  output=$(queue run --batch 2>&1) && exit_code=0 || exit_code=$?
+  check "--batch without a value is a usage error" \
+    [ "$exit_code" -eq 2 -a "$(tail -1 <<< "$output")" = "merge-queue run: error: argument --batch: expected one argument" ]
+}
+
+# ---- Run all tests ----
+echo "=== merge-queue.py tests ==="
+echo ""
+
+test_bisects_failing_batch
+test_land_locally
+test_land_to_origin
+test_plan_orders_blockers_first
+test_rejects_bad_batch
+
+echo ""
+echo "=== Results: $PASS passed, $FAIL failed ==="
+
+if [ "$FAIL" -gt 0 ]; then
+  exit 1
+fi
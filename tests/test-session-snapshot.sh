@@ -0,0 +1,191 @@
+#!/bin/bash
+# Tests for templates/hooks/session-snapshot.sh and its use in session-start.sh
+# Runs against a throwaway git repo; mocks bd and gh
+
+set -euo pipefail
+
+HOOKS_DIR="$(cd "$(dirname "$0")/.." && pwd)/templates/hooks"
+PASS=0
+FAIL=0
+TEST_DIR=""
+REPO=""
+
+export GIT_AUTHOR_NAME=test GIT_AUTHOR_EMAIL=test@example.com
+export GIT_COMMITTER_NAME=test GIT_COMMITTER_EMAIL=test@example.com
+unset SESSION_SNAPSHOT_MAX_AGE
+
+# Repo on main with the hooks installed and a written snapshot whose inputs
+# all date from two minutes ago, so any change now moves the stamp
+setup_repo() {
+  cleanup
+  TEST_DIR=$(mktemp -d)
+  REPO="$TEST_DIR/repo"
+  mkdir -p "$TEST_DIR/bin" "$REPO/.claude/hooks" "$REPO/.beads"
+  cp "$HOOKS_DIR/session-start.sh" "$HOOKS_DIR/session-snapshot.sh" "$REPO/.claude/hooks/"
+
+  cat > "$TEST_DIR/bin/bd" << MOCKBD
+#!/bin/bash
+[ "\$1" = "ready" ] && cat "$TEST_DIR/ready.txt"
+exit 0
+MOCKBD
+  printf '#!/bin/bash\necho "[]"\n' > "$TEST_DIR/bin/gh"
+  chmod +x "$TEST_DIR/bin/bd" "$TEST_DIR/bin/gh"
+  echo "b-1 First task" > "$TEST_DIR/ready.txt"
+
+  git -C "$REPO" init -q -b main
+  printf '.claude/\n.beads/\n' >> "$REPO/.git/info/exclude"
+  echo "one" > "$REPO/file.txt"
+  git -C "$REPO" add file.txt
+  git -C "$REPO" commit -q -m "initial"
+  echo '{"id":"b-1"}' > "$REPO/.beads/issues.jsonl"
+
+  age_inputs
+  hook session-snapshot.sh --write
+}
+
+cleanup() {
+  [ -n "$TEST_DIR" ] && rm -rf "$TEST_DIR"
+  TEST_DIR=""
+  REPO=""
+}
+trap cleanup EXIT
+
+hook() {
+  local name="$1"
+  shift
+  (cd "$REPO" && PATH="$TEST_DIR/bin:$PATH" CLAUDE_PROJECT_DIR="$REPO" bash "$REPO/.claude/hooks/$name" "$@")
+}
+
+age_inputs() {
+  local file
+  for file in "$REPO"/.beads/issues.jsonl "$REPO"/.git/{HEAD,logs/HEAD,index,packed-refs} "$REPO"/.git/refs/heads/*; do
+    [ -e "$file" ] && touch -d "2 minutes ago" "$file"
+  done
+  return 0
+}
+
+stamp() {
+  hook session-snapshot.sh --stamp
+}
+
+saved_stamp() {
+  head -1 "$REPO/.beads/session-snapshot.md" | sed -n 's/.* stamp=\([^ ]*\) .*/\1/p'
+}
+
+# The snapshot counts as current: session-start prints no refresh notice
+is_current() {
+  ! hook session-start.sh | grep -q "may be out of date"
+}
+
+is_stale() {
+  ! is_current
+}
+
+check() {
+  local test_name="$1"
+  shift
+  if "$@"; then
+    echo "PASS: $test_name"
+    PASS=$((PASS + 1))
+  else
+    echo "FAIL: $test_name"
+    FAIL=$((FAIL + 1))
+  fi
+}
+
+# ---- Test 1: session start prints the saved snapshot ----
+test_prints_snapshot() {
+  setup_repo
+  local output
+  output=$(hook session-start.sh)
+
+  check "--write saves a versioned header with the current stamp" [ "$(saved_stamp)" = "$(stamp)" ]
+  check "session start prints the saved report" grep -q "b-1 First task" <<< "$output"
+  check "an unchanged project needs no refresh" is_current
+}
+
+# ---- Test 2: a stale snapshot is shown, then refreshed in the background ----
+test_refreshes_stale_snapshot() {
+  setup_repo
+  echo "b-2 Second task" > "$TEST_DIR/ready.txt"
+  echo '{"id":"b-2"}' >> "$REPO/.beads/issues.jsonl"
+  local output
+  output=$(hook session-start.sh)
+
+  check "the old report is printed at once" grep -q "b-1 First task" <<< "$output"
+  check "a changed issues.jsonl marks it out of date" grep -q "may be out of date" <<< "$output"
+  sleep 1
+  check "the background refresh writes the new report" grep -q "b-2 Second task" "$REPO/.beads/session-snapshot.md"
+}
+
+# ---- Test 3: git changes that leave HEAD alone still invalidate it ----
+test_index_change() {
+  setup_repo
+  echo "two" > "$REPO/file.txt"
+  git -C "$REPO" add file.txt
+  check "staging a change invalidates the snapshot" is_stale
+}
+
+test_commit() {
+  setup_repo
+  git -C "$REPO" commit -q --allow-empty -m "more"
+  check "a commit invalidates the snapshot" is_stale
+}
+
+test_commit_on_other_branch() {
+  setup_repo
+  git -C "$REPO" checkout -q -b feature
+  # Without a reflog, only the branch ref itself records the commit
+  git -C "$REPO" config core.logAllRefUpdates false
+  rm -rf "$REPO/.git/logs"
+  age_inputs
+  hook session-snapshot.sh --write
+  git -C "$REPO" commit -q --allow-empty -m "on feature"
+  check "a commit on the checked-out branch invalidates the snapshot" is_stale
+}
+
+test_main_moves_elsewhere() {
+  setup_repo
+  git -C "$REPO" checkout -q -b feature
+  age_inputs
+  hook session-snapshot.sh --write
+  # Another checkout moves main while this one stays on feature
+  git -C "$REPO" worktree add -q "$TEST_DIR/other" main
+  git -C "$TEST_DIR/other" commit -q --allow-empty -m "merged elsewhere"
+  check "main moving in another worktree invalidates the snapshot" is_stale
+}
+
+test_packed_refs() {
+  setup_repo
+  git -C "$REPO" pack-refs --all
+  check "rewriting packed-refs invalidates the snapshot" is_stale
+}
+
+# ---- Test 4: an old snapshot is refreshed even if nothing changed ----
+test_max_age() {
+  setup_repo
+  sleep 1
+  local output
+  output=$(SESSION_SNAPSHOT_MAX_AGE=0 hook session-start.sh)
+  check "a snapshot older than SESSION_SNAPSHOT_MAX_AGE is refreshed" grep -q "may be out of date" <<< "$output"
+}
+
+# ---- Run all tests ----
+echo "=== session-snapshot.sh tests ==="
+echo ""
+
+test_prints_snapshot
+test_refreshes_stale_snapshot
+test_index_change
+test_commit
+test_commit_on_other_branch
+test_main_moves_elsewhere
+test_packed_refs
+test_max_age
+
+echo ""
+echo "=== Results: $PASS passed, $FAIL failed ==="
+
+if [ "$FAIL" -gt 0 ]; then
+  exit 1
+fi
@@ -0,0 +1,279 @@
+#!/bin/bash
+# Tests for templates/hooks/worktree-pool.py
+# Runs against throwaway git repos; mocks bd
+
+set -euo pipefail
+
+POOL="$(cd "$(dirname "$0")/.." && pwd)/templates/hooks/worktree-pool.py"
+PASS=0
+FAIL=0
+TEST_DIR=""
+REPO=""
+
+export GIT_AUTHOR_NAME=test GIT_AUTHOR_EMAIL=test@example.com
+export GIT_COMMITTER_NAME=test GIT_COMMITTER_EMAIL=test@example.com
+unset WORKTREE_POOL_BASE WORKTREE_POOL_SIZE
+
+# Fresh repo on branch main with one commit; bd reports no beads
+setup_repo() {
+  cleanup
+  TEST_DIR=$(mktemp -d)
+  REPO="$TEST_DIR/repo"
+  mkdir -p "$TEST_DIR/bin" "$REPO"
+  mock_bd '[]' '[]'
+  git -C "$REPO" init -q -b main
+  echo "one" > "$REPO/file.txt"
+  mkdir -p "$REPO/src" "$REPO/docs"
+  echo "code" > "$REPO/src/app.txt"
+  echo "doc" > "$REPO/docs/readme.txt"
+  git -C "$REPO" add -A
+  git -C "$REPO" commit -q -m "initial"
+}
+
+# mock_bd CLOSED_JSON IN_PROGRESS_JSON: what `bd list --status ...` returns
+mock_bd() {
+  cat > "$TEST_DIR/bin/bd" << MOCKBD
+#!/bin/bash
+if [ "\$1" = "list" ] && [ "\$3" = "closed" ]; then
+  echo '$1'
+elif [ "\$1" = "list" ] && [ "\$3" = "in_progress" ]; then
+  echo '$2'
+else
+  echo '[]'
+fi
+MOCKBD
+  chmod +x "$TEST_DIR/bin/bd"
+}
+
+cleanup() {
+  if [ -n "$REPO" ] && [ -d "$REPO/.worktrees/.pool" ]; then
+    wait_for_refill
+  fi
+  [ -n "$TEST_DIR" ] && rm -rf "$TEST_DIR"
+  TEST_DIR=""
+  REPO=""
+}
+trap cleanup EXIT
+
+pool() {
+  (cd "$REPO" && PATH="$TEST_DIR/bin:$PATH" CLAUDE_PROJECT_DIR="$REPO" python3 "$POOL" "$@")
+}
+
+# claim starts a background refill; let it finish before looking at the pool
+wait_for_refill() {
+  sleep 0.5
+  flock "$REPO/.worktrees/.pool/.refill.lock" true 2>/dev/null || true
+}
+
+slot_count() {
+  find "$REPO/.worktrees/.pool" -maxdepth 1 -name 'slot-*' | wc -l | tr -d ' '
+}
+
+has_branch() {
+  git -C "$REPO" rev-parse -q --verify "refs/heads/$1" > /dev/null
+}
+
+lacks_branch() {
+  ! has_branch "$1"
+}
+
+check() {
+  local test_name="$1"
+  shift
+  if "$@"; then
+    echo "PASS: $test_name"
+    PASS=$((PASS + 1))
+  else
+    echo "FAIL: $test_name"
+    FAIL=$((FAIL + 1))
+  fi
+}
+
+# ---- Test 1: refill creates detached slots at the checked-out branch ----
+test_refill() {
+  setup_repo
+  pool refill --size 2 > /dev/null
+  local head
+  head=$(git -C "$REPO" rev-parse HEAD)
+
+  check "refill creates the requested number of slots" [ "$(slot_count)" = "2" ]
+  check "slots are detached at the main checkout's HEAD" \
+    [ "$(git -C "$REPO/.worktrees/.pool/slot-1" rev-parse HEAD)" = "$head" ]
+}
+
+# ---- Test 2: claim moves a slot to the bead's path and branches there ----
+test_claim_from_pool() {
+  setup_repo
+  git -C "$REPO" checkout -q -b feature
+  git -C "$REPO" commit -q --allow-empty -m "feature work"
+  pool refill --size 1 > /dev/null
+  local path
+  path=$(pool claim abc)
+  wait_for_refill
+
+  check "claim prints the bead worktree path" [ "$path" = "$REPO/.worktrees/bd-abc" ]
+  check "claim creates branch bd-abc" \
+    [ "$(git -C "$path" branch --show-current)" = "bd-abc" ]
+  check "the branch starts at the main checkout's branch, not origin's default" \
+    [ "$(git -C "$path" rev-parse HEAD)" = "$(git -C "$REPO" rev-parse feature)" ]
+  check "the pool is refilled in the background" [ "$(slot_count)" = "1" ]
+  check "claiming again returns the same worktree" [ "$(pool claim abc)" = "$path" ]
+}
+
+# ---- Test 3: claim with an empty pool falls back to git worktree add ----
+test_claim_without_pool() {
+  setup_repo
+  local path
+  path=$(pool claim def)
+
+  check "fallback claim creates the worktree" [ -f "$path/.git" ]
+  check "fallback claim creates branch bd-def" \
+    [ "$(git -C "$path" branch --show-current)" = "bd-def" ]
+}
+
+# ---- Test 4: sparse claim checks out only the given directories ----
+test_sparse_claim() {
+  setup_repo
+  pool refill --size 1 > /dev/null
+  local path
+  path=$(pool claim sp --sparse src)
+  wait_for_refill
+
+  check "sparse claim checks out the listed directory" [ -f "$path/src/app.txt" ]
+  check "sparse claim leaves other directories out" [ ! -e "$path/docs" ]
+}
+
+# ---- Test 5: a claim that fails after taking a slot puts the slot back ----
+test_failed_claim_rolls_back() {
+  setup_repo
+  pool refill --size 1 > /dev/null
+  git -C "$REPO" branch bd-busy
+  # A branch checked out elsewhere can't be checked out in the slot
+  git -C "$REPO" worktree add -q "$TEST_DIR/elsewhere" bd-busy
+  local exit_code
+  pool claim busy > /dev/null 2>&1 && exit_code=0 || exit_code=$?
+
+  check "failed claim exits non-zero" [ "$exit_code" -ne 0 ]
+  check "no worktree is left at the bead's path" [ ! -e "$REPO/.worktrees/bd-busy" ]
+  check "the slot is back in the pool" [ "$(slot_count)" = "1" ]
+}
+
+# ---- Test 6: release refuses uncommitted changes, then returns the slot ----
+test_release() {
+  setup_repo
+  local path exit_code
+  path=$(pool claim rel)
+  echo "wip" > "$path/wip.txt"
+  pool release rel > /dev/null 2>&1 && exit_code=0 || exit_code=$?
+
+  check "release refuses a worktree with untracked files" [ "$exit_code" -ne 0 ]
+  check "the refused worktree is left in place" [ -f "$path/wip.txt" ]
+
+  pool release rel --force > /dev/null
+  check "release --force returns the worktree to the pool" [ "$(slot_count)" = "1" ]
+  check "the returned slot has no leftover files" [ ! -e "$REPO/.worktrees/.pool/slot-1/wip.txt" ]
+  check "the bead's branch is kept" has_branch bd-rel
+}
+
+# ---- Test 7: bad option values are usage errors, not tracebacks ----
+test_bad_option_values() {
+  setup_repo
+  local output exit_code
+  output=$(pool refill --size 2>&1) && exit_code=0 || exit_code=$?
+  check "--size without a value is a usage error" \
+    [ "$exit_code" -eq 2 -a "$(tail -1 <<< "$output")" = "worktree-pool refill: error: argument --size: expected one argument" ]
+
+  output=$(pool gc --jobs 0 2>&1) && exit_code=0 || exit_code=$?
+  check "--jobs below 1 is a usage error" \
+    [ "$exit_code" -eq 2 -a "$(tail -1 <<< "$output")" = "worktree-pool gc: error: argument --jobs: must be at least 1, not 0" ]
+}
+
+# Commit a file on the bead's branch, in its worktree
+commit_in() {
+  echo "$2" > "$REPO/.worktrees/bd-$1/$2.txt"
+  git -C "$REPO/.worktrees/bd-$1" add -A
+  git -C "$REPO/.worktrees/bd-$1" commit -q -m "$2"
+}
+
+# ---- Test 8: gc leaves a just-claimed branch alone ----
+test_gc_keeps_fresh_branch() {
+  setup_repo
+  pool claim fresh > /dev/null
+  git -C "$REPO" commit -q --allow-empty -m "main moves on"
+  pool gc > /dev/null
+
+  check "gc keeps the worktree of a branch with no commits" [ -d "$REPO/.worktrees/bd-fresh" ]
+  check "gc keeps the branch itself" has_branch bd-fresh
+}
+
+# ---- Test 9: gc removes merged worktrees and deletes their branches ----
+test_gc_removes_merged() {
+  setup_repo
+  pool claim done > /dev/null
+  commit_in done work
+  git -C "$REPO" merge -q bd-done
+  local output
+  output=$(pool gc --dry-run)
+
+  check "gc --dry-run lists the merged worktree" grep -q "bd-done *would remove" <<< "$output"
+  check "gc --dry-run removes nothing" [ -d "$REPO/.worktrees/bd-done" ]
+
+  pool gc > /dev/null
+  check "gc removes the merged worktree" [ ! -e "$REPO/.worktrees/bd-done" ]
+  check "gc deletes the merged branch" lacks_branch bd-done
+}
+
+# ---- Test 10: gc removes closed beads' worktrees but keeps unmerged branches ----
+test_gc_closed_bead() {
+  setup_repo
+  mock_bd '[{"id":"shut"}]' '[]'
+  pool claim shut > /dev/null
+  commit_in shut unmerged
+  local output
+  output=$(pool gc)
+
+  check "gc removes the closed bead's worktree" [ ! -e "$REPO/.worktrees/bd-shut" ]
+  check "gc keeps the unmerged branch without --force" has_branch bd-shut
+  check "gc says why the branch was kept" grep -q "Kept branch bd-shut" <<< "$output"
+}
+
+# ---- Test 11: gc never touches an in-progress bead or uncommitted work ----
+test_gc_skips_in_progress_and_dirty() {
+  setup_repo
+  mock_bd '[]' '[{"id":"busy"}]'
+  pool claim busy > /dev/null
+  commit_in busy work
+  pool claim dirty > /dev/null
+  commit_in dirty work
+  git -C "$REPO" merge -q --no-edit bd-busy bd-dirty
+  echo "wip" > "$REPO/.worktrees/bd-dirty/wip.txt"
+  local output
+  output=$(pool gc)
+
+  check "gc keeps an in-progress bead's merged worktree" [ -d "$REPO/.worktrees/bd-busy" ]
+  check "gc skips a worktree with uncommitted files" [ -f "$REPO/.worktrees/bd-dirty/wip.txt" ]
+  check "gc reports the skipped worktree" grep -q "bd-dirty *uncommitted changes" <<< "$output"
+}
+
+# ---- Run all tests ----
+echo "=== worktree-pool.py tests ==="
+echo ""
+
+test_refill
+test_claim_from_pool
+test_claim_without_pool
+test_sparse_claim
+test_failed_claim_rolls_back
+test_release
+test_bad_option_values
+test_gc_keeps_fresh_branch
+test_gc_removes_merged
+test_gc_closed_bead
+test_gc_skips_in_progress_and_dirty
+
+echo ""
+echo "=== Results: $PASS passed, $FAIL failed ==="
+
+if [ "$FAIL" -gt 0 ]; then
+  exit 1
+fi